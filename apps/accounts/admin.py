@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.utils.html import format_html
+from core.images import derivative_url
 from apps.wallets.models import Wallet, DepositRequest
 from apps.withdrawals.models import WithdrawalRequest
 from .models import SignupProof
@@ -35,7 +36,7 @@ class SignupProofInline(admin.TabularInline):
 
     def proof_preview(self, obj):
         if obj.proof_image and hasattr(obj.proof_image, 'url'):
-            return format_html('<a href="{}" target="_blank"><img src="{}" style="max-height:60px;"/></a>', obj.proof_image.url, obj.proof_image.url)
+            return format_html('<a href="{}" target="_blank"><img src="{}" style="max-height:60px;"/></a>', obj.proof_image.url, derivative_url(obj.proof_image, 'thumb'))
         return ""
     proof_preview.short_description = "Proof"
 
@@ -61,6 +62,16 @@ class UserAdmin(admin.ModelAdmin):
     actions = ["approve_users", "reject_users"]
     inlines = [WalletInline, SignupProofInline, DepositRequestInline, WithdrawalRequestInline, ReferralPayoutAsReferrerInline, ReferralPayoutAsRefereeInline]
 
+    def save_model(self, request, obj, form, change):
+        from apps.referrals.services import link_referral, team_stats_scope, rebuild_team_stats
+        moved = 'referred_by' in form.changed_data
+        scope = team_stats_scope(obj) if (moved and change) else set()
+        super().save_model(request, obj, form, change)
+        # Keep the referral closure table and team counters in sync when an admin edits the upline
+        if moved:
+            link_referral(obj)
+            rebuild_team_stats(scope | team_stats_scope(obj))
+
     def referral_count(self, obj):
         return obj.referrals.count()
     referral_count.short_description = "Referrals"
@@ -88,7 +99,7 @@ class UserAdmin(admin.ModelAdmin):
     def signup_proof_thumb(self, obj):
         latest = obj.signup_proofs.order_by('-created_at').first()
         if latest and latest.proof_image and hasattr(latest.proof_image, 'url'):
-            return format_html('<a href="{}" target="_blank"><img src="{}" style="max-height:40px;"/></a>', latest.proof_image.url, latest.proof_image.url)
+            return format_html('<a href="{}" target="_blank"><img src="{}" style="max-height:40px;"/></a>', latest.proof_image.url, derivative_url(latest.proof_image, 'thumb'))
         return ""
     signup_proof_thumb.short_description = "Signup Proof"
 
@@ -99,12 +110,20 @@ class UserAdmin(admin.ModelAdmin):
     full_name.short_description = "Name"
 
     def approve_users(self, request, queryset):
+        from apps.referrals.services import record_team_approval_change, pay_on_package_purchase_batch
+        changed_ids = list(queryset.filter(is_approved=False).values_list('id', flat=True))
         updated = queryset.update(is_approved=True)
-        self.message_user(request, f"Approved {updated} user(s).")
+        record_team_approval_change(changed_ids, approved=True)
+        # queryset.update() skips the approval signal, so pay join referral rewards in one batch
+        result = pay_on_package_purchase_batch(changed_ids)
+        self.message_user(request, f"Approved {updated} user(s); paid {result['payouts']} referral reward(s) totalling ${result['total_usd']}.")
     approve_users.short_description = "Approve selected users"
 
     def reject_users(self, request, queryset):
+        from apps.referrals.services import record_team_approval_change
+        changed_ids = list(queryset.filter(is_approved=True).values_list('id', flat=True))
         updated = queryset.update(is_approved=False)
+        record_team_approval_change(changed_ids, approved=False)
         self.message_user(request, f"Marked {updated} user(s) as not approved.")
     reject_users.short_description = "Reject selected users"
 
@@ -117,6 +136,6 @@ class SignupProofAdmin(admin.ModelAdmin):
 
     def proof_preview(self, obj):
         if obj.proof_image and hasattr(obj.proof_image, 'url'):
-            return format_html('<a href="{}" target="_blank"><img src="{}" style="max-height:60px;"/></a>', obj.proof_image.url, obj.proof_image.url)
+            return format_html('<a href="{}" target="_blank"><img src="{}" style="max-height:60px;"/></a>', obj.proof_image.url, derivative_url(obj.proof_image, 'thumb'))
         return ""
     proof_preview.short_description = "Proof"
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""
+Create thumbnail / mid-size variants for images uploaded before derivatives existed
+(new uploads get them automatically after save, see core.images).
+
+Usage:
+    python manage.py generate_image_derivatives
+    python manage.py generate_image_derivatives --force      # rebuild existing variants too
+"""
+from concurrent.futures import ThreadPoolExecutor
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from core.images import IMAGE_FIELDS, generate_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Backfill image derivatives (thumb/mid) for proofs and product images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that already exist')
+        parser.add_argument('--workers', type=int, default=4, help='Parallel image workers (default 4)')
+
+    def handle(self, *args, **options):
+        for label, field_name in IMAGE_FIELDS:
+            model = apps.get_model(label)
+            storage = model._meta.get_field(field_name).storage
+            names = sorted(set(
+                model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True).iterator(chunk_size=2000)
+            ))
+
+            def work(name):
+                try:
+                    return generate_derivatives(storage, name, force=options['force'])
+                except Exception as e:
+                    self.stderr.write(f'⚠️ {name}: {e}')
+                    return 0
+
+            with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+                written = sum(pool.map(work, names))
+            self.stdout.write(self.style.SUCCESS(f'✅ {label}.{field_name}: {len(names)} images, {written} variants written'))
@@ -0,0 +1,65 @@
+"""
+Move existing signup/deposit/order proofs into content-addressed storage (core.storage).
+
+Every distinct file is hashed once and stored as blobs/<aa>/<bb>/<sha256><ext>; all rows
+pointing at it are repointed with one UPDATE per model. Duplicate copies collapse into a
+single blob. Originals are kept unless --delete-originals is given.
+
+Usage:
+    python manage.py migrate_proofs_to_blobs --dry-run
+    python manage.py migrate_proofs_to_blobs
+    python manage.py migrate_proofs_to_blobs --delete-originals
+"""
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from core.images import generate_derivatives
+from core.storage import BLOB_PREFIX, PROOF_MODELS, proof_storage
+
+
+class Command(BaseCommand):
+    help = 'Deduplicate existing proof images into content-addressed blob storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be moved')
+        parser.add_argument('--delete-originals', action='store_true', help='Delete the old per-upload files after moving')
+
+    def handle(self, *args, **options):
+        models = [apps.get_model(label) for label in PROOF_MODELS]
+        names = set()
+        for model in models:
+            names.update(
+                model.objects.exclude(proof_image='').exclude(proof_image__isnull=True)
+                .exclude(proof_image__startswith=BLOB_PREFIX)
+                .values_list('proof_image', flat=True).iterator(chunk_size=2000)
+            )
+        if options['dry_run']:
+            self.stdout.write(f'{len(names)} proof files would be moved into {BLOB_PREFIX}')
+            return
+
+        storage = proof_storage()
+        moved = missing = bytes_before = 0
+        blobs = set()
+        for name in sorted(names):
+            if not default_storage.exists(name):
+                missing += 1
+                continue
+            bytes_before += default_storage.size(name)
+            with default_storage.open(name, 'rb') as fh:
+                blob = storage.save(name, fh)
+            blobs.add(blob)
+            for model in models:
+                model.objects.filter(proof_image=name).update(proof_image=blob)
+            try:
+                generate_derivatives(storage, blob)
+            except Exception as e:
+                self.stderr.write(f'⚠️ derivatives for {blob}: {e}')
+            if options['delete_originals']:
+                default_storage.delete(name)
+            moved += 1
+
+        bytes_after = sum(storage.size(b) for b in blobs)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Moved {moved} proof files into {len(blobs)} blobs '
+            f'({bytes_before} -> {bytes_after} bytes), {missing} missing on disk'
+        ))
@@ -0,0 +1,65 @@
+"""
+Delete content-addressed blobs (and their derivatives) that no row points at any more.
+
+normalize_original() replaces an uploaded proof with a cleaned copy but never deletes the
+old blob, because a concurrent upload of the same bytes may be handed that blob before its
+row commits. Such leftovers are collected here. Blobs modified within --grace-hours are
+kept: storage touches a blob whenever an upload reuses it.
+
+Usage:
+    python manage.py purge_orphan_blobs --dry-run
+    python manage.py purge_orphan_blobs --grace-hours 48
+"""
+import os
+import time
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from core.db import iter_keyset
+from core.images import IMAGE_FIELDS
+from core.storage import BLOB_PREFIX, proof_storage
+
+
+def _stem(name: str) -> str:
+    # blobs/aa/bb/<sha256>.png and its variants blobs/aa/bb/<sha256>.thumb.webp share the hash
+    return os.path.basename(name).split('.', 1)[0]
+
+
+class Command(BaseCommand):
+    help = 'Delete blobs no proof or product image refers to'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=24, help='Keep blobs touched this recently (default 24)')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+
+    def handle(self, *args, **options):
+        referenced = set()
+        for label, field in IMAGE_FIELDS:
+            rows = apps.get_model(label).objects.filter(**{f'{field}__startswith': BLOB_PREFIX})
+            for _, name in iter_keyset(rows, field, chunk_size=5000):
+                referenced.add(_stem(name))
+
+        storage = proof_storage()
+        root = storage.path(BLOB_PREFIX)
+        cutoff = time.time() - options['grace_hours'] * 3600
+        deleted = freed = 0
+        for dirpath, dirnames, filenames in os.walk(root):
+            if dirpath == root:
+                dirnames[:] = [d for d in dirnames if d != 'tmp']  # uploads still being written
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if _stem(filename) in referenced:
+                    continue
+                try:
+                    stat = os.stat(path)
+                    if stat.st_mtime > cutoff:
+                        continue
+                    if not options['dry_run']:
+                        os.unlink(path)
+                except FileNotFoundError:
+                    continue
+                deleted += 1
+                freed += stat.st_size
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {verb} {deleted} orphan blobs ({freed / 1024 / 1024:.1f} MB), {len(referenced)} referenced"
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_signupproof'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='signupproof',
+            index=models.Index(fields=['user', 'status', 'created_at'], name='signup_user_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:09
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_signupproof_signup_user_status_created_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='signupproof',
+            name='proof_image',
+            field=models.ImageField(blank=True, db_index=True, null=True, storage=core.storage.proof_storage, upload_to='signup_proofs/'),
+        ),
+    ]
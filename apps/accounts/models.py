@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from core.storage import proof_storage
 
 class User(AbstractUser):
     # referral structure
@@ -7,6 +8,13 @@ class User(AbstractUser):
     referral_code = models.CharField(max_length=12, unique=True, blank=True)
     is_approved = models.BooleanField(default=False)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the approval flag as loaded so signals can detect approve/unapprove transitions
+        instance._loaded_is_approved = instance.is_approved if 'is_approved' in field_names else None
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.referral_code:
             import random, string
@@ -17,10 +25,14 @@ class SignupProof(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='signup_proofs')
     amount_pkr = models.DecimalField(max_digits=14, decimal_places=2)
     tx_id = models.CharField(max_length=100)
-    proof_image = models.ImageField(upload_to='signup_proofs/', null=True, blank=True)
+    proof_image = models.ImageField(upload_to='signup_proofs/', null=True, blank=True, storage=proof_storage, db_index=True)
     status = models.CharField(max_length=20, default='PENDING')  # PENDING/APPROVED/REJECTED
     created_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            # latest (pending) proof per user
+            models.Index(fields=['user', 'status', 'created_at'], name='signup_user_status_created_idx'),
+        ]
\ No newline at end of file
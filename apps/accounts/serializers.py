@@ -1,5 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from core.images import derivative_url
+from core.storage import proof_reused
+from core.uploads import BoundedImageField
+from apps.wallets.references import ProofReferenceListSerializer, tx_id_matches
 from .models import SignupProof
 
 User = get_user_model()
@@ -34,14 +38,24 @@ class SignupSerializer(serializers.ModelSerializer):
             user.referred_by = User.objects.filter(referral_code=ref_code).first()
         user.is_approved = False
         user.save()
+        if user.referred_by_id:
+            from apps.referrals.services import link_referral, record_team_signup
+            link_referral(user)
+            record_team_signup(user)
         return user
 
 class SignupProofSerializer(serializers.ModelSerializer):
+    proof_image = BoundedImageField(required=False, allow_null=True)
     proof_image_url = serializers.SerializerMethodField(read_only=True)
+    proof_thumb_url = serializers.SerializerMethodField(read_only=True)
+    proof_reused = serializers.SerializerMethodField(read_only=True)
+    tx_id_matches = serializers.SerializerMethodField(read_only=True)
+    reference_source = 'signup_proof'
 
     class Meta:
         model = SignupProof
         fields = """__all__"""
+        list_serializer_class = ProofReferenceListSerializer
         read_only_fields = ["user", "status", "processed_at"]
 
     def get_proof_image_url(self, obj):
@@ -51,4 +65,17 @@ class SignupProofSerializer(serializers.ModelSerializer):
             if request is not None:
                 return request.build_absolute_uri(url)
             return url
-        return None
\ No newline at end of file
+        return None
+
+    def get_proof_thumb_url(self, obj):
+        url = derivative_url(obj.proof_image, 'thumb')
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def get_proof_reused(self, obj):
+        return proof_reused(self, obj)
+
+    def get_tx_id_matches(self, obj):
+        return tx_id_matches(self, obj)
\ No newline at end of file
@@ -5,13 +5,25 @@ from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.utils import timezone
 
-from apps.earnings.models_global_pool import GlobalPool
-from apps.referrals.services import pay_on_package_purchase
+from apps.earnings.global_pool import add_pool_contribution
+from core.images import watch_image_fields
+from apps.referrals.services import pay_on_package_purchase, record_team_approval_change
 from apps.wallets.models import Wallet, Transaction, DepositRequest
+from apps.wallets.fx import get_fx_rate
+from .models import SignupProof
 
 User = get_user_model()
 
 
+@receiver(post_save, sender=User)
+def on_user_approval_changed(sender, instance: User, created, **kwargs):
+    # Keep upline team counters in sync when is_approved flips (either direction)
+    loaded = getattr(instance, '_loaded_is_approved', None)
+    if not created and loaded is not None and loaded != instance.is_approved:
+        record_team_approval_change([instance.id], approved=instance.is_approved)
+    instance._loaded_is_approved = instance.is_approved
+
+
 @receiver(post_save, sender=User)
 def on_user_approved(sender, instance: User, created, **kwargs):
     # Trigger only when approval status changes to True (admin action)
@@ -45,7 +57,6 @@ def on_user_approved(sender, instance: User, created, **kwargs):
         if not already_contributed:
             current_day = timezone.now().weekday()  # Monday = 0, Sunday = 6
             if current_day == 0:  # Only on Monday
-                pool, _ = GlobalPool.objects.get_or_create(pk=1)
                 try:
                     # Get actual signup amount from SignupProof
                     signup_proof = SignupProof.objects.filter(user=instance).order_by('-created_at').first()
@@ -54,7 +65,7 @@ def on_user_approved(sender, instance: User, created, **kwargs):
                     else:
                         signup_fee_pkr = Decimal(str(settings.SIGNUP_FEE_PKR))
                     
-                    rate = Decimal(str(settings.ADMIN_USD_TO_PKR))
+                    rate = get_fx_rate()
                     join_base_usd = (signup_fee_pkr / rate).quantize(Decimal('0.01'))
                     # 0.5% of signup fee for Monday joiners
                     monday_contribution = (join_base_usd * Decimal('0.005')).quantize(Decimal('0.01'))
@@ -62,8 +73,7 @@ def on_user_approved(sender, instance: User, created, **kwargs):
                     monday_contribution = Decimal('0.00')  # No fallback - only Monday joiners contribute
                 
                 if monday_contribution > 0:
-                    pool.balance_usd = (Decimal(pool.balance_usd) + monday_contribution).quantize(Decimal('0.01'))
-                    pool.save()
+                    add_pool_contribution(monday_contribution, 'monday_joining', user=instance)
                     
                     # Record the Monday joining contribution in transaction
                     Transaction.objects.create(
@@ -83,4 +93,8 @@ def on_user_approved(sender, instance: User, created, **kwargs):
         # The view properly credits the deposit to the wallet and generates passive income
         # This signal handler no longer handles deposit creation to avoid duplicates
         # NOTE: Deposit creation logic moved to apps.accounts.views.admin_signup_proof_action
-        pass
\ No newline at end of file
+        pass
+
+
+# Thumbnails / mid-size variants for uploaded signup proofs (see core.images)
+watch_image_fields(SignupProof)
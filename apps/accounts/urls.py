@@ -13,6 +13,7 @@ from .views import (
     admin_signup_proof_action,
     SignupProofPublicCreateView,
     AdminUsersListView,
+    AdminUser360View,
 )
 
 urlpatterns = [
@@ -36,4 +37,6 @@ urlpatterns = [
 
     # Admin users list with rewards and bank info
     path('admin/users/', AdminUsersListView.as_view()),
+    # Admin single-user 360 view for support investigations
+    path('admin/users/<int:pk>/360/', AdminUser360View.as_view()),
 ]
\ No newline at end of file
@@ -12,6 +12,9 @@ from .serializers import UserSerializer, SignupSerializer, SignupProofSerializer
 from .models import SignupProof
 from apps.earnings.models import PassiveEarning
 from apps.wallets.models import DepositRequest, Transaction
+from apps.referrals.services import downline_counts, record_team_deposit
+from core.images import derivative_path
+from apps.wallets.fx import fx_rate_at
 
 User = get_user_model()
 
@@ -143,6 +146,9 @@ class AdminPendingUsersView(generics.GenericAPIView):
                 'signup_proof_id': getattr(u, 'signup_proof_id', None),
                 'signup_tx_id': getattr(u, 'signup_tx_id', None) or '',
                 'signup_proof_url': build_proof_url(getattr(u, 'signup_proof_path', None)),
+                'signup_proof_thumb_url': build_proof_url(
+                    derivative_path(u.signup_proof_path, 'thumb') if getattr(u, 'signup_proof_path', None) else None
+                ),
                 'submitted_at': getattr(u, 'submitted_at', None),
             }
             for u in users
@@ -177,7 +183,7 @@ def admin_signup_proof_action(request, pk):
         
         # ===== NEW: Create deposit for signup fee to start passive income =====
         # Convert signup amount to USD using FX rate
-        fx_rate = Decimal(str(settings.ADMIN_USD_TO_PKR))
+        fx_rate, fx_rate_id = fx_rate_at()
         amount_usd = (sp.amount_pkr / fx_rate).quantize(Decimal('0.01'))
         
         # Check if signup deposit already exists for this user
@@ -193,6 +199,7 @@ def admin_signup_proof_action(request, pk):
                 amount_pkr=sp.amount_pkr,
                 amount_usd=amount_usd,
                 fx_rate=fx_rate,
+                fx_rate_record_id=fx_rate_id,
                 tx_id='SIGNUP-INIT',
                 proof_image=sp.proof_image,  # Link to signup proof
                 status='CREDITED',
@@ -201,7 +208,7 @@ def admin_signup_proof_action(request, pk):
             
             # Credit to wallet and record transaction
             from apps.wallets.models import Wallet, Transaction
-            from apps.earnings.models_global_pool import GlobalPool
+            from apps.earnings.global_pool import add_pool_contribution
             
             wallet, _ = Wallet.objects.get_or_create(user=sp.user)
             user_share_rate = Decimal(str(settings.ECONOMICS['USER_WALLET_SHARE']))
@@ -215,10 +222,8 @@ def admin_signup_proof_action(request, pk):
             wallet.hold_usd = (Decimal(wallet.hold_usd) + platform_hold).quantize(Decimal('0.01'))
             wallet.save()
             
-            # Track global pool balance
-            gp = GlobalPool.objects.first() or GlobalPool.objects.create()
-            gp.balance_usd = (Decimal(gp.balance_usd) + global_pool).quantize(Decimal('0.01'))
-            gp.save()
+            # Track global pool balance (append-only ledger row, no shared row to lock)
+            add_pool_contribution(global_pool, 'signup', user=sp.user, meta={'signup_proof_id': sp.id})
             
             # Record full deposit in transactions with breakdown
             Transaction.objects.create(
@@ -235,6 +240,7 @@ def admin_signup_proof_action(request, pk):
                     'global_pool_usd': str(global_pool),
                 }
             )
+            record_team_deposit(sp.user, amount_usd)
         
     elif action == 'REJECT':
         sp.status = 'REJECTED'
@@ -435,4 +441,128 @@ class AdminUsersListView(generics.GenericAPIView):
             'page': page,
             'page_size': page_size,
             'results': data,
-        })
\ No newline at end of file
+        })
+
+class AdminUser360View(generics.GenericAPIView):
+    """Admin endpoint returning everything support needs about one user in a single request.
+
+    Profile, wallet, category balances, deposits, withdrawals, signup proofs, passive
+    earnings timeline, referral upline/downline counts and recent ledger entries are
+    loaded with a fixed number of queries regardless of how much history the user has:
+      1. user + wallet + 3-level upline (select_related)
+      2-5. deposits, withdrawals, signup proofs, passive earnings (prefetch_related)
+      6. ledger totals grouped by transaction type and meta.type
+      7. downline counts for levels 1-3 (grouped query on the referral closure table)
+      8. recent ledger entries
+    Query params:
+      - ledger_limit (default 50, max 500)
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, pk, *args, **kwargs):
+        from apps.wallets.models import Wallet
+        from apps.wallets.serializers import DepositRequestSerializer, TransactionSerializer
+        from apps.withdrawals.models import WithdrawalRequest
+        from apps.withdrawals.serializers import WithdrawalRequestSerializer
+
+        try:
+            ledger_limit = int(request.query_params.get('ledger_limit', 50) or 50)
+        except (TypeError, ValueError):
+            return Response({'detail': 'Invalid ledger_limit'}, status=400)
+        ledger_limit = max(1, min(ledger_limit, 500))  # clamp
+
+        user = (
+            User.objects
+            .select_related('wallet', 'referred_by__referred_by__referred_by')
+            .prefetch_related(
+                models.Prefetch('deposit_requests', queryset=DepositRequest.objects.order_by('-created_at')),
+                models.Prefetch('withdraw_requests', queryset=WithdrawalRequest.objects.order_by('-created_at')),
+                models.Prefetch('signup_proofs', queryset=SignupProof.objects.order_by('-created_at')),
+                models.Prefetch('passive_earnings', queryset=PassiveEarning.objects.order_by('day_index')),
+            )
+            .filter(pk=pk)
+            .first()
+        )
+        if user is None:
+            return Response({"detail": "User not found"}, status=404)
+
+        try:
+            wallet = user.wallet
+        except Wallet.DoesNotExist:
+            wallet = None
+
+        # Category balances: one GROUP BY over the user's ledger
+        categories = []
+        recent_ledger = []
+        if wallet is not None:
+            rows = (
+                Transaction.objects
+                .filter(wallet=wallet)
+                .order_by()
+                .values('type', 'meta__type')
+                .annotate(total=Sum('amount_usd'), entries=Count('id'))
+            )
+            categories = [
+                {
+                    'direction': r['type'],
+                    'category': r['meta__type'] or 'unknown',
+                    'total_usd': str(r['total'] or 0),
+                    'entries': r['entries'],
+                }
+                for r in rows
+            ]
+            categories.sort(key=lambda c: (c['category'], c['direction']))
+            recent_ledger = TransactionSerializer(wallet.transactions.all()[:ledger_limit], many=True).data
+
+        # Upline is already joined in by select_related; no extra queries
+        upline = []
+        cur = user.referred_by
+        level = 1
+        while cur and level <= 3:
+            upline.append({'level': level, 'id': cur.id, 'username': cur.username, 'email': cur.email})
+            cur = cur.referred_by
+            level += 1
+
+        downline = downline_counts(user, max_depth=3)
+
+        ctx = {'request': request}
+        return Response({
+            'profile': {
+                'id': user.id,
+                'username': user.username,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'email': user.email,
+                'referral_code': user.referral_code,
+                'is_active': user.is_active,
+                'is_staff': user.is_staff,
+                'is_approved': user.is_approved,
+                'date_joined': user.date_joined,
+                'last_login': user.last_login,
+            },
+            'wallet': {
+                'available_usd': str(wallet.available_usd),
+                'hold_usd': str(wallet.hold_usd),
+                'income_usd': str(wallet.income_usd),
+            } if wallet is not None else None,
+            'category_balances': categories,
+            'deposits': DepositRequestSerializer(user.deposit_requests.all(), many=True, context=ctx).data,
+            'withdrawals': WithdrawalRequestSerializer(user.withdraw_requests.all(), many=True, context=ctx).data,
+            'signup_proofs': SignupProofSerializer(user.signup_proofs.all(), many=True, context=ctx).data,
+            'passive_earnings': [
+                {
+                    'day_index': pe.day_index,
+                    'percent': str(pe.percent),
+                    'amount_usd': str(pe.amount_usd),
+                    'created_at': pe.created_at,
+                }
+                for pe in user.passive_earnings.all()
+            ],
+            'referrals': {
+                'upline': upline,
+                'level1_count': downline[1],
+                'level2_count': downline[2],
+                'level3_count': downline[3],
+            },
+            'recent_ledger': recent_ledger,
+        })
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import PassiveEarning, DailyEarningsState, GlobalPoolState, GlobalPoolCollection, GlobalPoolDistribution
+from .models import PassiveEarning, DailyEarningsState, GlobalPoolState, GlobalPoolContribution, GlobalPoolCollection, GlobalPoolDistribution
 
 @admin.register(PassiveEarning)
 class PassiveEarningAdmin(admin.ModelAdmin):
@@ -13,7 +13,14 @@ class DailyEarningsStateAdmin(admin.ModelAdmin):
 @admin.register(GlobalPoolState)
 class GlobalPoolStateAdmin(admin.ModelAdmin):
     list_display = ("current_pool_usd", "last_collection_date", "last_distribution_date", "total_collected_all_time", "total_distributed_all_time")
-    readonly_fields = ("updated_at",)
+    readonly_fields = ("folded_balance_usd", "folded_through_id", "folded_at", "updated_at")
+
+@admin.register(GlobalPoolContribution)
+class GlobalPoolContributionAdmin(admin.ModelAdmin):
+    list_display = ("id", "source", "amount_usd", "user", "created_at")
+    list_filter = ("source",)
+    search_fields = ("user__username", "user__email")
+    raw_id_fields = ("user",)
 
 @admin.register(GlobalPoolCollection)
 class GlobalPoolCollectionAdmin(admin.ModelAdmin):
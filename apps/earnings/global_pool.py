@@ -0,0 +1,428 @@
+"""
+Global pool accounting and set-based Monday processing.
+
+The pool balance is an append-only ledger (GlobalPoolContribution): inflows and
+distributions are inserted as rows and never update a shared balance row. Reading the
+balance sums the rows after the checkpoint folded into GlobalPoolState.
+
+Ids are assigned before commit, so a fold must not move the checkpoint past a row that is
+still being written. On Postgres every insert holds a shared advisory lock until its
+transaction commits and the fold only runs when it gets the lock exclusively (otherwise
+it is skipped and retried by the next run); other backends fall back to FOLD_LAG.
+
+Collection and distribution run as a handful of statements regardless of the number of
+users: an INSERT ... SELECT of collections, an INSERT ... SELECT of distributions with
+conflict skipping, one bulk wallet UPDATE and an INSERT ... SELECT of ledger rows.
+Rows written by a run are stamped with the same created_at, which is how the later
+statements address exactly the rows that run inserted.
+"""
+import logging
+from datetime import datetime, time, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.utils import timezone
+from apps.wallets.models import Wallet, Transaction, DepositRequest
+from .models import GlobalPoolState, GlobalPoolContribution, GlobalPoolCollection, GlobalPoolDistribution
+from .models_global_pool import GlobalPoolPayout
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+COLLECTION_RATE = Decimal('0.005')  # 0.5% of Monday signup deposits
+USER_SHARE_RATE = Decimal('0.80')   # rest of each share goes to hold_usd
+# Without advisory locks (not Postgres), contributions younger than this are not folded:
+# a recent row with a lower id may still be invisible to the folding transaction.
+FOLD_LAG = timedelta(minutes=5)
+# Postgres advisory lock: shared by contribution inserts, exclusive while folding
+FOLD_LOCK_KEY = 0x67706F6F6C  # "gpool"
+
+
+def _advisory_lock(function: str) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {function}(%s)', [FOLD_LOCK_KEY])
+        row = cursor.fetchone()
+    return row[0] is not False
+
+
+def add_pool_contribution(amount_usd, source, user=None, meta=None, created_at=None):
+    """Append a pool ledger row (negative for outflows). Zero amounts are not recorded."""
+    amount = Decimal(amount_usd).quantize(Decimal('0.01'))
+    if not amount:
+        return None
+    row = GlobalPoolContribution(amount_usd=amount, source=source, user=user, meta=meta or {})
+    if created_at is not None:
+        row.created_at = created_at
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # Held until the (outer) transaction commits, so a fold cannot skip this id
+            _advisory_lock('pg_advisory_xact_lock_shared')
+        row.save()
+    return row
+
+
+def pool_balance(state=None, as_of=None) -> Decimal:
+    """Current pool balance: folded checkpoint plus every contribution after it.
+    With as_of, the balance from every contribution created up to that moment instead."""
+    if as_of is not None:
+        total = GlobalPoolContribution.objects.filter(created_at__lte=as_of).aggregate(total=Sum('amount_usd'))['total']
+        return (total or Decimal('0')).quantize(Decimal('0.01'))
+    if state is None:
+        state = GlobalPoolState.objects.filter(pk=1).first()
+    folded = state.folded_balance_usd if state else Decimal('0')
+    through = state.folded_through_id if state else 0
+    recent = GlobalPoolContribution.objects.filter(id__gt=through).aggregate(total=Sum('amount_usd'))['total']
+    return (Decimal(folded) + (recent or Decimal('0'))).quantize(Decimal('0.01'))
+
+
+def fold_pool_contributions(now=None) -> int:
+    """Fold settled contributions into the GlobalPoolState checkpoint. Returns rows folded."""
+    with transaction.atomic():
+        GlobalPoolState.objects.get_or_create(pk=1)
+        state = GlobalPoolState.objects.select_for_update().get(pk=1)
+        pending = GlobalPoolContribution.objects.filter(id__gt=state.folded_through_id)
+        if connection.vendor == 'postgresql':
+            # Succeeds only when no insert is in flight: every id handed out so far is committed
+            if not _advisory_lock('pg_try_advisory_xact_lock'):
+                logger.info("⏭️ Global pool contributions are being written, fold skipped")
+                return 0
+        else:
+            cutoff = (now or timezone.now()) - FOLD_LAG
+            first_recent = pending.filter(created_at__gte=cutoff).aggregate(first=Min('id'))['first']
+            if first_recent is not None:
+                pending = pending.filter(id__lt=first_recent)
+        agg = pending.aggregate(through=Max('id'), total=Sum('amount_usd'), n=Count('id'))
+        if not agg['n']:
+            return 0
+        state.folded_balance_usd = (Decimal(state.folded_balance_usd) + agg['total']).quantize(Decimal('0.01'))
+        state.folded_through_id = agg['through']
+        state.folded_at = timezone.now()
+        state.save(update_fields=['folded_balance_usd', 'folded_through_id', 'folded_at', 'updated_at'])
+    logger.info(f"🧮 Folded {agg['n']} global pool contributions through id {agg['through']}")
+    return agg['n']
+
+
+def _prep(model, field_name, value):
+    """Adapt a Python value for a raw SQL parameter the same way the ORM would."""
+    return model._meta.get_field(field_name).get_db_prep_value(value, connection, prepared=False)
+
+
+def _col(model, field_name):
+    return connection.ops.quote_name(model._meta.get_field(field_name).column)
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def monday_bounds(monday_date):
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(monday_date, time.min), tz),
+        timezone.make_aware(datetime.combine(monday_date, time.max), tz),
+    )
+
+
+def collect_global_pool(monday_date, as_of=None):
+    """Collect 0.5% of every credited SIGNUP-INIT deposit made on monday_date.
+    as_of backdates the pool contribution (catch-up of a missed Monday).
+    Returns {'count', 'total_usd'} for the rows added, or None if already collected."""
+    start, end = monday_bounds(monday_date)
+    now = timezone.now()
+    with transaction.atomic():
+        GlobalPoolState.objects.get_or_create(pk=1)
+        pool_state = GlobalPoolState.objects.select_for_update().get(pk=1)
+        if pool_state.last_collection_date == monday_date:
+            return None
+
+        C, D = GlobalPoolCollection, DepositRequest
+        # One row per user (unique user/collection_date); the earliest deposit wins
+        sql = (
+            f"INSERT INTO {_table(C)} ({_col(C, 'user')}, {_col(C, 'signup_amount_usd')}, "
+            f"{_col(C, 'collection_amount_usd')}, {_col(C, 'collection_date')}, {_col(C, 'created_at')}) "
+            f"SELECT d.{_col(D, 'user')}, d.{_col(D, 'amount_usd')}, ROUND(d.{_col(D, 'amount_usd')} * %s, 2), %s, %s "
+            f"FROM {_table(D)} d "
+            f"WHERE d.{_col(D, 'tx_id')} = %s AND d.{_col(D, 'status')} = %s "
+            f"AND d.{_col(D, 'created_at')} >= %s AND d.{_col(D, 'created_at')} <= %s "
+            f"ORDER BY d.{_col(D, 'id')} "
+            f"ON CONFLICT ({_col(C, 'user')}, {_col(C, 'collection_date')}) DO NOTHING"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [
+                COLLECTION_RATE,
+                _prep(C, 'collection_date', monday_date),
+                _prep(C, 'created_at', now),
+                'SIGNUP-INIT', 'CREDITED',
+                _prep(D, 'created_at', start),
+                _prep(D, 'created_at', end),
+            ])
+            count = cursor.rowcount
+
+        total = Decimal('0.00')
+        if count:
+            # Users whose Monday joining contribution was already booked by the approval
+            # signal are recorded as collected but not added to the pool a second time
+            total = (
+                GlobalPoolCollection.objects.filter(collection_date=monday_date, created_at=now)
+                .exclude(user__global_pool_contributions__source='monday_joining')
+                .aggregate(total=Sum('collection_amount_usd'))['total'] or Decimal('0')
+            ).quantize(Decimal('0.01'))
+            add_pool_contribution(
+                total, 'collection', meta={'collection_date': str(monday_date), 'count': count}, created_at=as_of,
+            )
+        pool_state.total_collected_all_time = F('total_collected_all_time') + total
+        pool_state.last_collection_date = monday_date
+        pool_state.save(update_fields=['total_collected_all_time', 'last_collection_date', 'updated_at'])
+
+    logger.info(f"📥 Global pool collection for {monday_date}: ${total} from {count} signups")
+    return {'count': count, 'total_usd': total}
+
+
+def _cents(value) -> int:
+    return int((Decimal(value) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _usd(cents: int) -> Decimal:
+    return (Decimal(cents) / 100).quantize(Decimal('0.01'))
+
+
+def _recipients(as_of=None):
+    wallets = Wallet.objects.all()
+    if as_of is not None:
+        wallets = wallets.filter(user__date_joined__lte=as_of)
+    return wallets
+
+
+def plan_global_pool_distribution(state=None, sample_size=0, as_of=None) -> dict:
+    """Compute a distribution of the current pool without writing anything.
+
+    The pool is split in integer cents across every user with a wallet; the leftover
+    cents (largest remainder) go one each to the lowest user ids, so the allocation sums
+    to the pool exactly. That yields at most two amount groups. Each gross share is split
+    into user share (USER_SHARE_RATE, rounded half up) and hold (the rest).
+    With as_of, uses the pool balance and the users who had joined at that moment.
+    """
+    pool_amount = pool_balance(state, as_of)
+    recipients = _recipients(as_of).aggregate(n=Count('id'))['n']
+    plan = {
+        'pool_usd': pool_amount,
+        'recipients': recipients,
+        'threshold_user_id': None,
+        'groups': [],
+        'total_gross_usd': Decimal('0.00'),
+        'total_user_share_usd': Decimal('0.00'),
+        'total_hold_usd': Decimal('0.00'),
+        'sample': [],
+    }
+    pool_cents = _cents(pool_amount)
+    if not recipients or pool_cents <= 0:
+        return plan
+
+    base, remainder = divmod(pool_cents, recipients)
+    if remainder:
+        plan['threshold_user_id'] = _recipients(as_of).order_by('user_id').values_list('user_id', flat=True)[remainder - 1]
+    bands = []
+    if remainder:
+        bands.append(('lte', remainder, base + 1))
+    if base:
+        bands.append(('gt' if remainder else None, recipients - remainder, base))
+    for band, users, gross in bands:
+        share = _cents(_usd(gross) * USER_SHARE_RATE)
+        group = {
+            'user_ids': band,  # 'lte' / 'gt' threshold_user_id, None for everyone
+            'users': users,
+            'gross_usd': _usd(gross),
+            'user_share_usd': _usd(share),
+            'platform_hold_usd': _usd(gross - share),
+        }
+        plan['groups'].append(group)
+        plan['total_gross_usd'] += _usd(gross * users)
+        plan['total_user_share_usd'] += _usd(share * users)
+        plan['total_hold_usd'] += _usd((gross - share) * users)
+
+    if sample_size:
+        for user_id in _recipients(as_of).order_by('user_id').values_list('user_id', flat=True)[:sample_size]:
+            group = _group_for(plan, user_id)
+            if group:
+                plan['sample'].append({
+                    'user_id': user_id,
+                    'gross_usd': group['gross_usd'],
+                    'user_share_usd': group['user_share_usd'],
+                    'platform_hold_usd': group['platform_hold_usd'],
+                })
+    return plan
+
+
+def _group_for(plan, user_id):
+    for group in plan['groups']:
+        band = group['user_ids']
+        if band is None or (band == 'lte') == (user_id <= plan['threshold_user_id']):
+            return group
+    return None
+
+
+def distribute_global_pool(monday_date, as_of=None):
+    """Distribute the whole pool across every user with a wallet, per plan_global_pool_distribution.
+    as_of restricts the pool and recipients to that moment and backdates the pool outflow.
+    Returns {'count', 'total_users', 'pool_usd', 'distributed_usd', 'per_user_usd'}, or None if there is
+    nothing to distribute or monday_date was already distributed."""
+    now = timezone.now()
+    with transaction.atomic():
+        GlobalPoolState.objects.get_or_create(pk=1)
+        pool_state = GlobalPoolState.objects.select_for_update().get(pk=1)
+        if pool_state.last_distribution_date == monday_date:
+            return None
+        plan = plan_global_pool_distribution(pool_state, as_of=as_of)
+        if not plan['groups']:
+            if not plan['recipients']:
+                logger.warning("⚠️ No active users to distribute to")
+            return None
+        pool_amount = plan['pool_usd']
+        total_users = plan['recipients']
+
+        G, W, T, U = GlobalPoolDistribution, Wallet, Transaction, User
+        joined_sql, joined_params = '', []
+        if as_of is not None:
+            joined_sql = (
+                f" AND EXISTS (SELECT 1 FROM {_table(U)} u WHERE u.{_col(U, 'id')} = w.{_col(W, 'user')} "
+                f"AND u.{_col(U, 'date_joined')} <= %s)"
+            )
+            joined_params = [_prep(U, 'date_joined', as_of)]
+        meta_param = '%s::jsonb' if connection.vendor == 'postgresql' else '%s'
+        count = 0
+        distributed = Decimal('0.00')
+        with connection.cursor() as cursor:
+            for group in plan['groups']:
+                band_sql, band_params = '1 = 1', []
+                if group['user_ids'] is not None:
+                    band_sql = f"w.{_col(W, 'user')} {'<=' if group['user_ids'] == 'lte' else '>'} %s"
+                    band_params = [plan['threshold_user_id']]
+                cursor.execute(
+                    f"INSERT INTO {_table(G)} ({_col(G, 'user')}, {_col(G, 'amount_usd')}, {_col(G, 'distribution_date')}, "
+                    f"{_col(G, 'total_pool_amount')}, {_col(G, 'total_users')}, {_col(G, 'created_at')}) "
+                    f"SELECT w.{_col(W, 'user')}, %s, %s, %s, %s, %s FROM {_table(W)} w WHERE {band_sql}{joined_sql} "
+                    f"ON CONFLICT ({_col(G, 'user')}, {_col(G, 'distribution_date')}) DO NOTHING",
+                    [
+                        _prep(G, 'amount_usd', group['gross_usd']),
+                        _prep(G, 'distribution_date', monday_date),
+                        _prep(G, 'total_pool_amount', pool_amount),
+                        total_users,
+                        _prep(G, 'created_at', now),
+                    ] + band_params + joined_params,
+                )
+                inserted = cursor.rowcount
+                if not inserted:
+                    continue
+                count += inserted
+                distributed += group['gross_usd'] * inserted
+
+                recipients = GlobalPoolDistribution.objects.filter(
+                    distribution_date=monday_date, created_at=now, amount_usd=group['gross_usd'],
+                )
+                Wallet.objects.filter(user_id__in=recipients.values('user_id')).update(
+                    income_usd=F('income_usd') + group['user_share_usd'],
+                    hold_usd=F('hold_usd') + group['platform_hold_usd'],
+                )
+                meta = {
+                    'type': 'global_pool',
+                    'distribution_date': str(monday_date),
+                    'total_pool': str(pool_amount),
+                    'total_users': total_users,
+                    'user_share': str(group['user_share_usd']),
+                    'platform_hold': str(group['platform_hold_usd']),
+                }
+                cursor.execute(
+                    f"INSERT INTO {_table(T)} ({_col(T, 'wallet')}, {_col(T, 'type')}, {_col(T, 'amount_usd')}, "
+                    f"{_col(T, 'meta')}, {_col(T, 'created_at')}) "
+                    f"SELECT w.{_col(W, 'id')}, %s, %s, {meta_param}, %s "
+                    f"FROM {_table(W)} w JOIN {_table(G)} g ON g.{_col(G, 'user')} = w.{_col(W, 'user')} "
+                    f"WHERE g.{_col(G, 'distribution_date')} = %s AND g.{_col(G, 'created_at')} = %s "
+                    f"AND g.{_col(G, 'amount_usd')} = %s",
+                    [
+                        Transaction.CREDIT,
+                        _prep(T, 'amount_usd', group['gross_usd']),
+                        _prep(T, 'meta', meta),
+                        _prep(T, 'created_at', now),
+                        _prep(G, 'distribution_date', monday_date),
+                        _prep(G, 'created_at', now),
+                        _prep(G, 'amount_usd', group['gross_usd']),
+                    ],
+                )
+
+        distributed = distributed.quantize(Decimal('0.01'))
+        per_user_amount = plan['groups'][-1]['gross_usd']
+        add_pool_contribution(-distributed, 'distribution', meta={
+            'distribution_date': str(monday_date), 'count': count, 'per_user': str(per_user_amount),
+        }, created_at=as_of)
+        GlobalPoolPayout.objects.create(amount_usd=distributed, meta={
+            'distribution_date': str(monday_date),
+            'count': count,
+            'total_users': total_users,
+            'pool_before_usd': str(pool_amount),
+            'groups': [
+                {'users': g['users'], 'gross_usd': str(g['gross_usd']), 'user_share_usd': str(g['user_share_usd']),
+                 'platform_hold_usd': str(g['platform_hold_usd'])}
+                for g in plan['groups']
+            ],
+        })
+        pool_state.total_distributed_all_time = F('total_distributed_all_time') + distributed
+        pool_state.last_distribution_date = monday_date
+        pool_state.save(update_fields=['total_distributed_all_time', 'last_distribution_date', 'updated_at'])
+
+    logger.info(f"📤 Global pool distribution for {monday_date}: ${distributed} to {count} users (${per_user_amount} base each)")
+    return {
+        'count': count, 'total_users': total_users, 'pool_usd': pool_amount,
+        'distributed_usd': distributed, 'per_user_usd': per_user_amount,
+    }
+
+
+def missed_mondays(today=None, state=None) -> list:
+    """Mondays up to today whose collection or distribution has not run, oldest first.
+    Without any recorded run only the most recent Monday is considered."""
+    today = today or timezone.localdate()
+    latest = today - timedelta(days=today.weekday())
+    if state is None:
+        state = GlobalPoolState.objects.filter(pk=1).first()
+    done = [d for d in (state.last_collection_date, state.last_distribution_date) if d] if state else []
+    if len(done) < 2:
+        return [latest]
+    oldest_done = min(done)
+    first = oldest_done + timedelta(days=7 - oldest_done.weekday())
+    mondays = []
+    monday = first
+    while monday <= latest:
+        mondays.append(monday)
+        monday += timedelta(days=7)
+    return mondays
+
+
+def catch_up_global_pool(today=None) -> list:
+    """Collect and distribute every missed Monday in order, in one transaction.
+
+    Each Monday uses its own signups (deposits made that day), its own recipients (users
+    joined by the end of that Monday) and the pool balance as of then; its pool rows are
+    stamped with that moment so the following Mondays see the right balance.
+    Returns [{'monday', 'collected', 'distributed'}] for the Mondays processed.
+    """
+    results = []
+    with transaction.atomic():
+        GlobalPoolState.objects.get_or_create(pk=1)
+        state = GlobalPoolState.objects.select_for_update().get(pk=1)
+        for monday in missed_mondays(today, state):
+            as_of = min(monday_bounds(monday)[1], timezone.now())
+            collected = None
+            if state.last_collection_date is None or state.last_collection_date < monday:
+                collected = collect_global_pool(monday, as_of=as_of)
+            distributed = None
+            if state.last_distribution_date is None or state.last_distribution_date < monday:
+                distributed = distribute_global_pool(monday, as_of=as_of)
+                if distributed is None:
+                    # Nothing to pay out that week still counts as handled
+                    GlobalPoolState.objects.filter(pk=1).update(last_distribution_date=monday)
+            state.refresh_from_db()
+            results.append({'monday': monday, 'collected': collected, 'distributed': distributed})
+    if results:
+        logger.info(f"🗓️ Global pool catch-up processed {len(results)} Monday(s): {[str(r['monday']) for r in results]}")
+    return results
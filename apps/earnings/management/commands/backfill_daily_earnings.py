@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from apps.wallets.models import Wallet, Transaction, DepositRequest
+from apps.wallets.fx import convert_many
 from apps.earnings.models import PassiveEarning
 from apps.earnings.services import compute_daily_earning_usd
 from apps.referrals.services import record_direct_first_investment
@@ -123,7 +124,7 @@ class Command(BaseCommand):
                 f"\nBackfill complete!"
                 f"\nUsers processed: {total_users_processed}"
                 f"\nTotal earnings generated: {total_earnings_generated} USD"
-                f"\nTotal earnings in PKR: {total_earnings_generated * 280} PKR"
+                f"\nTotal earnings in PKR: {convert_many([total_earnings_generated])[0]} PKR"
             )
         )
         
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from apps.wallets.models import Wallet, Transaction, DepositRequest
+from apps.wallets.fx import convert_many
 from apps.earnings.models import PassiveEarning
 from apps.earnings.services import compute_daily_earning_usd
 from apps.referrals.services import record_direct_first_investment
@@ -146,7 +147,7 @@ class Command(BaseCommand):
                 self.stdout.write(
                     self.style.SUCCESS(
                         f"   ✅ Completed: {expected_day_index - current_day_index} days processed, "
-                        f"Total: ${user_total_earnings} (₨{float(user_total_earnings) * 280:,.2f})"
+                        f"Total: ${user_total_earnings} (₨{convert_many([user_total_earnings])[0]:,.2f})"
                     )
                 )
         
@@ -157,7 +158,7 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS("="*70))
         self.stdout.write(self.style.SUCCESS(f"👥 Users Processed: {total_users_processed}"))
         self.stdout.write(self.style.SUCCESS(f"💵 Total Earnings Generated: ${total_earnings_generated}"))
-        self.stdout.write(self.style.SUCCESS(f"💵 Total Earnings (PKR): ₨{float(total_earnings_generated) * 280:,.2f}"))
+        self.stdout.write(self.style.SUCCESS(f"💵 Total Earnings (PKR): ₨{convert_many([total_earnings_generated])[0]:,.2f}"))
         
         if dry_run:
             self.stdout.write("")
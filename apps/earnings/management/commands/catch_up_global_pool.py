@@ -0,0 +1,53 @@
+"""
+Global Pool Catch-up Command
+
+Finds every Monday whose collection or distribution never ran (e.g. the instance slept
+through it) by comparing GlobalPoolState's last collection/distribution dates with the
+calendar, then processes them oldest first in one transaction. Each Monday uses its own
+signup deposits, its own recipients (users joined by the end of that Monday) and the
+pool balance as of that Monday.
+
+Usage:
+    python manage.py catch_up_global_pool           # Process all missed Mondays
+    python manage.py catch_up_global_pool --list    # Only list missed Mondays
+"""
+from django.core.management.base import BaseCommand
+from apps.earnings.global_pool import catch_up_global_pool, missed_mondays, pool_balance
+
+
+class Command(BaseCommand):
+    help = 'Collect and distribute the global pool for every missed Monday, in order'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='Only list the missed Mondays',
+        )
+
+    def handle(self, *args, **options):
+        if options['list']:
+            mondays = missed_mondays()
+            if not mondays:
+                self.stdout.write(self.style.SUCCESS("✅ No missed Mondays"))
+            for monday in mondays:
+                self.stdout.write(f"  📅 {monday}")
+            return
+
+        results = catch_up_global_pool()
+        if not results:
+            self.stdout.write(self.style.SUCCESS("✅ No missed Mondays"))
+            return
+        for r in results:
+            collected = r['collected']
+            distributed = r['distributed']
+            self.stdout.write(
+                f"  📅 {r['monday']}: "
+                f"collected ${collected['total_usd'] if collected else '0.00'} "
+                f"from {collected['count'] if collected else 0} signups, "
+                f"distributed ${distributed['distributed_usd'] if distributed else '0.00'} "
+                f"to {distributed['count'] if distributed else 0} users"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Processed {len(results)} Monday(s). Pool balance: ${pool_balance()}"
+        ))
@@ -4,7 +4,8 @@ from apps.wallets.models import Wallet, Transaction, DepositRequest
 from apps.earnings.models import PassiveEarning
 from apps.earnings.services import daily_percent_for_day, compute_daily_earning_usd
 from apps.referrals.models import ReferralPayout, ReferralMilestoneProgress
-from apps.earnings.models_global_pool import GlobalPool, GlobalPoolPayout
+from apps.earnings.models_global_pool import GlobalPoolPayout
+from apps.earnings.global_pool import pool_balance
 from decimal import Decimal
 from datetime import date, timedelta
 import json
@@ -152,8 +153,7 @@ class Command(BaseCommand):
         self.stdout.write(self.style.WARNING('\n🌍 TEST 5: Global Pool System'))
         
         # Check global pool configuration
-        pool, _ = GlobalPool.objects.get_or_create(pk=1)
-        self.stdout.write(f'  💰 Current global pool balance: ${pool.balance_usd}')
+        self.stdout.write(f'  💰 Current global pool balance: ${pool_balance()}')
         
         # Check recent global pool payouts
         recent_payouts = GlobalPoolPayout.objects.all().order_by('-created_at')[:5]
@@ -264,14 +264,13 @@ class Command(BaseCommand):
         total_passive_earnings = PassiveEarning.objects.count()
         total_referral_payouts = ReferralPayout.objects.count()
         
-        pool = GlobalPool.objects.first()
-        pool_balance = pool.balance_usd if pool else 0
+        pool_balance_usd = pool_balance()
         
         self.stdout.write(f'👥 Total approved users: {total_users}')
         self.stdout.write(f'💰 Users with investments: {users_with_investments}')
         self.stdout.write(f'📈 Total passive earnings generated: {total_passive_earnings}')
         self.stdout.write(f'🔗 Total referral payouts: {total_referral_payouts}')
-        self.stdout.write(f'🌍 Global pool balance: ${pool_balance}')
+        self.stdout.write(f'🌍 Global pool balance: ${pool_balance_usd}')
         
         # System health check
         issues = []
@@ -0,0 +1,19 @@
+"""
+Fold settled global pool contributions into the GlobalPoolState checkpoint.
+
+The pool balance is folded_balance_usd plus the contributions after folded_through_id;
+folding keeps that tail short. It also runs once a day from AutoDailyEarningsMiddleware.
+
+Usage:
+    python manage.py fold_global_pool
+"""
+from django.core.management.base import BaseCommand
+from apps.earnings.global_pool import fold_pool_contributions, pool_balance
+
+
+class Command(BaseCommand):
+    help = 'Fold settled global pool contributions into the balance checkpoint'
+
+    def handle(self, *args, **options):
+        folded = fold_pool_contributions()
+        self.stdout.write(self.style.SUCCESS(f"✅ Folded {folded} contributions. Pool balance: ${pool_balance()}"))
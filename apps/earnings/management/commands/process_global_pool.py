@@ -8,25 +8,24 @@ COLLECTION (runs on Monday):
 - Adds to the current pool balance
 
 DISTRIBUTION (runs on Monday):
-- Distributes the entire pool equally among ALL active users
-- Resets the pool to 0 after distribution
+- Distributes the entire pool equally among ALL active users, in whole cents; leftover
+  cents go one each to the lowest user ids so the pool is paid out exactly
 
 Usage:
     python manage.py process_global_pool --collect    # Collect from Monday signups
     python manage.py process_global_pool --distribute # Distribute pool to all users
     python manage.py process_global_pool --both       # Do both (collect then distribute)
+    python manage.py process_global_pool --preview    # Show the next distribution without writing
 """
 
 from django.core.management.base import BaseCommand
-from django.contrib.auth import get_user_model
-from django.db import transaction
 from django.utils import timezone
-from decimal import Decimal
 from datetime import datetime, timedelta
-from apps.earnings.models import GlobalPoolState, GlobalPoolCollection, GlobalPoolDistribution
-from apps.wallets.models import Wallet, Transaction, DepositRequest
-
-User = get_user_model()
+from apps.earnings.global_pool import (
+    collect_global_pool, distribute_global_pool, plan_global_pool_distribution, pool_balance,
+)
+from apps.earnings.models import GlobalPoolState
+from apps.wallets.models import Wallet
 
 
 class Command(BaseCommand):
@@ -48,6 +47,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Collect then distribute',
         )
+        parser.add_argument(
+            '--preview',
+            action='store_true',
+            help='Show the distribution plan for the current pool without writing anything',
+        )
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=10,
+            help='Recipients to list with --preview (default 10)',
+        )
         parser.add_argument(
             '--date',
             type=str,
@@ -55,12 +65,16 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        if options['preview']:
+            self.preview_distribution(options['sample'])
+            return
+
         if options['both']:
             options['collect'] = True
             options['distribute'] = True
         
         if not options['collect'] and not options['distribute']:
-            self.stdout.write(self.style.ERROR('Please specify --collect, --distribute, or --both'))
+            self.stdout.write(self.style.ERROR('Please specify --collect, --distribute, --both or --preview'))
             return
         
         # Determine the Monday to process
@@ -88,189 +102,80 @@ class Command(BaseCommand):
         else:
             return today - timedelta(days=days_since_monday)
 
-    @transaction.atomic
     def collect_from_monday_signups(self, monday_date):
         """Collect 0.5% from all users who signed up on the specified Monday"""
         self.stdout.write(f"\n📥 COLLECTION PHASE")
         self.stdout.write(f"{'─'*60}")
-        
-        # Get or create global pool state
-        pool_state, created = GlobalPoolState.objects.get_or_create(pk=1)
-        
-        if pool_state.last_collection_date == monday_date:
+
+        result = collect_global_pool(monday_date)
+        if result is None:
             self.stdout.write(self.style.WARNING(
                 f"⚠️  Already collected for {monday_date}. Skipping collection."
             ))
             return
-        
-        # Find all SIGNUP-INIT deposits from this Monday
-        monday_start = datetime.combine(monday_date, datetime.min.time())
-        monday_end = datetime.combine(monday_date, datetime.max.time())
-        
-        signup_deposits = DepositRequest.objects.filter(
-            tx_id='SIGNUP-INIT',
-            status='CREDITED',
-            created_at__gte=monday_start,
-            created_at__lte=monday_end
-        )
-        
-        if not signup_deposits.exists():
+        if not result['count']:
             self.stdout.write(self.style.WARNING(
                 f"⚠️  No signup deposits found for {monday_date}"
             ))
-            pool_state.last_collection_date = monday_date
-            pool_state.save()
             return
-        
-        total_collected = Decimal('0')
-        collection_count = 0
-        
-        for deposit in signup_deposits:
-            # Calculate 0.5% of signup amount
-            signup_amount = deposit.amount_usd
-            collection_amount = (signup_amount * Decimal('0.005')).quantize(Decimal('0.01'))
-            
-            # Check if already collected for this user on this Monday
-            existing = GlobalPoolCollection.objects.filter(
-                user=deposit.user,
-                collection_date=monday_date
-            ).exists()
-            
-            if existing:
-                self.stdout.write(f"  ⏭️  Skipping {deposit.user.username} (already collected)")
-                continue
-            
-            # Record the collection
-            GlobalPoolCollection.objects.create(
-                user=deposit.user,
-                signup_amount_usd=signup_amount,
-                collection_amount_usd=collection_amount,
-                collection_date=monday_date
-            )
-            
-            total_collected += collection_amount
-            collection_count += 1
-            
-            self.stdout.write(
-                f"  ✅ {deposit.user.username}: ${signup_amount} signup → ${collection_amount} collected (0.5%)"
-            )
-        
-        # Update pool state
-        pool_state.current_pool_usd += total_collected
-        pool_state.total_collected_all_time += total_collected
-        pool_state.last_collection_date = monday_date
-        pool_state.save()
-        
+
         self.stdout.write(f"\n{'─'*60}")
         self.stdout.write(self.style.SUCCESS(
             f"✅ Collection Complete!\n"
-            f"   • Collected from: {collection_count} users\n"
-            f"   • Total collected: ${total_collected}\n"
-            f"   • Current pool balance: ${pool_state.current_pool_usd}"
+            f"   • Collected from: {result['count']} users\n"
+            f"   • Total collected: ${result['total_usd']}\n"
+            f"   • Current pool balance: ${pool_balance()}"
         ))
 
-    @transaction.atomic
     def distribute_pool(self, monday_date):
         """Distribute the entire pool equally among all active users"""
         self.stdout.write(f"\n📤 DISTRIBUTION PHASE")
         self.stdout.write(f"{'─'*60}")
-        
-        # Get pool state
+
         pool_state = GlobalPoolState.objects.filter(pk=1).first()
-        if not pool_state or pool_state.current_pool_usd <= 0:
+        if pool_state and pool_state.last_distribution_date == monday_date:
             self.stdout.write(self.style.WARNING(
-                f"⚠️  No pool balance to distribute (${pool_state.current_pool_usd if pool_state else 0})"
+                f"⚠️  Already distributed for {monday_date}. Skipping distribution."
             ))
             return
-        
-        if pool_state.last_distribution_date == monday_date:
+
+        result = distribute_global_pool(monday_date)
+        if result is None:
             self.stdout.write(self.style.WARNING(
-                f"⚠️  Already distributed for {monday_date}. Skipping distribution."
+                f"⚠️  Nothing distributed (pool balance ${pool_balance(pool_state)}, "
+                f"{Wallet.objects.count()} users with wallets)"
             ))
             return
-        
-        # Get all active users (users with wallets)
-        active_users = User.objects.filter(wallet__isnull=False).distinct()
-        
-        if not active_users.exists():
-            self.stdout.write(self.style.WARNING("⚠️  No active users to distribute to"))
-            return
-        
-        total_users = active_users.count()
-        pool_amount = pool_state.current_pool_usd
-        per_user_amount = (pool_amount / Decimal(total_users)).quantize(Decimal('0.01'))
-        
-        if per_user_amount <= 0:
-            self.stdout.write(self.style.WARNING("⚠️  Per-user amount is zero or negative"))
-            return
-        
-        self.stdout.write(f"\n💰 Pool Details:")
-        self.stdout.write(f"   • Total pool: ${pool_amount}")
-        self.stdout.write(f"   • Active users: {total_users}")
-        self.stdout.write(f"   • Per user: ${per_user_amount}\n")
-        
-        distribution_count = 0
-        
-        for user in active_users:
-            # Check if already distributed to this user on this Monday
-            existing = GlobalPoolDistribution.objects.filter(
-                user=user,
-                distribution_date=monday_date
-            ).exists()
-            
-            if existing:
-                self.stdout.write(f"  ⏭️  Skipping {user.username} (already distributed)")
-                continue
-            
-            # Get user's wallet
-            wallet = user.wallet
-            
-            # Credit to income_usd (80% user share)
-            user_share = (per_user_amount * Decimal('0.80')).quantize(Decimal('0.01'))
-            platform_hold = (per_user_amount * Decimal('0.20')).quantize(Decimal('0.01'))
-            
-            wallet.income_usd += user_share
-            wallet.hold_usd += platform_hold
-            wallet.save()
-            
-            # Create transaction record
-            Transaction.objects.create(
-                wallet=wallet,
-                type=Transaction.CREDIT,
-                amount_usd=per_user_amount,
-                meta={
-                    'type': 'global_pool',
-                    'distribution_date': str(monday_date),
-                    'total_pool': str(pool_amount),
-                    'total_users': total_users,
-                    'user_share': str(user_share),
-                    'platform_hold': str(platform_hold),
-                }
-            )
-            
-            # Record distribution
-            GlobalPoolDistribution.objects.create(
-                user=user,
-                amount_usd=per_user_amount,
-                distribution_date=monday_date,
-                total_pool_amount=pool_amount,
-                total_users=total_users
-            )
-            
-            distribution_count += 1
-            self.stdout.write(f"  ✅ {user.username}: ${per_user_amount} (${user_share} income + ${platform_hold} hold)")
-        
-        # Update pool state
-        pool_state.current_pool_usd = Decimal('0')
-        pool_state.total_distributed_all_time += pool_amount
-        pool_state.last_distribution_date = monday_date
-        pool_state.save()
-        
+
         self.stdout.write(f"\n{'─'*60}")
         self.stdout.write(self.style.SUCCESS(
             f"✅ Distribution Complete!\n"
-            f"   • Distributed to: {distribution_count} users\n"
-            f"   • Total distributed: ${pool_amount}\n"
-            f"   • Per user: ${per_user_amount}\n"
-            f"   • Pool balance now: ${pool_state.current_pool_usd}"
-        ))
\ No newline at end of file
+            f"   • Distributed to: {result['count']} users\n"
+            f"   • Total distributed: ${result['distributed_usd']}\n"
+            f"   • Per user: ${result['per_user_usd']}\n"
+            f"   • Pool balance now: ${pool_balance()}"
+        ))
+
+    def preview_distribution(self, sample_size):
+        """Print what distribute would do right now, without writing anything"""
+        plan = plan_global_pool_distribution(sample_size=sample_size)
+        self.stdout.write(f"\n🔍 DISTRIBUTION PREVIEW (no changes made)")
+        self.stdout.write(f"{'─'*60}")
+        self.stdout.write(f"   • Pool balance: ${plan['pool_usd']}")
+        self.stdout.write(f"   • Recipients: {plan['recipients']}")
+        if not plan['groups']:
+            self.stdout.write(self.style.WARNING("⚠️  Nothing to distribute"))
+            return
+        for group in plan['groups']:
+            self.stdout.write(
+                f"   • {group['users']} users × ${group['gross_usd']} "
+                f"(${group['user_share_usd']} income + ${group['platform_hold_usd']} hold)"
+            )
+        if plan['threshold_user_id'] is not None:
+            self.stdout.write(f"   • Extra cent for user ids <= {plan['threshold_user_id']}")
+        self.stdout.write(
+            f"   • Totals: ${plan['total_gross_usd']} gross = "
+            f"${plan['total_user_share_usd']} income + ${plan['total_hold_usd']} hold"
+        )
+        for row in plan['sample']:
+            self.stdout.write(f"     - user {row['user_id']}: ${row['gross_usd']}")
@@ -3,7 +3,6 @@ from django.contrib.auth import get_user_model
 from apps.wallets.models import Wallet, Transaction, DepositRequest
 from apps.earnings.models import PassiveEarning
 from apps.earnings.services import compute_daily_earning_usd
-from apps.earnings.models_global_pool import GlobalPool
 from decimal import Decimal
 from django.utils import timezone
 
@@ -30,7 +29,6 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING("🔍 DRY RUN MODE - No changes will be made\n"))
 
         User = get_user_model()
-        pool, _ = GlobalPool.objects.get_or_create(pk=1)
 
         # Get all users with passive earnings
         if user_id:
@@ -1,9 +1,10 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from apps.wallets.models import Wallet, Transaction, DepositRequest
+from apps.wallets.fx import convert_many
 from apps.earnings.models import PassiveEarning
 from apps.earnings.services import compute_daily_earning_usd
-from apps.earnings.models_global_pool import GlobalPool
+from apps.earnings.global_pool import add_pool_contribution, pool_balance
 from apps.referrals.services import record_direct_first_investment
 from decimal import Decimal
 from datetime import datetime, timedelta
@@ -53,7 +54,6 @@ class Command(BaseCommand):
 
         User = get_user_model()
         users = User.objects.filter(is_approved=True)
-        pool, _ = GlobalPool.objects.get_or_create(pk=1)
         
         total_users_processed = 0
         total_earnings_generated = 0
@@ -137,8 +137,7 @@ class Command(BaseCommand):
                     wallet.save()
 
                     # Collect global pool cut
-                    pool.balance_usd = (Decimal(pool.balance_usd) + metrics['global_pool_usd']).quantize(Decimal('0.01'))
-                    pool.save()
+                    add_pool_contribution(metrics['global_pool_usd'], 'passive', user=u, meta={'day_index': current_day})
                     total_global_pool_collected += metrics['global_pool_usd']
 
                     # Create transaction record for passive income display
@@ -167,9 +166,9 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f"👥 Users Processed: {total_users_processed}"))
         self.stdout.write(self.style.SUCCESS(f"💰 Total Earnings Generated: {total_earnings_generated}"))
         self.stdout.write(self.style.SUCCESS(f"💵 Total Amount: ${total_amount_usd}"))
-        self.stdout.write(self.style.SUCCESS(f"💵 Total Amount (PKR): ₨{float(total_amount_usd) * 280:,.2f}"))
+        self.stdout.write(self.style.SUCCESS(f"💵 Total Amount (PKR): ₨{convert_many([total_amount_usd])[0]:,.2f}"))
         self.stdout.write(self.style.SUCCESS(f"🏦 Global Pool Collected: ${total_global_pool_collected}"))
-        self.stdout.write(self.style.SUCCESS(f"🏦 Global Pool Balance: ${pool.balance_usd}"))
+        self.stdout.write(self.style.SUCCESS(f"🏦 Global Pool Balance: ${pool_balance()}"))
         if dry_run:
             self.stdout.write(self.style.WARNING("\n🔍 This was a DRY RUN - no changes were made"))
             self.stdout.write(self.style.WARNING("Run without --dry-run to apply changes"))
@@ -4,7 +4,7 @@ from apps.wallets.models import Wallet, Transaction, DepositRequest
 from apps.earnings.models import PassiveEarning
 from apps.earnings.services import daily_percent_for_day
 from apps.referrals.models import ReferralPayout
-from apps.earnings.models_global_pool import GlobalPool
+from apps.earnings.global_pool import pool_balance
 from decimal import Decimal
 from datetime import date
 import json
@@ -123,8 +123,7 @@ class Command(BaseCommand):
     def check_global_pool(self):
         self.stdout.write(self.style.WARNING('\n🌍 GLOBAL POOL CHECK'))
         
-        pool, created = GlobalPool.objects.get_or_create(pk=1)
-        self.stdout.write(f'  💰 Current pool balance: ${pool.balance_usd}')
+        self.stdout.write(f'  💰 Current pool balance: ${pool_balance()}')
         
         # Check if it's Monday (collection day)
         today = date.today()
@@ -176,13 +175,12 @@ class Command(BaseCommand):
         total_passive_earnings = PassiveEarning.objects.count()
         total_referral_payouts = ReferralPayout.objects.count()
         
-        pool = GlobalPool.objects.first()
-        pool_balance = pool.balance_usd if pool else 0
+        pool_balance_usd = pool_balance()
         
         self.stdout.write(f'👥 Total approved users: {total_users}')
         self.stdout.write(f'📈 Total passive earnings: {total_passive_earnings}')
         self.stdout.write(f'🔗 Total referral payouts: {total_referral_payouts}')
-        self.stdout.write(f'🌍 Global pool balance: ${pool_balance}')
+        self.stdout.write(f'🌍 Global pool balance: ${pool_balance_usd}')
         
         # Check system alignment with How It Works
         self.stdout.write(self.style.SUCCESS('\n🎯 HOW IT WORKS ALIGNMENT:'))
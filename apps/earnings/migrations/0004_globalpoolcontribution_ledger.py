@@ -0,0 +1,72 @@
+# Generated by Django 5.0.7 on 2026-10-19 17:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_legacy_pool_balance(apps, schema_editor):
+    """Carry the old GlobalPool and GlobalPoolState balances into the ledger as one row."""
+    from django.db.models import Sum
+    GlobalPool = apps.get_model('earnings', 'GlobalPool')
+    GlobalPoolState = apps.get_model('earnings', 'GlobalPoolState')
+    GlobalPoolContribution = apps.get_model('earnings', 'GlobalPoolContribution')
+    legacy_pool = GlobalPool.objects.aggregate(total=Sum('balance_usd'))['total'] or Decimal('0')
+    legacy_state = GlobalPoolState.objects.aggregate(total=Sum('current_pool_usd'))['total'] or Decimal('0')
+    total = Decimal(legacy_pool) + Decimal(legacy_state)
+    if total:
+        GlobalPoolContribution.objects.create(
+            amount_usd=total,
+            source='legacy',
+            meta={'global_pool_usd': str(legacy_pool), 'global_pool_state_usd': str(legacy_state)},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('earnings', '0003_globalpoolstate_globalpoolcollection_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GlobalPoolContribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount_usd', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('source', models.CharField(choices=[('deposit', 'Deposit cut'), ('signup', 'Signup deposit cut'), ('monday_joining', 'Monday joining'), ('passive', 'Passive earnings cut'), ('collection', 'Monday signup collection'), ('distribution', 'Distribution'), ('legacy', 'Legacy balance')], max_length=20)),
+                ('meta', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='global_pool_contributions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='globalpoolstate',
+            name='folded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='globalpoolstate',
+            name='folded_balance_usd',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='globalpoolstate',
+            name='folded_through_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(seed_legacy_pool_balance, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='GlobalPool',
+        ),
+        migrations.RemoveField(
+            model_name='globalpoolstate',
+            name='current_pool_usd',
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from decimal import Decimal
 
 class PassiveEarning(models.Model):
@@ -28,9 +29,15 @@ class DailyEarningsState(models.Model):
 
 
 class GlobalPoolState(models.Model):
-    """Singleton model to track global pool collection and distribution"""
-    # Current week's collection (resets after distribution)
-    current_pool_usd = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0'))
+    """Singleton tracking global pool collection/distribution dates and the folded balance checkpoint.
+
+    The pool balance itself lives in the append-only GlobalPoolContribution ledger:
+    balance = folded_balance_usd + sum(contributions with id > folded_through_id).
+    """
+    # Checkpoint: balance of every contribution up to and including folded_through_id
+    folded_balance_usd = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+    folded_through_id = models.BigIntegerField(default=0)
+    folded_at = models.DateTimeField(null=True, blank=True)
     
     # Tracking dates
     last_collection_date = models.DateField(null=True, blank=True)  # Last Monday we collected from
@@ -46,10 +53,41 @@ class GlobalPoolState(models.Model):
         verbose_name = "Global Pool State"
         verbose_name_plural = "Global Pool State"
     
+    @property
+    def current_pool_usd(self):
+        from .global_pool import pool_balance
+        return pool_balance(self)
+
     def __str__(self):
         return f"Pool: ${self.current_pool_usd} | Last Collection: {self.last_collection_date} | Last Distribution: {self.last_distribution_date}"
 
 
+class GlobalPoolContribution(models.Model):
+    """Append-only global pool ledger: inflows are positive, distributions negative.
+    Writers only INSERT here, so crediting deposits never contends on the pool state row."""
+    SOURCE_CHOICES = [
+        ('deposit', 'Deposit cut'),
+        ('signup', 'Signup deposit cut'),
+        ('monday_joining', 'Monday joining'),
+        ('passive', 'Passive earnings cut'),
+        ('collection', 'Monday signup collection'),
+        ('distribution', 'Distribution'),
+        ('legacy', 'Legacy balance'),
+    ]
+
+    amount_usd = models.DecimalField(max_digits=14, decimal_places=2)
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='global_pool_contributions')
+    meta = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"{self.source} ${self.amount_usd} at {self.created_at}"
+
+
 class GlobalPoolCollection(models.Model):
     """Track each collection from Monday signups"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='global_pool_collections')
@@ -1,9 +1,6 @@
 from django.db import models
 
-class GlobalPool(models.Model):
-    # accumulated USD for pool
-    balance_usd = models.DecimalField(max_digits=14, decimal_places=2, default=0)
-    updated_at = models.DateTimeField(auto_now=True)
+# Pool balance now lives in apps.earnings.models.GlobalPoolContribution (see apps.earnings.global_pool)
 
 class GlobalPoolPayout(models.Model):
     amount_usd = models.DecimalField(max_digits=14, decimal_places=2)
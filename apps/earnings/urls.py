@@ -1,11 +1,13 @@
 from django.urls import path
-from .views import MyEarningsSummary, AdminGlobalPoolView, AdminSystemOverviewView
+from .views import MyEarningsSummary, AdminGlobalPoolView, AdminGlobalPoolPreviewView, AdminSystemOverviewView
 from .admin_views import SchedulerStatusView, TriggerEarningsNowView, MiddlewareStatusView
 
 urlpatterns = [
     path('me/summary/', MyEarningsSummary.as_view()),
     # Admin global pool summary (balance, last payout, user passive totals)
     path('admin/global-pool/', AdminGlobalPoolView.as_view()),
+    # Dry run of the next distribution (no writes)
+    path('admin/global-pool/preview/', AdminGlobalPoolPreviewView.as_view()),
     # Admin system overview (economics config)
     path('admin/system-overview/', AdminSystemOverviewView.as_view()),
     # Scheduler management endpoints
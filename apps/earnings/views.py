@@ -6,7 +6,8 @@ from django.contrib.auth import get_user_model
 from django.conf import settings
 from apps.wallets.models import Wallet, Transaction
 from .models import PassiveEarning
-from .models_global_pool import GlobalPool, GlobalPoolPayout
+from .models_global_pool import GlobalPoolPayout
+from .global_pool import pool_balance, plan_global_pool_distribution
 
 
 class MyEarningsSummary(views.APIView):
@@ -36,7 +37,6 @@ class AdminGlobalPoolView(views.APIView):
 
     def get(self, request):
         # Pool balance and last payout
-        pool = GlobalPool.objects.first()
         last_payout = GlobalPoolPayout.objects.order_by('-distributed_on').first()
         
         # Top passive earners using real transaction data instead of dummy PassiveEarning records
@@ -68,7 +68,7 @@ class AdminGlobalPoolView(views.APIView):
         
         return Response({
             'payout_day': 'Monday',
-            'pool_balance_usd': str(pool.balance_usd if pool else Decimal('0.00')),
+            'pool_balance_usd': str(pool_balance()),
             'last_payout': {
                 'amount_usd': str(last_payout.amount_usd) if last_payout else None,
                 'distributed_on': last_payout.distributed_on if last_payout else None,
@@ -78,6 +78,33 @@ class AdminGlobalPoolView(views.APIView):
         })
 
 
+class AdminGlobalPoolPreviewView(views.APIView):
+    """Dry run of the next global pool distribution: recipients, per-user gross/share/hold
+    per allocation group, totals and a sample of the first recipients. Writes nothing."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        try:
+            sample_size = max(0, min(int(request.query_params.get('sample', '20')), 500))
+        except ValueError:
+            return Response({'detail': 'Invalid sample'}, status=400)
+        plan = plan_global_pool_distribution(sample_size=sample_size)
+
+        def money(row):
+            return {k: (str(v) if isinstance(v, Decimal) else v) for k, v in row.items()}
+
+        return Response({
+            'pool_balance_usd': str(plan['pool_usd']),
+            'recipients': plan['recipients'],
+            'remainder_threshold_user_id': plan['threshold_user_id'],
+            'groups': [money(g) for g in plan['groups']],
+            'total_gross_usd': str(plan['total_gross_usd']),
+            'total_user_share_usd': str(plan['total_user_share_usd']),
+            'total_hold_usd': str(plan['total_hold_usd']),
+            'sample': [money(r) for r in plan['sample']],
+        })
+
+
 class AdminSystemOverviewView(views.APIView):
     permission_classes = [permissions.IsAdminUser]
 
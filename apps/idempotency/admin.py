@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import IdempotencyRecord
+
+@admin.register(IdempotencyRecord)
+class IdempotencyRecordAdmin(admin.ModelAdmin):
+    list_display = ("owner", "route", "key", "state", "response_status", "created_at", "expires_at")
+    list_filter = ("state",)
+    search_fields = ("key", "owner")
+    exclude = ("response_body",)
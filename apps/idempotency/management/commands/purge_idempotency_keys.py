@@ -0,0 +1,33 @@
+"""
+Delete expired IdempotencyRecord rows.
+
+Expired keys are ignored (and replaced) on lookup anyway; run this daily to keep the table
+small.
+
+Usage:
+    python manage.py purge_idempotency_keys
+    python manage.py purge_idempotency_keys --batch-size 5000
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.idempotency.models import IdempotencyRecord
+
+
+class Command(BaseCommand):
+    help = 'Delete expired idempotency records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows deleted per statement')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            ids = list(
+                IdempotencyRecord.objects.filter(expires_at__lte=now)
+                .values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            deleted += IdempotencyRecord.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"✅ Purged {deleted} expired idempotency keys"))
@@ -0,0 +1,180 @@
+"""
+Idempotency-Key support for unsafe API requests.
+
+A client that may retry a POST/PUT/PATCH/DELETE sends a unique `Idempotency-Key` header.
+The first request with a key claims an IdempotencyRecord (owner, route, key) and runs the
+view; its response (anything below 500) is stored and replayed verbatim, with an
+`Idempotent-Replayed: true` header, to every retry until the record expires. A retry
+costs one indexed lookup and never reaches the view, so deposits, withdrawals, orders and
+admin actions are not applied twice.
+
+- Same key while the first request is still running -> 409 (Retry-After: 1)
+- Same key with a different body                     -> 422
+- 5xx responses are not stored, so the client can retry them with the same key
+
+The owner is the JWT user id (read from the token without a DB hit) or "anon" for guest
+checkouts. Requests without the header are not affected.
+
+Settings:
+    IDEMPOTENCY_TTL_SECONDS      how long responses are replayed (default 24h)
+    IDEMPOTENCY_LOCK_SECONDS     after this an IN_PROGRESS key is considered abandoned (default 120)
+    IDEMPOTENCY_PATH_PREFIXES    paths the middleware applies to (default ('/api/',))
+"""
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, OperationalError
+from django.http import HttpResponse, JsonResponse
+from django.http.multipartparser import MultiPartParserError
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from core.middleware import database_unavailable_response
+from .models import IdempotencyRecord
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+REPLAY_HEADER = 'Idempotent-Replayed'
+UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+MAX_KEY_LENGTH = 255
+
+
+def _ttl() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_TTL_SECONDS', 24 * 3600))
+
+
+def _lock_timeout() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_LOCK_SECONDS', 120))
+
+
+def request_owner(request):
+    """"user:<id>" from a valid bearer token, "anon" without one, None for an invalid token."""
+    parts = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if not parts:
+        return 'anon'
+    if len(parts) != 2 or parts[0] not in jwt_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        token = JWTAuthentication().get_validated_token(parts[1])
+        return f"user:{token[jwt_settings.USER_ID_CLAIM]}"
+    except (InvalidToken, KeyError):
+        return None  # the view rejects it with 401; nothing to make idempotent
+
+
+def request_fingerprint(request) -> str:
+    content_type = request.META.get('CONTENT_TYPE', '')
+    if content_type.startswith('multipart/') and request.method == 'POST':
+        # The boundary changes between retries and reading request.body would pull the whole
+        # upload into memory: fingerprint the form fields plus each file's name and size.
+        # Django spools uploads to disk and DRF reuses the parsed request.POST / FILES.
+        try:
+            fields = sorted(request.POST.lists())
+            files = sorted((field, f.name, f.size) for field, fs in request.FILES.lists() for f in fs)
+            raw = json.dumps({'fields': fields, 'files': files}).encode()
+        except MultiPartParserError:  # malformed body: the view rejects it anyway
+            raw = f"multipart:{request.META.get('CONTENT_LENGTH', '')}".encode()
+    else:
+        raw = request.body
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _replay(record) -> HttpResponse:
+    response = HttpResponse(
+        bytes(record.response_body), status=record.response_status,
+        content_type=record.response_content_type or None,
+    )
+    response[REPLAY_HEADER] = 'true'
+    return response
+
+
+class IdempotencyMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(getattr(settings, 'IDEMPOTENCY_PATH_PREFIXES', ('/api/',)))
+
+    def __call__(self, request):
+        key = request.META.get(HEADER, '').strip()
+        if not key or request.method not in UNSAFE_METHODS or not request.path.startswith(self.prefixes):
+            return self.get_response(request)
+        if len(key) > MAX_KEY_LENGTH:
+            return JsonResponse({'detail': f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters'}, status=400)
+        owner = request_owner(request)
+        if owner is None:
+            return self.get_response(request)
+
+        route = f"{request.method} {request.path}"[:255]
+        fingerprint = request_fingerprint(request)
+        try:
+            record, early = self._claim(owner, route, key, fingerprint)
+        except OperationalError as e:
+            return database_unavailable_response(e)
+        if early is not None:
+            return early
+
+        try:
+            response = self.get_response(request)
+        except Exception:
+            self._release(record, owner, route, key)
+            raise
+        if response.status_code >= 500 or response.streaming:
+            self._release(record, owner, route, key)
+            return response
+        record.state = IdempotencyRecord.DONE
+        record.response_status = response.status_code
+        record.response_body = response.content
+        record.response_content_type = response.get('Content-Type', '')
+        try:
+            record.save(update_fields=['state', 'response_status', 'response_body', 'response_content_type'])
+        except OperationalError as e:
+            # The view already ran: answer it; the key stays IN_PROGRESS until the lock times out
+            logger.error(f"❌ Could not store idempotent response for {owner} {route} [{key}]: {e}")
+        return response
+
+    def _release(self, record, owner, route, key) -> None:
+        """Drop our claim so the client can retry; keep the view's own response or error."""
+        try:
+            record.delete()
+        except OperationalError as e:
+            # Usually the same outage that failed the view: the key stays IN_PROGRESS until the lock times out
+            logger.error(f"❌ Could not release idempotency key for {owner} {route} [{key}]: {e}")
+
+    def _claim(self, owner, route, key, fingerprint):
+        """(record we own, None) to run the view, or (None, response) to answer right away."""
+        now = timezone.now()
+        for _ in range(2):
+            record = IdempotencyRecord.objects.filter(owner=owner, route=route, key=key).first()
+            if record is None:
+                try:
+                    record = IdempotencyRecord.objects.create(
+                        owner=owner, route=route, key=key, fingerprint=fingerprint, expires_at=now + _ttl(),
+                    )
+                    return record, None
+                except IntegrityError:
+                    continue  # a concurrent retry claimed it first: look again
+            if record.expires_at <= now:
+                IdempotencyRecord.objects.filter(pk=record.pk, expires_at=record.expires_at).delete()
+                continue
+            if record.fingerprint != fingerprint:
+                return None, JsonResponse(
+                    {'detail': 'Idempotency-Key was already used for a different request'}, status=422,
+                )
+            if record.state == IdempotencyRecord.DONE:
+                return None, _replay(record)
+            if record.created_at <= now - _lock_timeout():
+                # The first attempt died mid-request: take the key over
+                claimed = IdempotencyRecord.objects.filter(
+                    pk=record.pk, state=IdempotencyRecord.IN_PROGRESS, created_at=record.created_at,
+                ).update(created_at=now)
+                if claimed:
+                    logger.warning(f"⚠️ Taking over abandoned idempotency key {key} for {owner} {route}")
+                    return record, None
+            response = JsonResponse({'detail': 'A request with this Idempotency-Key is still in progress'}, status=409)
+            response['Retry-After'] = '1'
+            return None, response
+        response = JsonResponse({'detail': 'Could not claim Idempotency-Key, retry'}, status=409)
+        response['Retry-After'] = '1'
+        return None, response
@@ -0,0 +1,32 @@
+from django.db import models
+
+
+class IdempotencyRecord(models.Model):
+    """
+    One client-supplied Idempotency-Key per (owner, route). While the first request runs
+    the row is IN_PROGRESS; afterwards it holds the response that retries replay until
+    expires_at. See apps.idempotency.middleware.
+    """
+    IN_PROGRESS = 'IN_PROGRESS'
+    DONE = 'DONE'
+    STATE_CHOICES = (
+        (IN_PROGRESS, 'In progress'),
+        (DONE, 'Done'),
+    )
+
+    owner = models.CharField(max_length=64)  # "user:<id>" or "anon"
+    route = models.CharField(max_length=255)  # "<METHOD> <path>"
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)  # sha256 of the request body
+    state = models.CharField(max_length=12, choices=STATE_CHOICES, default=IN_PROGRESS)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.BinaryField(blank=True, default=b'')
+    response_content_type = models.CharField(max_length=100, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = [['owner', 'route', 'key']]
+
+    def __str__(self):
+        return f"{self.owner} {self.route} [{self.key}]"
@@ -1,12 +1,42 @@
 from django.contrib import admin
-from .models import Product, Order
+from .models import Product, Order, OrderItem, SellerSalesStats, ProductSalesStats, DailySalesStats
+from .services import set_order_status
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ("title", "seller", "price_usd", "is_active", "created_at")
-    list_filter = ("is_active",)
+    list_display = ("title", "seller", "category", "price_usd", "is_active", "created_at")
+    list_filter = ("is_active", "category")
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    extra = 0
+    readonly_fields = ("product", "quantity", "unit_price_usd", "line_total_usd")
+    can_delete = False
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ("buyer", "product", "quantity", "total_usd", "status", "created_at")
-    list_filter = ("status",)
\ No newline at end of file
+    inlines = [OrderItemInline]
+    list_display = ("buyer", "product", "quantity", "total_usd", "status", "paid_at", "created_at")
+    list_filter = ("status",)
+    readonly_fields = ("paid_at",)
+
+    def save_model(self, request, obj, form, change):
+        # Status changes go through the service so the sales rollups stay in sync
+        new_status = obj.status
+        obj.status = Order.objects.values_list('status', flat=True).get(pk=obj.pk) if change else 'PENDING'
+        super().save_model(request, obj, form, change)
+        if new_status != obj.status:
+            set_order_status(obj.pk, new_status)
+
+@admin.register(SellerSalesStats)
+class SellerSalesStatsAdmin(admin.ModelAdmin):
+    list_display = ("seller", "units_sold", "revenue_usd", "orders_count", "updated_at")
+
+@admin.register(ProductSalesStats)
+class ProductSalesStatsAdmin(admin.ModelAdmin):
+    list_display = ("product", "seller", "units_sold", "revenue_usd", "orders_count", "updated_at")
+
+@admin.register(DailySalesStats)
+class DailySalesStatsAdmin(admin.ModelAdmin):
+    list_display = ("seller", "day", "units_sold", "revenue_usd", "orders_count")
+    list_filter = ("day",)
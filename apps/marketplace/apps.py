@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class MarketplaceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.marketplace'
\ No newline at end of file
+    name = 'apps.marketplace'
+
+    def ready(self) -> None:
+        from . import signals  # noqa
+        return super().ready()
@@ -0,0 +1,76 @@
+"""
+Public product catalog: cursor-paginated, filterable and served from cache.
+
+Every rendered page is cached for CATALOG_CACHE_SECONDS under a key made of the catalog
+version, the request host and the normalized query string. Any product save/delete (and a
+finished image derivative job) bumps the version, so stale pages are never looked up again
+and simply expire. The ETag is a hash of the rendered page, stored next to it, so a repeat
+visitor gets a 304 from a cache hit and a changed page always gets a new ETag.
+
+The version lives in the default cache: point CACHES at a shared backend (REDIS_URL) when
+running several workers, otherwise each process only sees its own bumps and picks up
+changes made elsewhere when its cached page expires.
+
+Usage:
+    GET /api/marketplace/catalog/?q=<text>&category=<name>&limit=<n>&cursor=<opaque>
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import JSONRenderer
+
+VERSION_KEY = 'marketplace:catalog:version'
+PAGE_KEY = 'marketplace:catalog:page:{version}:{digest}'
+CATALOG_PARAMS = ('q', 'category', 'limit', 'cursor')
+
+
+def cache_seconds() -> int:
+    return int(getattr(settings, 'CATALOG_CACHE_SECONDS', 300))
+
+
+def catalog_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version() -> None:
+    """Invalidate every cached catalog page (called on product changes)."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:  # key missing or evicted
+        cache.set(VERSION_KEY, 2, timeout=None)
+
+
+def page_key(request, version: int) -> str:
+    """Cache key for the catalog page `request` asks for at `version`."""
+    params = '&'.join(f'{p}={request.query_params.get(p, "")}' for p in CATALOG_PARAMS)
+    raw = f'{request.scheme}://{request.get_host()}?{params}'
+    digest = hashlib.sha1(raw.encode()).hexdigest()
+    return PAGE_KEY.format(version=version, digest=digest)
+
+
+def page_etag(data) -> str:
+    """ETag of a rendered catalog page: changes whenever its content does."""
+    return f'"catalog-{hashlib.sha1(JSONRenderer().render(data)).hexdigest()[:20]}"'
+
+
+def filter_catalog(queryset, request):
+    q = (request.query_params.get('q') or '').strip()
+    category = (request.query_params.get('category') or '').strip()
+    if category:
+        queryset = queryset.filter(category=category)
+    if q:
+        queryset = queryset.filter(Q(title__icontains=q) | Q(description__icontains=q))
+    return queryset
+
+
+class CatalogPagination(CursorPagination):
+    page_size = 24
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,19 @@
+"""
+Recompute the seller, product and daily sales rollups from PAID orders.
+
+Rollups are maintained incrementally when an order moves to or from PAID; run this to
+repair drift after manual data fixes.
+
+Usage:
+    python manage.py rebuild_sales_stats
+"""
+from django.core.management.base import BaseCommand
+from apps.marketplace.services import rebuild_sales_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild SellerSalesStats, ProductSalesStats and DailySalesStats from PAID orders'
+
+    def handle(self, *args, **options):
+        written = rebuild_sales_stats()
+        self.stdout.write(self.style.SUCCESS(f"✅ Sales stats rebuilt: {written} rows"))
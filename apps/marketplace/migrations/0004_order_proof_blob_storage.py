@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:09
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0003_order_proof_image'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='proof_image',
+            field=models.ImageField(blank=True, db_index=True, null=True, storage=core.storage.proof_storage, upload_to='orders/'),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_sales_stats(apps, schema_editor):
+    """Stamp existing PAID orders with paid_at = created_at and build the rollups from them."""
+    from django.db.models import Count, F, Sum
+    from django.db.models.functions import TruncDate
+    Order = apps.get_model('marketplace', 'Order')
+    SellerSalesStats = apps.get_model('marketplace', 'SellerSalesStats')
+    ProductSalesStats = apps.get_model('marketplace', 'ProductSalesStats')
+    DailySalesStats = apps.get_model('marketplace', 'DailySalesStats')
+    paid = Order.objects.filter(status='PAID')
+    paid.filter(paid_at__isnull=True).update(paid_at=F('created_at'))
+    sellers = {}
+    products = []
+    for r in (
+        paid.values('product_id', 'product__seller_id')
+        .annotate(units=Sum('quantity'), revenue=Sum('total_usd'), orders=Count('id'))
+        .order_by()
+    ):
+        products.append(ProductSalesStats(
+            product_id=r['product_id'], seller_id=r['product__seller_id'],
+            units_sold=r['units'], revenue_usd=r['revenue'], orders_count=r['orders'],
+        ))
+        s = sellers.setdefault(r['product__seller_id'], SellerSalesStats(seller_id=r['product__seller_id']))
+        s.units_sold += r['units']
+        s.revenue_usd += r['revenue']
+        s.orders_count += r['orders']
+    days = [
+        DailySalesStats(
+            seller_id=r['product__seller_id'], day=r['day'],
+            units_sold=r['units'], revenue_usd=r['revenue'], orders_count=r['orders'],
+        )
+        for r in (
+            paid.annotate(day=TruncDate('paid_at'))
+            .values('product__seller_id', 'day')
+            .annotate(units=Sum('quantity'), revenue=Sum('total_usd'), orders=Count('id'))
+            .order_by()
+        )
+    ]
+    SellerSalesStats.objects.bulk_create(sellers.values(), batch_size=1000)
+    ProductSalesStats.objects.bulk_create(products, batch_size=1000)
+    DailySalesStats.objects.bulk_create(days, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0005_product_category_catalog_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='paid_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='SellerSalesStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('units_sold', models.PositiveIntegerField(default=0)),
+                ('revenue_usd', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('seller', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sales_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Seller Sales Stats',
+                'verbose_name_plural': 'Seller Sales Stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('units_sold', models.PositiveIntegerField(default=0)),
+                ('revenue_usd', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Daily Sales Stats',
+                'verbose_name_plural': 'Daily Sales Stats',
+                'indexes': [models.Index(fields=['day'], name='dailysales_day_idx')],
+                'unique_together': {('seller', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductSalesStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('units_sold', models.PositiveIntegerField(default=0)),
+                ('revenue_usd', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sales_stats', to='marketplace.product')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_sales_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Product Sales Stats',
+                'verbose_name_plural': 'Product Sales Stats',
+                'indexes': [models.Index(fields=['units_sold'], name='prodstats_units_idx'), models.Index(fields=['seller', 'units_sold'], name='prodstats_seller_units_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_sales_stats, migrations.RunPython.noop),
+    ]
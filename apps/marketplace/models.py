@@ -1,4 +1,5 @@
 from django.db import models
+from core.storage import proof_storage
 from django.conf import settings
 
 class Product(models.Model):
@@ -6,15 +7,28 @@ class Product(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
     price_usd = models.DecimalField(max_digits=12, decimal_places=2)
+    category = models.CharField(max_length=64, blank=True, default='')
     image = models.ImageField(upload_to='products/', null=True, blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Public catalog pages (newest first), optionally within one category; partial
+            # because a bare boolean filter cannot seek into a (is_active, ...) index on SQLite
+            models.Index(fields=['created_at', 'id'], name='prod_active_created_idx', condition=models.Q(is_active=True)),
+            models.Index(
+                fields=['category', 'created_at', 'id'], name='prod_active_cat_created_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
+
 class Order(models.Model):
     # If buyer is logged in, set this; else allow guest checkout
     buyer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='orders', null=True, blank=True)
-    product = models.ForeignKey(Product, on_delete=models.CASCADE)
-    quantity = models.PositiveIntegerField(default=1)
+    # Single-product order; cart checkouts leave this empty and list their products in items
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, null=True, blank=True)
+    quantity = models.PositiveIntegerField(default=1)  # total units for cart checkouts
     total_usd = models.DecimalField(max_digits=12, decimal_places=2)
     status = models.CharField(max_length=20, default='PENDING')  # PENDING/PAID/CANCELLED
     # Guest checkout details
@@ -22,5 +36,65 @@ class Order(models.Model):
     guest_phone = models.CharField(max_length=50, blank=True, default='')
     guest_email = models.EmailField(blank=True, default='')
     tx_id = models.CharField(max_length=255, blank=True, default='')
-    proof_image = models.ImageField(upload_to='orders/', null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    proof_image = models.ImageField(upload_to='orders/', null=True, blank=True, storage=proof_storage, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    paid_at = models.DateTimeField(null=True, blank=True)  # when the order last moved to PAID; buckets the daily rollup
+
+
+
+class OrderItem(models.Model):
+    """One product line of a cart checkout, with the unit price snapshotted at checkout."""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='order_items')
+    quantity = models.PositiveIntegerField()
+    unit_price_usd = models.DecimalField(max_digits=12, decimal_places=2)
+    line_total_usd = models.DecimalField(max_digits=12, decimal_places=2)
+
+
+class SellerSalesStats(models.Model):
+    """Per-seller totals of PAID orders, kept up to date by services.set_order_status so
+    seller dashboards read one row. Rebuild with `rebuild_sales_stats`.
+    """
+    seller = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sales_stats')
+    units_sold = models.PositiveIntegerField(default=0)
+    revenue_usd = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    orders_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Seller Sales Stats"
+        verbose_name_plural = "Seller Sales Stats"
+
+
+class ProductSalesStats(models.Model):
+    """Per-product totals of PAID orders (same maintenance as SellerSalesStats)."""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name='sales_stats')
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='product_sales_stats')
+    units_sold = models.PositiveIntegerField(default=0)
+    revenue_usd = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    orders_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Product Sales Stats"
+        verbose_name_plural = "Product Sales Stats"
+        indexes = [
+            # Top-product rankings, overall and per seller
+            models.Index(fields=['units_sold'], name='prodstats_units_idx'),
+            models.Index(fields=['seller', 'units_sold'], name='prodstats_seller_units_idx'),
+        ]
+
+
+class DailySalesStats(models.Model):
+    """Per-seller daily buckets of PAID orders, keyed by the order's paid_at date."""
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_sales_stats')
+    day = models.DateField()
+    units_sold = models.PositiveIntegerField(default=0)
+    revenue_usd = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    orders_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Daily Sales Stats"
+        verbose_name_plural = "Daily Sales Stats"
+        unique_together = [['seller', 'day']]
+        indexes = [models.Index(fields=['day'], name='dailysales_day_idx')]
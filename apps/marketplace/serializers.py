@@ -1,8 +1,17 @@
+import json
 from rest_framework import serializers
-from .models import Product, Order
+from core.images import derivative_url
+from core.storage import proof_reused
+from core.uploads import BoundedImageField
+from apps.wallets.references import ProofReferenceListSerializer, tx_id_matches
+from .models import Product, Order, OrderItem
+from .services import MAX_CART_LINES
 
 class ProductSerializer(serializers.ModelSerializer):
+    image = BoundedImageField(required=False, allow_null=True)
     image_url = serializers.SerializerMethodField()
+    image_thumb_url = serializers.SerializerMethodField()
+    image_mid_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
@@ -18,15 +27,43 @@ class ProductSerializer(serializers.ModelSerializer):
             return url
         return None
 
+    def get_image_thumb_url(self, obj):
+        url = derivative_url(obj.image, 'thumb')
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def get_image_mid_url(self, obj):
+        url = derivative_url(obj.image, 'mid')
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    product_title = serializers.CharField(source='product.title', read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ["product", "product_title", "quantity", "unit_price_usd", "line_total_usd"]
+
 class OrderSerializer(serializers.ModelSerializer):
+    proof_image = BoundedImageField(required=False, allow_null=True)
+    items = OrderItemSerializer(many=True, read_only=True)
     product_title = serializers.CharField(source='product.title', read_only=True)
     buyer_username = serializers.CharField(source='buyer.username', read_only=True)
     proof_image_url = serializers.SerializerMethodField()
+    proof_thumb_url = serializers.SerializerMethodField()
+    proof_reused = serializers.SerializerMethodField()
+    tx_id_matches = serializers.SerializerMethodField()
+    reference_source = 'order'
 
     class Meta:
         model = Order
         fields = '__all__'
-        read_only_fields = ['buyer', 'total_usd', 'status']
+        read_only_fields = ['buyer', 'total_usd', 'status', 'paid_at']
+        list_serializer_class = ProofReferenceListSerializer
 
     def get_proof_image_url(self, obj):
         if getattr(obj, 'proof_image', None):
@@ -36,4 +73,41 @@ class OrderSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(url) if request else url
             except Exception:
                 return None
-        return None
\ No newline at end of file
+        return None
+
+    def get_proof_thumb_url(self, obj):
+        url = derivative_url(obj.proof_image, 'thumb')
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def get_proof_reused(self, obj):
+        return proof_reused(self, obj)
+
+    def get_tx_id_matches(self, obj):
+        return tx_id_matches(self, obj)
+
+class CartLineSerializer(serializers.Serializer):
+    product = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1, max_value=1000)
+
+class CartLinesField(serializers.ListField):
+    """[{product, quantity}, ...]; multipart clients send it as one JSON string."""
+    child = CartLineSerializer()
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and len(data) == 1 and isinstance(data[0], str):
+            data = data[0]
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                raise serializers.ValidationError('items must be a JSON list of {product, quantity}')
+        return super().to_internal_value(data)
+
+class CheckoutSerializer(OrderSerializer):
+    items = CartLinesField(write_only=True, allow_empty=False, max_length=MAX_CART_LINES)
+
+    class Meta(OrderSerializer.Meta):
+        read_only_fields = ['buyer', 'product', 'quantity', 'total_usd', 'status', 'paid_at']
@@ -0,0 +1,190 @@
+"""
+Order status transitions and the sales rollups they maintain.
+
+SellerSalesStats, ProductSalesStats and DailySalesStats hold the totals of PAID orders.
+set_order_status applies the delta of a single order with F() updates whenever it moves to
+or from PAID, so seller dashboards and top-product rankings read precomputed rows instead
+of aggregating Order x Product on every request. Deleting a PAID order removes its delta
+too (pre_delete receiver in signals.py). rebuild_sales_stats recomputes them from the
+orders table (see the `rebuild_sales_stats` command).
+
+Cart checkouts (price_cart / create_cart_order) price every line with one IN query and
+store the lines as OrderItem rows with snapshotted unit prices.
+"""
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from .models import Product, Order, OrderItem, SellerSalesStats, ProductSalesStats, DailySalesStats
+
+ORDER_STATUSES = ('PENDING', 'PAID', 'CANCELLED')
+PAID = 'PAID'
+MEMBER_DISCOUNT = Decimal('0.90')  # logged-in buyers pay 90%
+MAX_CART_LINES = 50
+CENT = Decimal('0.01')
+
+
+class CartError(ValueError):
+    pass
+
+
+def unit_price(price_usd, member: bool) -> Decimal:
+    price = Decimal(price_usd)
+    return (price * MEMBER_DISCOUNT).quantize(CENT) if member else price
+
+
+def price_cart(lines, member: bool) -> list:
+    """
+    Price [(product_id, quantity), ...] with a single query over active products.
+    Duplicate products are merged; returns unsaved OrderItem rows (without order).
+    """
+    quantities = {}
+    for product_id, quantity in lines:
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    if not quantities:
+        raise CartError('Cart is empty')
+    if len(quantities) > MAX_CART_LINES:
+        raise CartError(f'At most {MAX_CART_LINES} different products per order')
+    prices = dict(
+        Product.objects.filter(pk__in=list(quantities), is_active=True).values_list('id', 'price_usd')
+    )
+    missing = sorted(set(quantities) - set(prices))
+    if missing:
+        raise CartError(f'Products not available: {", ".join(map(str, missing))}')
+    items = []
+    for product_id, quantity in quantities.items():
+        price = unit_price(prices[product_id], member)
+        items.append(OrderItem(
+            product_id=product_id, quantity=quantity,
+            unit_price_usd=price, line_total_usd=(price * quantity).quantize(CENT),
+        ))
+    return items
+
+
+def create_cart_order(serializer, items, buyer) -> Order:
+    """Save the order (proof, tx_id, guest fields from `serializer`) and its lines in one transaction."""
+    with transaction.atomic():
+        order = serializer.save(
+            buyer=buyer, product=None, status='PENDING',
+            quantity=sum(i.quantity for i in items),
+            total_usd=sum((i.line_total_usd for i in items), Decimal('0')).quantize(CENT),
+        )
+        for item in items:
+            item.order = order
+        OrderItem.objects.bulk_create(items)
+    return order
+
+
+def order_lines(order) -> list:
+    """(product_id, seller_id, quantity, amount_usd) for every product of an order."""
+    if order.product_id:
+        return [(order.product_id, order.product.seller_id, order.quantity, Decimal(order.total_usd))]
+    return [
+        (i.product_id, i.product.seller_id, i.quantity, Decimal(i.line_total_usd))
+        for i in order.items.select_related('product')
+    ]
+
+
+def _totals(lines, key) -> dict:
+    """{key(line): [units, revenue, orders]}; an order counts once per key it touches."""
+    totals = {}
+    for line in lines:
+        t = totals.setdefault(key(line), [0, Decimal('0'), 1])
+        t[0] += line[2]
+        t[1] += line[3]
+    return totals
+
+
+def _increment(queryset, totals: list, sign: int, **extra) -> None:
+    units, revenue, orders = totals
+    queryset.update(
+        units_sold=F('units_sold') + sign * units,
+        revenue_usd=F('revenue_usd') + sign * revenue,
+        orders_count=F('orders_count') + sign * orders,
+        **extra,
+    )
+
+
+def apply_sales_deltas(lines, day, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) one order's lines from the rollups; `day` is its paid date."""
+    now = timezone.now()
+    sellers = _totals(lines, lambda line: line[1])
+    products = _totals(lines, lambda line: (line[0], line[1]))
+    SellerSalesStats.objects.bulk_create([SellerSalesStats(seller_id=s) for s in sellers], ignore_conflicts=True)
+    ProductSalesStats.objects.bulk_create(
+        [ProductSalesStats(product_id=p, seller_id=s) for p, s in products], ignore_conflicts=True,
+    )
+    DailySalesStats.objects.bulk_create([DailySalesStats(seller_id=s, day=day) for s in sellers], ignore_conflicts=True)
+    for seller_id, totals in sellers.items():
+        _increment(SellerSalesStats.objects.filter(seller_id=seller_id), totals, sign, updated_at=now)
+        _increment(DailySalesStats.objects.filter(seller_id=seller_id, day=day), totals, sign)
+    for (product_id, _), totals in products.items():
+        _increment(ProductSalesStats.objects.filter(product_id=product_id), totals, sign, updated_at=now)
+
+
+def set_order_status(order_id: int, new_status: str) -> Order:
+    """Move an order to new_status, updating the sales rollups when it enters or leaves PAID."""
+    with transaction.atomic():
+        order = Order.objects.select_for_update(of=('self',)).select_related('product').get(pk=order_id)
+        old_status = order.status
+        if old_status == new_status:
+            return order
+        if new_status == PAID:
+            order.paid_at = timezone.now()
+            apply_sales_deltas(order_lines(order), timezone.localdate(order.paid_at), 1)
+        elif old_status == PAID:
+            apply_sales_deltas(order_lines(order), timezone.localdate(order.paid_at or order.created_at), -1)
+            order.paid_at = None
+        order.status = new_status
+        order.save(update_fields=['status', 'paid_at'])
+    return order
+
+
+def _accumulate(acc: dict, key, row) -> None:
+    t = acc.setdefault(key, [0, Decimal('0'), 0])
+    t[0] += row['units']
+    t[1] += row['revenue']
+    t[2] += row['orders']
+
+
+def rebuild_sales_stats() -> int:
+    """Recompute every rollup row from PAID orders; returns the number of rows written."""
+    paid = Order.objects.filter(status=PAID, product__isnull=False)
+    paid_items = OrderItem.objects.filter(order__status=PAID)
+    paid_day = TruncDate(Coalesce('paid_at', 'created_at'))
+    item_day = TruncDate(Coalesce('order__paid_at', 'order__created_at'))
+    order_totals = {'units': Sum('quantity'), 'revenue': Sum('total_usd'), 'orders': Count('id')}
+    # An order counts once per seller / product / day even when several of its lines fall in it
+    item_totals = {'units': Sum('quantity'), 'revenue': Sum('line_total_usd'), 'orders': Count('order', distinct=True)}
+
+    products, sellers, days = {}, {}, {}
+    for r in paid.values('product_id', 'product__seller_id').annotate(**order_totals).order_by():
+        _accumulate(products, (r['product_id'], r['product__seller_id']), r)
+    for r in paid_items.values('product_id', 'product__seller_id').annotate(**item_totals).order_by():
+        _accumulate(products, (r['product_id'], r['product__seller_id']), r)
+    for r in paid.values('product__seller_id').annotate(**order_totals).order_by():
+        _accumulate(sellers, r['product__seller_id'], r)
+    for r in paid_items.values('product__seller_id').annotate(**item_totals).order_by():
+        _accumulate(sellers, r['product__seller_id'], r)
+    for r in paid.annotate(day=paid_day).values('product__seller_id', 'day').annotate(**order_totals).order_by():
+        _accumulate(days, (r['product__seller_id'], r['day']), r)
+    for r in paid_items.annotate(day=item_day).values('product__seller_id', 'day').annotate(**item_totals).order_by():
+        _accumulate(days, (r['product__seller_id'], r['day']), r)
+
+    with transaction.atomic():
+        for model in (SellerSalesStats, ProductSalesStats, DailySalesStats):
+            model.objects.all().delete()
+        SellerSalesStats.objects.bulk_create([
+            SellerSalesStats(seller_id=seller_id, units_sold=u, revenue_usd=r, orders_count=o)
+            for seller_id, (u, r, o) in sellers.items()
+        ], batch_size=1000)
+        ProductSalesStats.objects.bulk_create([
+            ProductSalesStats(product_id=product_id, seller_id=seller_id, units_sold=u, revenue_usd=r, orders_count=o)
+            for (product_id, seller_id), (u, r, o) in products.items()
+        ], batch_size=1000)
+        DailySalesStats.objects.bulk_create([
+            DailySalesStats(seller_id=seller_id, day=day, units_sold=u, revenue_usd=r, orders_count=o)
+            for (seller_id, day), (u, r, o) in days.items()
+        ], batch_size=1000)
+    return len(sellers) + len(products) + len(days)
@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.utils import timezone
+from core.images import image_processed, watch_image_fields
+from .catalog import bump_catalog_version
+from .models import Order, Product
+from .services import PAID, apply_sales_deltas, order_lines
+
+
+def _product_changed(sender, **kwargs):
+    bump_catalog_version()
+
+
+def _image_processed(sender, name, **kwargs):
+    # Normalizing can repoint Product.image and new variants change the thumb/mid URLs
+    if Product.objects.filter(image=name).exists():
+        bump_catalog_version()
+
+
+# Any product change invalidates the cached public catalog pages (see catalog.py)
+post_save.connect(_product_changed, sender=Product, dispatch_uid='catalog_product_saved')
+post_delete.connect(_product_changed, sender=Product, dispatch_uid='catalog_product_deleted')
+image_processed.connect(_image_processed, dispatch_uid='catalog_image_processed')
+
+
+def _order_deleting(sender, instance, **kwargs):
+    # Admin deletes and product/buyer cascades must take a PAID order out of the rollups
+    if instance.status == PAID:
+        apply_sales_deltas(order_lines(instance), timezone.localdate(instance.paid_at or instance.created_at), -1)
+
+
+pre_delete.connect(_order_deleting, sender=Order, dispatch_uid='sales_stats_order_deleting')
+
+
+# Thumbnails / mid-size variants for order proofs and product photos (see core.images)
+watch_image_fields(Order)
+watch_image_fields(Product)
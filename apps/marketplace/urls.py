@@ -1,8 +1,10 @@
 from django.urls import path
 from .views import (
     ProductListCreateView,
+    CatalogView,
     MyProductsView,
     OrderCreateView,
+    CheckoutView,
     MyOrdersView,
     MySalesStatsView,
     AdminProductsView,
@@ -10,12 +12,15 @@ from .views import (
     AdminBankInfoView,
     AdminOrdersView,
     AdminOrderStatusView,
+    AdminSalesSummaryView,
 )
 
 urlpatterns = [
     path('products/', ProductListCreateView.as_view()),
+    path('catalog/', CatalogView.as_view()),
     path('products/mine/', MyProductsView.as_view()),
     path('orders/', OrderCreateView.as_view()),
+    path('checkout/', CheckoutView.as_view()),
     path('orders/mine/', MyOrdersView.as_view()),
     path('stats/sales/', MySalesStatsView.as_view()),
     path('bank-info/', AdminBankInfoView.as_view()),
@@ -27,4 +32,5 @@ urlpatterns = [
     # Admin orders management
     path('admin/orders/', AdminOrdersView.as_view()),
     path('admin/orders/<int:pk>/status/', AdminOrderStatusView.as_view()),
+    path('admin/sales/summary/', AdminSalesSummaryView.as_view()),
 ]
\ No newline at end of file
@@ -1,11 +1,17 @@
 from decimal import Decimal
 from django.conf import settings
-from django.db.models import Sum
+from django.core.cache import cache
+from datetime import timedelta
+from django.db.models import Sum, prefetch_related_objects
+from django.utils import timezone
 from rest_framework import generics, permissions, views, status
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from .models import Product, Order
-from .serializers import ProductSerializer, OrderSerializer
+from .catalog import CatalogPagination, cache_seconds, catalog_version, filter_catalog, page_etag, page_key
+from .models import Product, Order, SellerSalesStats, ProductSalesStats, DailySalesStats
+from .serializers import ProductSerializer, OrderSerializer, CheckoutSerializer
+from .services import ORDER_STATUSES, CartError, create_cart_order, price_cart, set_order_status, unit_price
 
 class ProductListCreateView(generics.ListCreateAPIView):
     serializer_class = ProductSerializer
@@ -22,6 +28,29 @@ class ProductListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(seller=self.request.user)
 
+class CatalogView(generics.ListAPIView):
+    """Public storefront listing, cached per catalog version with ETag/304 (see catalog.py)."""
+    serializer_class = ProductSerializer
+    pagination_class = CatalogPagination
+    # Anonymous storefront traffic: skip JWT parsing entirely
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        return filter_catalog(Product.objects.filter(is_active=True), self.request)
+
+    def list(self, request, *args, **kwargs):
+        key = page_key(request, catalog_version())
+        page = cache.get(key)
+        if page is None:
+            data = super().list(request, *args, **kwargs).data
+            page = {'etag': page_etag(data), 'data': data}
+            cache.set(key, page, timeout=cache_seconds())
+        etag = page['etag']
+        if etag in [t.strip() for t in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(page['data'], headers={'ETag': etag, 'Cache-Control': 'public, max-age=0, must-revalidate'})
+
 class MyProductsView(generics.ListAPIView):
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -35,36 +64,87 @@ class OrderCreateView(generics.CreateAPIView):
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def perform_create(self, serializer):
-        product_id = self.request.data.get('product')
-        quantity = int(self.request.data.get('quantity', 1))
-        product = Product.objects.get(pk=product_id)
-        unit_price = Decimal(product.price_usd)
+        product = serializer.validated_data.get('product')
+        if product is None or not product.is_active:
+            raise ValidationError({'product': ['Product not available']})
+        quantity = serializer.validated_data.get('quantity', 1)
+        member = bool(self.request.user and self.request.user.is_authenticated)
         # 10% discount if authenticated
-        if self.request.user and self.request.user.is_authenticated:
-            unit_price = (unit_price * Decimal('0.90')).quantize(Decimal('0.01'))
-        total = (unit_price * Decimal(quantity)).quantize(Decimal('0.01'))
-        buyer = self.request.user if (self.request.user and self.request.user.is_authenticated) else None
+        total = (unit_price(product.price_usd, member) * Decimal(quantity)).quantize(Decimal('0.01'))
+        buyer = self.request.user if member else None
         serializer.save(buyer=buyer, total_usd=total, status='PENDING')
 
+class CheckoutView(generics.CreateAPIView):
+    """
+    Cart checkout: `items` = [{product, quantity}, ...] (a JSON string in multipart forms)
+    plus one tx_id / proof_image for the whole order. All lines are priced with one query.
+    """
+    serializer_class = CheckoutSerializer
+    permission_classes = [permissions.AllowAny]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = [(line['product'], line['quantity']) for line in serializer.validated_data.pop('items')]
+        member = bool(request.user and request.user.is_authenticated)
+        try:
+            items = price_cart(lines, member)
+        except CartError as e:
+            return Response({'items': [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+        order = create_cart_order(serializer, items, request.user if member else None)
+        prefetch_related_objects([order], 'items__product')
+        return Response(OrderSerializer(order, context={'request': request}).data, status=status.HTTP_201_CREATED)
+
 class MyOrdersView(generics.ListAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Order.objects.filter(buyer=self.request.user).order_by('-created_at')
+        return (
+            Order.objects.filter(buyer=self.request.user)
+            .select_related('product', 'buyer').prefetch_related('items__product')
+            .order_by('-created_at')
+        )
+
+def _stats_days(request, default=30) -> int:
+    try:
+        return max(1, min(int(request.query_params.get('days', default)), 366))
+    except ValueError:
+        return default
+
+def _top_products(qs, limit):
+    return [{
+        'product_id': s.product_id,
+        'title': s.product.title,
+        'units_sold': s.units_sold,
+        'revenue_usd': str(s.revenue_usd),
+        'orders_count': s.orders_count,
+    } for s in qs.filter(units_sold__gt=0).select_related('product').order_by('-units_sold', 'product_id')[:limit]]
+
+def _daily(qs):
+    return [{
+        'day': r['day'].isoformat(),
+        'units_sold': r['units'],
+        'revenue_usd': str(Decimal(r['revenue']).quantize(Decimal('0.01'))),
+        'orders_count': r['orders'],
+    } for r in qs.values('day').annotate(
+        units=Sum('units_sold'), revenue=Sum('revenue_usd'), orders=Sum('orders_count'),
+    ).order_by('day')]
 
 class MySalesStatsView(views.APIView):
+    """Seller dashboard, read from the sales rollups (?days=N daily buckets, default 30)."""
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        # Seller-centric stats
-        seller_orders = Order.objects.filter(product__seller=request.user, status='PAID')
-        total_units = seller_orders.aggregate(total_qty=Sum('quantity'))['total_qty'] or 0
-        total_revenue = seller_orders.aggregate(total_rev=Sum('total_usd'))['total_rev'] or Decimal('0')
+        stats = SellerSalesStats.objects.filter(seller=request.user).first() or SellerSalesStats()
+        since = timezone.localdate() - timedelta(days=_stats_days(request) - 1)
         return Response({
-            'total_units_sold': int(total_units),
-            'total_revenue_usd': str(total_revenue),
-            'orders_count': seller_orders.count(),
+            'total_units_sold': stats.units_sold,
+            'total_revenue_usd': str(Decimal(stats.revenue_usd)),
+            'orders_count': stats.orders_count,
+            'top_products': _top_products(ProductSalesStats.objects.filter(seller=request.user), 5),
+            'daily': _daily(DailySalesStats.objects.filter(seller=request.user, day__gte=since)),
         })
 
 # Public endpoint to provide admin bank details for checkout
@@ -112,7 +192,7 @@ class AdminOrdersView(generics.ListAPIView):
     permission_classes = [permissions.IsAdminUser]
 
     def get_queryset(self):
-        qs = Order.objects.select_related('product', 'buyer').order_by('-created_at')
+        qs = Order.objects.select_related('product', 'buyer').prefetch_related('items__product').order_by('-created_at')
         status_param = self.request.query_params.get('status')
         if status_param:
             qs = qs.filter(status=status_param.upper())
@@ -122,13 +202,36 @@ class AdminOrderStatusView(views.APIView):
     permission_classes = [permissions.IsAdminUser]
 
     def patch(self, request, pk):
+        new_status = str(request.data.get('status', '')).upper()
+        if new_status not in ORDER_STATUSES:
+            return Response({'detail': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            order = Order.objects.get(pk=pk)
+            order = set_order_status(pk, new_status)
         except Order.DoesNotExist:
             return Response({'detail': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
-        new_status = str(request.data.get('status', '')).upper()
-        if new_status not in ['PENDING', 'PAID', 'CANCELLED']:
-            return Response({'detail': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
-        order.status = new_status
-        order.save()
-        return Response(OrderSerializer(order, context={'request': request}).data)
\ No newline at end of file
+        return Response(OrderSerializer(order, context={'request': request}).data)
+
+# Admin: marketplace-wide sales summary from the rollups
+class AdminSalesSummaryView(views.APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        totals = SellerSalesStats.objects.aggregate(
+            units=Sum('units_sold'), revenue=Sum('revenue_usd'), orders=Sum('orders_count'),
+        )
+        since = timezone.localdate() - timedelta(days=_stats_days(request) - 1)
+        top_sellers = [{
+            'seller_id': s.seller_id,
+            'username': s.seller.username,
+            'units_sold': s.units_sold,
+            'revenue_usd': str(s.revenue_usd),
+            'orders_count': s.orders_count,
+        } for s in SellerSalesStats.objects.select_related('seller').order_by('-revenue_usd', 'seller_id')[:10]]
+        return Response({
+            'total_units_sold': totals['units'] or 0,
+            'total_revenue_usd': str(Decimal(totals['revenue'] or 0).quantize(Decimal('0.01'))),
+            'orders_count': totals['orders'] or 0,
+            'top_products': _top_products(ProductSalesStats.objects.all(), 10),
+            'top_sellers': top_sellers,
+            'daily': _daily(DailySalesStats.objects.filter(day__gte=since)),
+        })
\ No newline at end of file
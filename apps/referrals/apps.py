@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class ReferralsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.referrals'
\ No newline at end of file
+    name = 'apps.referrals'
+
+    def ready(self) -> None:
+        from . import signals  # noqa
+        return super().ready()
@@ -0,0 +1,214 @@
+"""
+Analyze the whole referral graph in memory and write a ranked report of suspicious patterns:
+
+- self-referrals and referral cycles (walking referred_by never reaches a root)
+- clusters of users linked by a shared deposit/signup tx_id or bank account name
+- fan-out anomalies (direct referral counts far above the population mean)
+
+The referred_by graph is loaded with a single query into compact integer arrays, so the
+analysis is linear in the number of users and avoids per-user queries.
+
+Usage:
+    python manage.py analyze_referral_graph
+    python manage.py analyze_referral_graph --output report.json
+    python manage.py analyze_referral_graph --output report.csv --format csv --top 200
+"""
+import csv
+import io
+import json
+import math
+import time
+from array import array
+from bisect import bisect_left
+from django.core.management.base import BaseCommand
+from apps.accounts.models import User, SignupProof
+from apps.wallets.models import DepositRequest
+from apps.withdrawals.models import WithdrawalRequest
+from core.db import iter_keyset
+
+# Rows per query; scans use keyset chunks since server-side cursors are off for the pooler
+CHUNK = 20000
+
+
+def _norm(value: str) -> str:
+    return ' '.join((value or '').split()).upper()
+
+
+class _UnionFind:
+    """Disjoint sets over dense indices 0..n-1 (path halving + union by size)."""
+
+    def __init__(self, n: int):
+        self.parent = array('l', range(n))
+        self.size = array('l', [1]) * n
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+
+class Command(BaseCommand):
+    help = 'Detect referral cycles, shared-payment clusters and fan-out anomalies in the referral graph'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Write the report to this file (default: stdout)')
+        parser.add_argument('--format', choices=['json', 'csv'], default='json')
+        parser.add_argument('--top', type=int, default=100, help='Keep the N highest-scoring findings (default 100)')
+        parser.add_argument('--fanout-z', type=float, default=4.0, help='Z-score threshold for fan-out anomalies (default 4)')
+        parser.add_argument('--fanout-min', type=int, default=10, help='Minimum direct referrals to flag fan-out (default 10)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        # 1) Graph: ids sorted ascending, parent[i] = dense index of referrer or -1
+        ids = array('q')
+        raw_parent = array('q')
+        for uid, ref_id in iter_keyset(User.objects.all(), 'referred_by_id', chunk_size=CHUNK):
+            ids.append(uid)
+            raw_parent.append(ref_id or 0)
+        n = len(ids)
+
+        def index_of(uid):
+            i = bisect_left(ids, uid)
+            return i if i < n and ids[i] == uid else -1
+
+        parent = array('l', [-1]) * n
+        children = array('l', [0]) * n
+        for i in range(n):
+            if raw_parent[i]:
+                p = index_of(raw_parent[i])
+                parent[i] = p
+                if p >= 0:
+                    children[p] += 1
+        del raw_parent
+
+        findings = []
+
+        # 2) Self-referrals and cycles: walk parent pointers, stamping each node with its walk id
+        stamp = array('l', [-1]) * n
+        for start in range(n):
+            if stamp[start] != -1:
+                continue
+            i = start
+            while i >= 0 and stamp[i] == -1:
+                stamp[i] = start
+                i = parent[i]
+            if i >= 0 and stamp[i] == start:
+                cycle = [i]
+                j = parent[i]
+                while j != i:
+                    cycle.append(j)
+                    j = parent[j]
+                members = [ids[k] for k in cycle]
+                if len(cycle) == 1:
+                    findings.append({'kind': 'self_referral', 'score': 100.0, 'user_ids': members, 'detail': 'referred_by points to itself'})
+                else:
+                    findings.append({
+                        'kind': 'cycle', 'score': 100.0 + len(cycle), 'user_ids': members,
+                        'detail': f'referral cycle of length {len(cycle)}',
+                    })
+        del stamp
+
+        # 3) Clusters sharing a payment reference or bank account name
+        uf = _UnionFind(n)
+        first_owner = {}
+        shared_keys = {}
+
+        def link(key, uid):
+            i = index_of(uid)
+            if i < 0:
+                return
+            owner = first_owner.setdefault(key, i)
+            if owner != i:
+                uf.union(owner, i)
+                shared_keys.setdefault(key, set()).update((owner, i))
+
+        for _, uid, tx_id, account_name in iter_keyset(
+            DepositRequest.objects.exclude(tx_id='SIGNUP-INIT'), 'user_id', 'tx_id', 'account_name', chunk_size=CHUNK,
+        ):
+            if _norm(tx_id):
+                link(('tx', _norm(tx_id)), uid)
+            if _norm(account_name):
+                link(('account', _norm(account_name)), uid)
+        for _, uid, tx_id in iter_keyset(SignupProof.objects.all(), 'user_id', 'tx_id', chunk_size=CHUNK):
+            if _norm(tx_id):
+                link(('tx', _norm(tx_id)), uid)
+        for _, uid, account_name in iter_keyset(WithdrawalRequest.objects.all(), 'user_id', 'account_name', chunk_size=CHUNK):
+            if _norm(account_name):
+                link(('account', _norm(account_name)), uid)
+        del first_owner
+
+        clusters = {}
+        for key, members in shared_keys.items():
+            c = clusters.setdefault(uf.find(next(iter(members))), {'members': set(), 'keys': []})
+            c['members'].update(members)
+            c['keys'].append(f'{key[0]}:{key[1]}')
+        for c in clusters.values():
+            members = c['members']
+            # Clusters whose members also refer each other look like rings rather than shared households
+            internal_edges = sum(1 for i in members if parent[i] in members)
+            findings.append({
+                'kind': 'shared_payment_cluster',
+                'score': round(5.0 * len(members) + 10.0 * internal_edges, 2),
+                'user_ids': sorted(ids[i] for i in members),
+                'detail': f'{len(members)} users, {internal_edges} referral links inside, shared: {", ".join(sorted(c["keys"])[:10])}',
+            })
+
+        # 4) Fan-out anomalies over users with at least one direct referral
+        referrers = [children[i] for i in range(n) if children[i]]
+        if referrers:
+            mean = sum(referrers) / len(referrers)
+            std = math.sqrt(sum((x - mean) ** 2 for x in referrers) / len(referrers))
+            if std > 0:
+                for i in range(n):
+                    k = children[i]
+                    if k < options['fanout_min']:
+                        continue
+                    z = (k - mean) / std
+                    if z >= options['fanout_z']:
+                        findings.append({
+                            'kind': 'fanout', 'score': round(z, 2), 'user_ids': [ids[i]],
+                            'detail': f'{k} direct referrals (mean {mean:.2f}, z={z:.1f})',
+                        })
+
+        findings.sort(key=lambda f: -f['score'])
+        top = findings[:options['top']]
+        for rank, f in enumerate(top, start=1):
+            f['rank'] = rank
+
+        self._write(top, options)
+        elapsed = time.monotonic() - started
+        counts = {}
+        for f in findings:
+            counts[f['kind']] = counts.get(f['kind'], 0) + 1
+        self.stderr.write(self.style.SUCCESS(
+            f"✅ Analyzed {n} users in {elapsed:.2f}s: "
+            + (', '.join(f'{v} {k}' for k, v in sorted(counts.items())) or 'no findings')
+        ))
+
+    def _write(self, findings, options):
+        if options['format'] == 'csv':
+            buf = io.StringIO(newline='')
+            writer = csv.writer(buf)
+            writer.writerow(['rank', 'kind', 'score', 'user_ids', 'detail'])
+            for f in findings:
+                writer.writerow([f['rank'], f['kind'], f['score'], ' '.join(map(str, f['user_ids'])), f['detail']])
+            report = buf.getvalue()
+        else:
+            report = json.dumps(findings, indent=2) + '\n'
+        if options['output']:
+            with open(options['output'], 'w', newline='') as out:
+                out.write(report)
+        else:
+            self.stdout.write(report, ending='')
@@ -0,0 +1,19 @@
+"""
+Rebuild the referral closure table from User.referred_by.
+
+The table is maintained automatically at signup; run this after bulk imports,
+manual referred_by edits in the database, or to repair drift.
+
+Usage:
+    python manage.py rebuild_referral_closure
+"""
+from django.core.management.base import BaseCommand
+from apps.referrals.services import rebuild_referral_closure
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the referral closure table (ancestor, descendant, depth) from referred_by links'
+
+    def handle(self, *args, **options):
+        written = rebuild_referral_closure()
+        self.stdout.write(self.style.SUCCESS(f"✅ Referral closure rebuilt: {written} rows"))
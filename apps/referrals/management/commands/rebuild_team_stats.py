@@ -0,0 +1,28 @@
+"""
+Recompute the denormalized referral team stats (levels 1-3 counts, approved counts,
+team deposit volume and lifetime referral earnings) from source tables.
+
+Counters are maintained incrementally; run this to repair drift after manual data fixes.
+
+Usage:
+    python manage.py rebuild_team_stats
+    python manage.py rebuild_team_stats --user 42 --user 43
+"""
+from django.core.management.base import BaseCommand
+from apps.referrals.services import rebuild_team_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild ReferralTeamStats rows from the closure table, credited deposits and payouts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            help='Only rebuild the given user id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_team_stats(options['user'])
+        self.stdout.write(self.style.SUCCESS(f"✅ Team stats rebuilt: {written} rows"))
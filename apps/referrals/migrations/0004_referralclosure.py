@@ -0,0 +1,52 @@
+# Generated by Django 5.0.7 on 2026-10-19 17:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_closure(apps, schema_editor):
+    """Populate the closure table from the existing referred_by links."""
+    User = apps.get_model('accounts', 'User')
+    ReferralClosure = apps.get_model('referrals', 'ReferralClosure')
+    parent_of = dict(User.objects.exclude(referred_by__isnull=True).values_list('id', 'referred_by_id'))
+    batch = []
+    for uid in parent_of:
+        seen = {uid}
+        cur = parent_of.get(uid)
+        depth = 1
+        while cur is not None and cur not in seen:  # stop on referral cycles
+            batch.append(ReferralClosure(ancestor_id=cur, descendant_id=uid, depth=depth))
+            seen.add(cur)
+            cur = parent_of.get(cur)
+            depth += 1
+        if len(batch) >= 5000:
+            ReferralClosure.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ReferralClosure.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('referrals', '0003_referralmilestoneprogress_current_sum_usd_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferralClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referral_descendants', to=settings.AUTH_USER_MODEL)),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referral_ancestors', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ancestor', 'depth'], name='ref_closure_anc_depth_idx'), models.Index(fields=['descendant', 'depth'], name='ref_closure_desc_depth_idx')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+        migrations.RunPython(backfill_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.0.7 on 2026-10-19 17:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_team_stats(apps, schema_editor):
+    """Compute initial team counters from the closure table, deposits and payouts."""
+    from django.db.models import Count, Q, Sum
+    ReferralClosure = apps.get_model('referrals', 'ReferralClosure')
+    ReferralPayout = apps.get_model('referrals', 'ReferralPayout')
+    ReferralTeamStats = apps.get_model('referrals', 'ReferralTeamStats')
+    DepositRequest = apps.get_model('wallets', 'DepositRequest')
+    stats = {}
+
+    def row(uid):
+        if uid not in stats:
+            stats[uid] = ReferralTeamStats(user_id=uid)
+        return stats[uid]
+
+    for r in (
+        ReferralClosure.objects.filter(depth__lte=3)
+        .values('ancestor_id', 'depth')
+        .annotate(n=Count('id'), approved=Count('id', filter=Q(descendant__is_approved=True)))
+        .order_by()
+    ):
+        obj = row(r['ancestor_id'])
+        setattr(obj, f"level{r['depth']}_count", r['n'])
+        setattr(obj, f"level{r['depth']}_approved_count", r['approved'])
+    for r in (
+        DepositRequest.objects.filter(status='CREDITED', user__referral_ancestors__depth__lte=3)
+        .values('user__referral_ancestors__ancestor_id')
+        .annotate(total=Sum('amount_usd'))
+        .order_by()
+    ):
+        row(r['user__referral_ancestors__ancestor_id']).team_deposit_usd = r['total'] or 0
+    for r in ReferralPayout.objects.values('referrer_id').annotate(total=Sum('amount_usd')).order_by():
+        row(r['referrer_id']).lifetime_earnings_usd = r['total'] or 0
+    ReferralTeamStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('referrals', '0004_referralclosure'),
+        ('wallets', '0004_wallet_income_usd'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferralTeamStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level1_count', models.PositiveIntegerField(default=0)),
+                ('level2_count', models.PositiveIntegerField(default=0)),
+                ('level3_count', models.PositiveIntegerField(default=0)),
+                ('level1_approved_count', models.PositiveIntegerField(default=0)),
+                ('level2_approved_count', models.PositiveIntegerField(default=0)),
+                ('level3_approved_count', models.PositiveIntegerField(default=0)),
+                ('team_deposit_usd', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('lifetime_earnings_usd', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='referral_team_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Referral Team Stats',
+                'verbose_name_plural': 'Referral Team Stats',
+            },
+        ),
+        migrations.RunPython(backfill_team_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.0.7 on 2026-10-19 17:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_included_directs(apps, schema_editor):
+    """Move each progress row's included_direct_ids JSON list into membership rows.
+    The amount is the direct's first credited deposit, as recorded at the time."""
+    User = apps.get_model('accounts', 'User')
+    Progress = apps.get_model('referrals', 'ReferralMilestoneProgress')
+    Member = apps.get_model('referrals', 'ReferralMilestoneMember')
+    DepositRequest = apps.get_model('wallets', 'DepositRequest')
+    pairs = []
+    for prog in Progress.objects.exclude(included_direct_ids=[]).only('id', 'included_direct_ids'):
+        pairs.extend((prog.id, int(uid)) for uid in set(prog.included_direct_ids or []))
+    existing = set(User.objects.filter(id__in={uid for _, uid in pairs}).values_list('id', flat=True))
+    pairs = [(pid, uid) for pid, uid in pairs if uid in existing]  # drop ids of deleted users
+    first_amount = {}
+    for user_id, amount in (
+        DepositRequest.objects.filter(user_id__in={uid for _, uid in pairs}, status='CREDITED')
+        .order_by('user_id', 'processed_at', 'created_at')
+        .values_list('user_id', 'amount_usd')
+    ):
+        first_amount.setdefault(user_id, amount)
+    Member.objects.bulk_create(
+        [Member(progress_id=pid, window_no=0, direct_id=uid, amount_usd=first_amount.get(uid, 0)) for pid, uid in pairs],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('referrals', '0005_referralteamstats'),
+        ('wallets', '0004_wallet_income_usd'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='referralmilestoneprogress',
+            name='window_no',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ReferralMilestoneMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window_no', models.PositiveIntegerField()),
+                ('amount_usd', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('direct', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referral_milestone_memberships', to=settings.AUTH_USER_MODEL)),
+                ('progress', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='referrals.referralmilestoneprogress')),
+            ],
+            options={
+                'unique_together': {('progress', 'window_no', 'direct')},
+            },
+        ),
+        migrations.RunPython(copy_included_directs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='referralmilestoneprogress',
+            name='included_direct_ids',
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.7 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+def backfill_subtree_totals(apps, schema_editor):
+    """Fill whole-subtree team size and deposit volume from the closure table."""
+    from django.db.models import Count, Sum
+    ReferralClosure = apps.get_model('referrals', 'ReferralClosure')
+    ReferralTeamStats = apps.get_model('referrals', 'ReferralTeamStats')
+    DepositRequest = apps.get_model('wallets', 'DepositRequest')
+    totals = {}
+    for r in ReferralClosure.objects.values('ancestor_id').annotate(n=Count('id')).order_by():
+        totals.setdefault(r['ancestor_id'], {})['team_size'] = r['n']
+    for r in (
+        DepositRequest.objects.filter(status='CREDITED', user__referral_ancestors__isnull=False)
+        .values('user__referral_ancestors__ancestor_id')
+        .annotate(total=Sum('amount_usd'))
+        .order_by()
+    ):
+        totals.setdefault(r['user__referral_ancestors__ancestor_id'], {})['team_volume_usd'] = r['total'] or 0
+    existing = {s.user_id: s for s in ReferralTeamStats.objects.filter(user_id__in=list(totals))}
+    new_rows = []
+    for uid, fields in totals.items():
+        obj = existing.get(uid)
+        if obj is None:
+            obj = ReferralTeamStats(user_id=uid)
+            new_rows.append(obj)
+        for name, value in fields.items():
+            setattr(obj, name, value)
+    ReferralTeamStats.objects.bulk_update(list(existing.values()), ['team_size', 'team_volume_usd'], batch_size=1000)
+    ReferralTeamStats.objects.bulk_create(new_rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('referrals', '0006_referralmilestonemember'),
+        ('wallets', '0004_wallet_income_usd'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='referralteamstats',
+            name='team_size',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='referralteamstats',
+            name='team_volume_usd',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=16),
+        ),
+        migrations.RunPython(backfill_subtree_totals, migrations.RunPython.noop),
+    ]
@@ -23,9 +23,10 @@ class ReferralMilestoneProgress(models.Model):
 
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='referral_milestone_progress')
     stage_index = models.PositiveSmallIntegerField(default=0)  # 0..2 index into STAGES
+    window_no = models.PositiveIntegerField(default=0)         # increments every time a window closes
     current_count = models.PositiveIntegerField(default=0)     # number of directs included in current window
     current_sum_usd = models.DecimalField(max_digits=14, decimal_places=2, default=0)
-    included_direct_ids = models.JSONField(default=list)       # list of direct user IDs counted in current window
+    # Directs counted in each window live in ReferralMilestoneMember (unique per window)
 
     def current_target(self) -> int:
         return self.STAGES[self.stage_index]
@@ -35,9 +36,24 @@ class ReferralMilestoneProgress(models.Model):
         self.reset_window()
 
     def reset_window(self):
+        # Opening a new window number leaves earlier memberships in place as history
+        self.window_no += 1
         self.current_count = 0
         self.current_sum_usd = 0
-        self.included_direct_ids = []
+
+
+class ReferralMilestoneMember(models.Model):
+    """A direct counted toward one milestone window of its referrer.
+    The unique index makes "count each direct once per window" a single insert.
+    """
+    progress = models.ForeignKey(ReferralMilestoneProgress, on_delete=models.CASCADE, related_name='members')
+    window_no = models.PositiveIntegerField()
+    direct = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='referral_milestone_memberships')
+    amount_usd = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # direct's first investment
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = [['progress', 'window_no', 'direct']]
 
 
 class ReferralMilestoneAward(models.Model):
@@ -47,4 +63,45 @@ class ReferralMilestoneAward(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+
+class ReferralClosure(models.Model):
+    """Closure table of the referral tree: one row per (ancestor, descendant) pair.
+    depth=1 is a direct referral, depth=2 a referral's referral, and so on.
+    Maintained from User.referred_by (see services.link_referral), so upline and
+    downline lookups at any depth are a single indexed query instead of self-joins.
+    """
+    ancestor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='referral_descendants')
+    descendant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='referral_ancestors')
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = [['ancestor', 'descendant']]
+        indexes = [
+            models.Index(fields=['ancestor', 'depth'], name='ref_closure_anc_depth_idx'),
+            models.Index(fields=['descendant', 'depth'], name='ref_closure_desc_depth_idx'),
+        ]
+
+
+class ReferralTeamStats(models.Model):
+    """Denormalized per-referrer team counters (levels 1-3 plus whole-subtree size and volume), kept up to date incrementally
+    on signup, approval, deposit credit and referral payout, so the referral dashboard
+    reads one row instead of recounting the tree. Rebuild with `rebuild_team_stats`.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='referral_team_stats')
+    level1_count = models.PositiveIntegerField(default=0)
+    level2_count = models.PositiveIntegerField(default=0)
+    level3_count = models.PositiveIntegerField(default=0)
+    level1_approved_count = models.PositiveIntegerField(default=0)
+    level2_approved_count = models.PositiveIntegerField(default=0)
+    level3_approved_count = models.PositiveIntegerField(default=0)
+    team_deposit_usd = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # credited deposits of levels 1-3
+    lifetime_earnings_usd = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # sum of ReferralPayout
+    # Whole-subtree aggregates (all depths), used by the genealogy tree
+    team_size = models.PositiveIntegerField(default=0)
+    team_volume_usd = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Referral Team Stats"
+        verbose_name_plural = "Referral Team Stats"
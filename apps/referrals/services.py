@@ -1,8 +1,18 @@
+import logging
 from decimal import Decimal
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from apps.wallets.models import Wallet, Transaction
-from .models import ReferralPayout, ReferralMilestoneProgress, ReferralMilestoneAward
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.utils import timezone
+from apps.wallets.models import Wallet, Transaction, DepositRequest
+from apps.wallets.fx import get_fx_rate
+from .models import (
+    ReferralPayout, ReferralMilestoneProgress, ReferralMilestoneAward, ReferralMilestoneMember,
+    ReferralClosure, ReferralTeamStats,
+)
+
+logger = logging.getLogger(__name__)
 
 REFERRAL_TIERS = [Decimal(str(x)) for x in settings.ECONOMICS['REFERRAL_TIERS']]
 
@@ -17,6 +27,259 @@ if _MILESTONE_PCTS_RAW:
 User = get_user_model()
 
 
+def link_referral(user: User) -> None:
+    """(Re)build closure rows for user and its existing subtree after referred_by was set.
+    Rows pointing from the old upline into the subtree are removed, then every new
+    ancestor is paired with every subtree member in one bulk insert.
+    """
+    with transaction.atomic():
+        subtree = [(user.id, 0)] + list(
+            ReferralClosure.objects.filter(ancestor=user).values_list('descendant_id', 'depth')
+        )
+        subtree_ids = [uid for uid, _ in subtree]
+        ReferralClosure.objects.filter(descendant_id__in=subtree_ids).exclude(ancestor_id__in=subtree_ids).delete()
+
+        parent_id = user.referred_by_id
+        if not parent_id:
+            return
+        if parent_id in subtree_ids:
+            logger.warning(f"Referral cycle: user {user.id} cannot be referred by its own descendant {parent_id}")
+            return
+
+        ancestors = [(parent_id, 1)] + [
+            (aid, depth + 1)
+            for aid, depth in ReferralClosure.objects.filter(descendant_id=parent_id).values_list('ancestor_id', 'depth')
+        ]
+        ReferralClosure.objects.bulk_create(
+            [
+                ReferralClosure(ancestor_id=aid, descendant_id=did, depth=a_depth + d_depth)
+                for aid, a_depth in ancestors
+                for did, d_depth in subtree
+            ],
+            batch_size=1000,
+        )
+
+
+def unlink_referral(user: User) -> set:
+    """Detach user's subtree from its upline before user is deleted (its direct referrals'
+    referred_by becomes NULL, so they become roots). Returns the users whose team counters
+    must be rebuilt once the delete went through.
+    """
+    scope = team_stats_scope(user)
+    subtree_ids = list(ReferralClosure.objects.filter(ancestor=user).values_list('descendant_id', flat=True))
+    ancestor_ids = list(ReferralClosure.objects.filter(descendant=user).values_list('ancestor_id', flat=True))
+    if subtree_ids and ancestor_ids:
+        ReferralClosure.objects.filter(descendant_id__in=subtree_ids, ancestor_id__in=ancestor_ids).delete()
+    scope.discard(user.id)
+    return scope
+
+
+def rebuild_referral_closure() -> int:
+    """Rebuild the whole closure table from User.referred_by. Returns the number of rows written."""
+    parent_of = dict(User.objects.exclude(referred_by__isnull=True).values_list('id', 'referred_by_id'))
+    written = 0
+    with transaction.atomic():
+        ReferralClosure.objects.all().delete()
+        batch = []
+        for uid in parent_of:
+            seen = {uid}
+            cur = parent_of.get(uid)
+            depth = 1
+            while cur is not None and cur not in seen:  # stop on referral cycles
+                batch.append(ReferralClosure(ancestor_id=cur, descendant_id=uid, depth=depth))
+                seen.add(cur)
+                cur = parent_of.get(cur)
+                depth += 1
+            if len(batch) >= 5000:
+                ReferralClosure.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            ReferralClosure.objects.bulk_create(batch)
+            written += len(batch)
+    return written
+
+
+def downline_queryset(user: User, level: int):
+    """Users exactly `level` steps below user in the referral tree."""
+    return User.objects.filter(referral_ancestors__ancestor=user, referral_ancestors__depth=level)
+
+
+def downline_counts(user: User, max_depth: int = 3) -> dict:
+    """Return {level: count} for levels 1..max_depth from one grouped query."""
+    counts = {level: 0 for level in range(1, max_depth + 1)}
+    rows = (
+        ReferralClosure.objects
+        .filter(ancestor=user, depth__lte=max_depth)
+        .values('depth')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    for r in rows:
+        counts[r['depth']] = r['n']
+    return counts
+
+
+TEAM_STATS_DEPTH = 3
+
+
+def _bulk_increment(queryset, key: str, field: str, deltas: dict, chunk: int = 500) -> None:
+    """Add a per-row delta to `field` for many rows with one UPDATE ... CASE per chunk.
+    deltas maps the value of `key` (e.g. 'id' or 'user_id') to the amount to add.
+    """
+    output_field = queryset.model._meta.get_field(field)
+    items = [(k, v) for k, v in deltas.items() if v]
+    for i in range(0, len(items), chunk):
+        part = items[i:i + chunk]
+        queryset.filter(**{f'{key}__in': [k for k, _ in part]}).update(**{
+            field: F(field) + Case(
+                *[When(**{key: k}, then=Value(v, output_field=output_field)) for k, v in part],
+                default=Value(0, output_field=output_field),
+                output_field=output_field,
+            )
+        })
+
+
+def _apply_team_deltas(deltas: dict) -> None:
+    """Apply {user_id: {field: delta}} to ReferralTeamStats with F() expressions.
+    Missing rows are created first; each field is then updated in one CASE statement.
+    """
+    deltas = {uid: d for uid, d in deltas.items() if any(d.values())}
+    if not deltas:
+        return
+    ReferralTeamStats.objects.bulk_create([ReferralTeamStats(user_id=uid) for uid in deltas], ignore_conflicts=True)
+    by_field = {}
+    for uid, d in deltas.items():
+        for field, value in d.items():
+            by_field.setdefault(field, {})[uid] = value
+    for field, per_user in by_field.items():
+        _bulk_increment(ReferralTeamStats.objects.all(), 'user_id', field, per_user)
+    ReferralTeamStats.objects.filter(user_id__in=list(deltas)).update(updated_at=timezone.now())
+
+
+def _ancestor_deltas(user_ids, field_pattern: str, amount=1, max_depth=TEAM_STATS_DEPTH) -> dict:
+    """Deltas for every ancestor (levels 1..max_depth, or all levels when max_depth is None)
+    of user_ids; field_pattern is formatted with the level."""
+    deltas = {}
+    rows = ReferralClosure.objects.filter(descendant_id__in=user_ids)
+    if max_depth is not None:
+        rows = rows.filter(depth__lte=max_depth)
+    rows = (
+        rows
+        .values('ancestor_id', 'depth')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    for r in rows:
+        field = field_pattern.format(level=r['depth'])
+        d = deltas.setdefault(r['ancestor_id'], {})
+        d[field] = d.get(field, 0) + amount * r['n']
+    return deltas
+
+
+def _merge_deltas(*parts) -> dict:
+    merged = {}
+    for part in parts:
+        for uid, d in part.items():
+            merged.setdefault(uid, {}).update(d)
+    return merged
+
+
+def record_team_signup(user: User) -> None:
+    """Count a newly linked user in its upline's level counters and team sizes."""
+    parts = [
+        _ancestor_deltas([user.id], 'level{level}_count'),
+        _ancestor_deltas([user.id], 'team_size', max_depth=None),
+    ]
+    if user.is_approved:
+        parts.append(_ancestor_deltas([user.id], 'level{level}_approved_count'))
+    _apply_team_deltas(_merge_deltas(*parts))
+
+
+def record_team_approval_change(user_ids, approved: bool) -> None:
+    """Adjust upline approved counters for users whose is_approved flag just flipped."""
+    _apply_team_deltas(_ancestor_deltas(list(user_ids), 'level{level}_approved_count', 1 if approved else -1))
+
+
+def record_team_deposit(user: User, amount_usd: Decimal) -> None:
+    """Add a credited deposit to the team volume (levels 1-3 and whole subtree) of the user's upline."""
+    amount = Decimal(amount_usd)
+    _apply_team_deltas(_merge_deltas(
+        _ancestor_deltas([user.id], 'team_deposit_usd', amount),
+        _ancestor_deltas([user.id], 'team_volume_usd', amount, max_depth=None),
+    ))
+
+
+def team_stats_scope(user: User) -> set:
+    """Users whose team counters depend on user's position in the tree: its whole upline
+    (subtree totals) and the uplines of its descendants down to TEAM_STATS_DEPTH - 1 (level counters)."""
+    members = [user.id] + list(
+        ReferralClosure.objects.filter(ancestor=user, depth__lt=TEAM_STATS_DEPTH).values_list('descendant_id', flat=True)
+    )
+    return set(
+        ReferralClosure.objects
+        .filter(Q(descendant_id__in=members, depth__lte=TEAM_STATS_DEPTH) | Q(descendant=user))
+        .values_list('ancestor_id', flat=True)
+    )
+
+
+def rebuild_team_stats(user_ids=None) -> int:
+    """Recompute ReferralTeamStats from the closure table, deposits and payouts.
+    Rebuilds every row when user_ids is None, otherwise only the given users.
+    Returns the number of rows written.
+    """
+    closure_filter = {'depth__lte': TEAM_STATS_DEPTH}
+    # Both conditions on the multi-valued relation must sit in one filter() call to share the join
+    deposit_filter = {'status': 'CREDITED', 'user__referral_ancestors__depth__lte': TEAM_STATS_DEPTH}
+    payout_filter = {}
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        closure_filter['ancestor_id__in'] = user_ids
+        deposit_filter['user__referral_ancestors__ancestor_id__in'] = user_ids
+        payout_filter['referrer_id__in'] = user_ids
+    # Whole-subtree totals: same filters without the depth bound
+    subtree_filter = {k: v for k, v in closure_filter.items() if k != 'depth__lte'}
+    volume_filter = {k: v for k, v in deposit_filter.items() if k != 'user__referral_ancestors__depth__lte'}
+    volume_filter['user__referral_ancestors__isnull'] = False
+    closure = ReferralClosure.objects.filter(**closure_filter)
+    deposits = DepositRequest.objects.filter(**deposit_filter)
+    payouts = ReferralPayout.objects.filter(**payout_filter)
+    subtree = ReferralClosure.objects.filter(**subtree_filter)
+    volume = DepositRequest.objects.filter(**volume_filter)
+
+    stats = {}
+
+    def row(uid):
+        if uid not in stats:
+            stats[uid] = ReferralTeamStats(user_id=uid)
+        return stats[uid]
+
+    for r in (
+        closure.values('ancestor_id', 'depth')
+        .annotate(n=Count('id'), approved=Count('id', filter=Q(descendant__is_approved=True)))
+        .order_by()
+    ):
+        obj = row(r['ancestor_id'])
+        setattr(obj, f"level{r['depth']}_count", r['n'])
+        setattr(obj, f"level{r['depth']}_approved_count", r['approved'])
+    for r in deposits.values('user__referral_ancestors__ancestor_id').annotate(total=Sum('amount_usd')).order_by():
+        row(r['user__referral_ancestors__ancestor_id']).team_deposit_usd = r['total'] or Decimal('0')
+    for r in payouts.values('referrer_id').annotate(total=Sum('amount_usd')).order_by():
+        row(r['referrer_id']).lifetime_earnings_usd = r['total'] or Decimal('0')
+    for r in subtree.values('ancestor_id').annotate(n=Count('id')).order_by():
+        row(r['ancestor_id']).team_size = r['n']
+    for r in volume.values('user__referral_ancestors__ancestor_id').annotate(total=Sum('amount_usd')).order_by():
+        row(r['user__referral_ancestors__ancestor_id']).team_volume_usd = r['total'] or Decimal('0')
+
+    with transaction.atomic():
+        existing = ReferralTeamStats.objects.all()
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+        existing.delete()
+        ReferralTeamStats.objects.bulk_create(stats.values(), batch_size=1000)
+    return len(stats)
+
+
 def _credit(wallet: Wallet, amount: Decimal, meta: dict):
     # Add to income_usd (withdrawable income)
     # DO NOT add to available_usd (which is only for 80% of deposits)
@@ -30,22 +293,45 @@ def record_direct_first_investment(referrer: User, direct: User, amount_usd: Dec
     Windows: [10, 30, 100] directs; award is a percentage of the combined first-investment amounts in the window.
     Payout percents: 10 → 1%, 30 → 3%, 100 → 5%.
     After payout, the window resets and advances to the next stage.
+
+    Membership is one insert into ReferralMilestoneMember (unique per window) and the window
+    aggregates are bumped with F() expressions, so concurrent first investments by different
+    directs never rewrite each other's state. Only closing a window takes a row lock.
     """
     pct_map = {10: Decimal('0.01'), 30: Decimal('0.03'), 100: Decimal('0.05')}
+    amount = Decimal(amount_usd).quantize(Decimal('0.01'))
     prog, _ = ReferralMilestoneProgress.objects.get_or_create(user=referrer)
-    target = prog.current_target()
 
-    # Only count each direct once per window
-    included = set(prog.included_direct_ids or [])
-    if direct.id in included:
+    for _attempt in range(3):
+        window_no = prog.window_no
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    ReferralMilestoneMember.objects.create(progress=prog, window_no=window_no, direct=direct, amount_usd=amount)
+            except IntegrityError:
+                return  # Only count each direct once per window
+            counted = ReferralMilestoneProgress.objects.filter(pk=prog.pk, window_no=window_no).update(
+                current_count=F('current_count') + 1,
+                current_sum_usd=F('current_sum_usd') + amount,
+            )
+            if counted:
+                break
+            # The window closed between reading progress and inserting; retry in the new window
+            ReferralMilestoneMember.objects.filter(progress=prog, window_no=window_no, direct=direct).delete()
+        prog.refresh_from_db()
+    else:
+        logger.warning(f"Milestone membership for direct {direct.id} of {referrer.id} not recorded after retries")
         return
 
-    included.add(direct.id)
-    prog.included_direct_ids = list(included)
-    prog.current_count += 1
-    prog.current_sum_usd = (Decimal(prog.current_sum_usd) + Decimal(amount_usd)).quantize(Decimal('0.01'))
+    current_count, stage_index = ReferralMilestoneProgress.objects.filter(pk=prog.pk).values_list('current_count', 'stage_index').get()
+    if current_count < ReferralMilestoneProgress.STAGES[stage_index]:
+        return
 
-    if prog.current_count >= target:
+    with transaction.atomic():
+        prog = ReferralMilestoneProgress.objects.select_for_update().get(pk=prog.pk)
+        target = prog.current_target()
+        if prog.window_no != window_no or prog.current_count < target:
+            return  # another worker already closed this window
         pct = pct_map.get(target, Decimal('0'))
         award = (Decimal(prog.current_sum_usd) * pct).quantize(Decimal('0.01')) if pct > 0 else Decimal('0')
         if award > 0:
@@ -53,7 +339,92 @@ def record_direct_first_investment(referrer: User, direct: User, amount_usd: Dec
             _credit(wallet, award, meta={'type': 'milestone', 'target': target, 'sum_usd': str(prog.current_sum_usd), 'pct': str(pct)})
             ReferralMilestoneAward.objects.create(user=referrer, target=target, amount_usd=award)
         prog.advance_stage()
-    prog.save()
+        prog.save()
+
+
+def pay_referrals_batch(entries, trigger: str) -> dict:
+    """Pay level 1-3 referral rewards for many buyers in a fixed number of queries.
+
+    entries: iterable of (buyer_id, base_usd, extra_meta) where base_usd is the amount the
+    tier percentages apply to and extra_meta is merged into each ledger entry's meta.
+
+    Uplines of all buyers are resolved with one closure-table query, payouts are computed
+    in memory, then ReferralPayout rows, wallet income deltas (one CASE update), ledger
+    rows and team stats are written in bulk. Buyer rows are locked for the duration and
+    already-paid (referrer, referee, level) triples are skipped, so re-running a batch is
+    a no-op; the unique_together on ReferralPayout backs this up against any other writer.
+    """
+    entries = [(int(bid), Decimal(str(base)), meta or {}) for bid, base, meta in entries]
+    if not entries:
+        return {'payouts': 0, 'total_usd': Decimal('0.00')}
+    buyer_ids = [bid for bid, _, _ in entries]
+
+    with transaction.atomic():
+        list(User.objects.select_for_update().filter(id__in=buyer_ids).values_list('id', flat=True))
+
+        uplines = {}
+        for buyer_id, ancestor_id, depth in (
+            ReferralClosure.objects
+            .filter(descendant_id__in=buyer_ids, depth__lte=3)
+            .values_list('descendant_id', 'ancestor_id', 'depth')
+        ):
+            uplines.setdefault(buyer_id, []).append((ancestor_id, depth))
+        already_paid = set(
+            ReferralPayout.objects.filter(referee_id__in=buyer_ids).values_list('referrer_id', 'referee_id', 'level')
+        )
+
+        planned = []
+        for buyer_id, base, extra_meta in entries:
+            for ref_id, lvl in sorted(uplines.get(buyer_id, []), key=lambda x: x[1]):
+                if (ref_id, buyer_id, lvl) in already_paid:
+                    continue
+                pct = REFERRAL_TIERS[lvl-1]
+                amt = (base * pct).quantize(Decimal('0.01'))
+                if amt <= 0:
+                    continue
+                already_paid.add((ref_id, buyer_id, lvl))  # guards against duplicate entries in one batch
+                meta = {'type': 'referral', 'level': lvl, 'source_user': buyer_id, 'trigger': trigger, 'base': str(base), 'pct': str(pct)}
+                meta.update(extra_meta)
+                planned.append((ref_id, buyer_id, lvl, amt, meta))
+        if not planned:
+            return {'payouts': 0, 'total_usd': Decimal('0.00')}
+
+        referrer_ids = {p[0] for p in planned}
+        Wallet.objects.bulk_create([Wallet(user_id=uid) for uid in referrer_ids], ignore_conflicts=True)
+        wallet_of = dict(Wallet.objects.filter(user_id__in=referrer_ids).values_list('user_id', 'id'))
+
+        ReferralPayout.objects.bulk_create(
+            [ReferralPayout(referrer_id=r, referee_id=b, level=lvl, amount_usd=amt) for r, b, lvl, amt, _ in planned],
+            batch_size=1000,
+        )
+        # Add to income_usd (withdrawable income); DO NOT add to available_usd (deposits only)
+        income_deltas = {}
+        for ref_id, _, _, amt, _ in planned:
+            income_deltas[wallet_of[ref_id]] = income_deltas.get(wallet_of[ref_id], Decimal('0')) + amt
+        _bulk_increment(Wallet.objects.all(), 'id', 'income_usd', income_deltas)
+        Transaction.objects.bulk_create(
+            [
+                Transaction(wallet_id=wallet_of[ref_id], type=Transaction.CREDIT, amount_usd=amt, meta=meta)
+                for ref_id, _, _, amt, meta in planned
+            ],
+            batch_size=1000,
+        )
+        earnings = {}
+        for ref_id, _, _, amt, _ in planned:
+            earnings[ref_id] = earnings.get(ref_id, Decimal('0')) + amt
+        _apply_team_deltas({uid: {'lifetime_earnings_usd': amt} for uid, amt in earnings.items()})
+
+    return {'payouts': len(planned), 'total_usd': sum((p[3] for p in planned), Decimal('0.00'))}
+
+
+def _signup_base_usd(signup_amount_pkr) -> tuple:
+    """Return (signup_fee_pkr, base_usd) for an actual signup amount, falling back to SIGNUP_FEE_PKR."""
+    if signup_amount_pkr is None:
+        signup_fee_pkr = Decimal(str(settings.SIGNUP_FEE_PKR))
+    else:
+        signup_fee_pkr = Decimal(str(signup_amount_pkr))
+    rate = get_fx_rate()
+    return signup_fee_pkr, (signup_fee_pkr / rate).quantize(Decimal('0.01'))
 
 
 def pay_on_package_purchase(buyer: User, signup_amount_pkr: Decimal = None):
@@ -62,59 +433,38 @@ def pay_on_package_purchase(buyer: User, signup_amount_pkr: Decimal = None):
     - L2: 3%
     - L3: 1%
     Referral rewards are percentages of the signup payment amount (converted to USD).
-    Milestones (if configured) are also percentage-based of the same base amount.
-    
+    Milestones now trigger only on directs' first investments via record_direct_first_investment.
+
     Args:
         buyer: The user who is being approved
-        signup_amount_pkr: The actual signup amount in PKR (from SignupProof). 
+        signup_amount_pkr: The actual signup amount in PKR (from SignupProof).
                           If None, falls back to settings.SIGNUP_FEE_PKR
     """
-    # Determine signup payment base in USD from actual PKR amount or fallback to configured fee
-    if signup_amount_pkr is None:
-        signup_fee_pkr = Decimal(str(settings.SIGNUP_FEE_PKR))
-    else:
-        signup_fee_pkr = Decimal(str(signup_amount_pkr))
-    
-    rate = Decimal(str(settings.ADMIN_USD_TO_PKR))
-    base_signup_usd = (signup_fee_pkr / rate).quantize(Decimal('0.01'))
-
-    upline = []
-    cur = buyer.referred_by
-    level = 1
-    while cur and level <= 3:
-        upline.append((cur, level))
-        cur = cur.referred_by
-        level += 1
-
-    # Milestones now trigger only on directs' first investments via record_direct_first_investment.
-    # No milestone progression on signup approval.
-
-    # Payouts: percentage of signup payment
-    for ref_user, lvl in upline:
-        pct = REFERRAL_TIERS[lvl-1]
-        amt = (base_signup_usd * pct).quantize(Decimal('0.01'))
-        if amt <= 0:
-            continue
-        wallet, _ = Wallet.objects.get_or_create(user=ref_user)
-        _credit(wallet, amt, meta={'type': 'referral', 'level': lvl, 'source_user': buyer.id, 'trigger': 'join', 'base': str(base_signup_usd), 'pct': str(pct), 'signup_amount_pkr': str(signup_fee_pkr)})
-        ReferralPayout.objects.create(referrer=ref_user, referee=buyer, level=lvl, amount_usd=amt)
+    signup_fee_pkr, base_signup_usd = _signup_base_usd(signup_amount_pkr)
+    return pay_referrals_batch(
+        [(buyer.id, base_signup_usd, {'signup_amount_pkr': str(signup_fee_pkr)})],
+        trigger='join',
+    )
+
+
+def pay_on_package_purchase_batch(buyer_ids) -> dict:
+    """Join-time referral rewards for many approved buyers at once (mass approvals).
+    Each buyer's latest SignupProof amount is the base, loaded with one query."""
+    from apps.accounts.models import SignupProof
+
+    buyer_ids = list(buyer_ids)
+    latest_amount = {}
+    for user_id, amount_pkr in (
+        SignupProof.objects.filter(user_id__in=buyer_ids).order_by('user_id', '-created_at').values_list('user_id', 'amount_pkr')
+    ):
+        latest_amount.setdefault(user_id, amount_pkr)
+    entries = []
+    for buyer_id in buyer_ids:
+        signup_fee_pkr, base_usd = _signup_base_usd(latest_amount.get(buyer_id))
+        entries.append((buyer_id, base_usd, {'signup_amount_pkr': str(signup_fee_pkr)}))
+    return pay_referrals_batch(entries, trigger='join')
 
 
 def pay_on_first_investment(buyer: User, amount_usd: Decimal):
     """Distribute referral rewards on buyer's first investment using same tiers (% of investment amount)."""
-    upline = []
-    cur = buyer.referred_by
-    level = 1
-    while cur and level <= 3:
-        upline.append((cur, level))
-        cur = cur.referred_by
-        level += 1
-
-    for ref_user, lvl in upline:
-        pct = REFERRAL_TIERS[lvl-1]
-        amt = (Decimal(amount_usd) * pct).quantize(Decimal('0.01'))
-        if amt <= 0:
-            continue
-        wallet, _ = Wallet.objects.get_or_create(user=ref_user)
-        _credit(wallet, amt, meta={'type': 'referral', 'level': lvl, 'source_user': buyer.id, 'trigger': 'first_investment', 'base': str(amount_usd), 'pct': str(pct)})
-        ReferralPayout.objects.create(referrer=ref_user, referee=buyer, level=lvl, amount_usd=amt)
\ No newline at end of file
+    return pay_referrals_batch([(buyer.id, Decimal(amount_usd), {})], trigger='first_investment')
@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, pre_delete
+from .services import rebuild_team_stats, unlink_referral
+
+User = get_user_model()
+
+
+def _user_deleting(sender, instance, **kwargs):
+    # Children are orphaned (referred_by SET_NULL): drop their closure rows to the old upline
+    instance._referral_team_scope = unlink_referral(instance)
+
+
+def _user_deleted(sender, instance, **kwargs):
+    scope = getattr(instance, '_referral_team_scope', None)
+    if scope:
+        rebuild_team_stats(scope)
+
+
+pre_delete.connect(_user_deleting, sender=User, dispatch_uid='referral_user_deleting')
+post_delete.connect(_user_deleted, sender=User, dispatch_uid='referral_user_deleted')
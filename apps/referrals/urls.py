@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import MyReferralsView, MyReferralListView, AdminReferralSummaryView
+from .views import MyReferralsView, MyReferralListView, ReferralTreeView, AdminReferralSummaryView
 
 urlpatterns = [
     path('me/', MyReferralsView.as_view()),
     path('list/', MyReferralListView.as_view()),
+    path('tree/', ReferralTreeView.as_view()),
     path('admin/summary/', AdminReferralSummaryView.as_view()),
 ]
\ No newline at end of file
@@ -1,7 +1,8 @@
 from rest_framework import views, permissions
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from .models import ReferralPayout, ReferralMilestoneProgress, ReferralMilestoneAward
+from .models import ReferralPayout, ReferralMilestoneProgress, ReferralMilestoneAward, ReferralTeamStats, ReferralClosure
+from .services import downline_queryset
 
 User = get_user_model()
 
@@ -9,12 +10,8 @@ class MyReferralsView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        # counts
-        l1 = User.objects.filter(referred_by=request.user).count()
-        l2 = User.objects.filter(referred_by__referred_by=request.user).count()
-        l3 = User.objects.filter(referred_by__referred_by__referred_by=request.user).count()
-        payouts = ReferralPayout.objects.filter(referrer=request.user)
-        total_earnings = sum(p.amount_usd for p in payouts)
+        # counts and totals from the denormalized team stats row
+        stats = ReferralTeamStats.objects.filter(user=request.user).first() or ReferralTeamStats(user=request.user)
 
         # milestone progress
         prog = None
@@ -37,10 +34,14 @@ class MyReferralsView(views.APIView):
         ]
 
         return Response({
-            'level1_count': l1,
-            'level2_count': l2,
-            'level3_count': l3,
-            'total_earnings_usd': float(total_earnings),
+            'level1_count': stats.level1_count,
+            'level2_count': stats.level2_count,
+            'level3_count': stats.level3_count,
+            'level1_approved_count': stats.level1_approved_count,
+            'level2_approved_count': stats.level2_approved_count,
+            'level3_approved_count': stats.level3_approved_count,
+            'team_deposit_usd': float(stats.team_deposit_usd),
+            'total_earnings_usd': float(stats.lifetime_earnings_usd),
             'milestone': {
                 'current_count': current,
                 'current_target': target,
@@ -52,15 +53,13 @@ class MyReferralListView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        level = int(request.query_params.get('level', '1'))
-        if level == 1:
-            qs = User.objects.filter(referred_by=request.user)
-        elif level == 2:
-            qs = User.objects.filter(referred_by__referred_by=request.user)
-        elif level == 3:
-            qs = User.objects.filter(referred_by__referred_by__referred_by=request.user)
-        else:
+        try:
+            level = int(request.query_params.get('level', '1'))
+        except ValueError:
+            level = 0
+        if level < 1:
             return Response({'detail': 'Invalid level'}, status=400)
+        qs = downline_queryset(request.user, level)
         data = [
             {
                 'id': u.id,
@@ -76,6 +75,65 @@ class MyReferralListView(views.APIView):
         return Response({'results': data})
 
 
+def _tree_node(u):
+    stats = getattr(u, 'referral_team_stats', None) or ReferralTeamStats(user=u)
+    return {
+        'id': u.id,
+        'username': u.username,
+        'first_name': u.first_name,
+        'last_name': u.last_name,
+        'is_approved': u.is_approved,
+        'date_joined': u.date_joined.isoformat() if getattr(u, 'date_joined', None) else None,
+        'direct_count': stats.level1_count,
+        'team_size': stats.team_size,
+        'team_volume_usd': float(stats.team_volume_usd),
+        'has_children': stats.level1_count > 0,
+    }
+
+
+class ReferralTreeView(views.APIView):
+    """One level of the genealogy tree: the direct referrals of `node` (default: the caller).
+
+    Children are keyset-paginated by id (`cursor` = last id seen, `limit` <= 200) and carry
+    subtree size/volume from ReferralTeamStats, so branches can be expanded on demand.
+    Non-staff callers may only open their own node or nodes inside their downline.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    DEFAULT_LIMIT = 50
+    MAX_LIMIT = 200
+
+    def get(self, request):
+        try:
+            node_id = int(request.query_params.get('node', request.user.id))
+            cursor = int(request.query_params.get('cursor', '0'))
+            limit = int(request.query_params.get('limit', self.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'detail': 'Invalid node, cursor or limit'}, status=400)
+        limit = max(1, min(limit, self.MAX_LIMIT))
+
+        if node_id != request.user.id and not request.user.is_staff:
+            if not ReferralClosure.objects.filter(ancestor=request.user, descendant_id=node_id).exists():
+                return Response({'detail': 'Not found'}, status=404)
+        node = User.objects.select_related('referral_team_stats').filter(pk=node_id).first()
+        if node is None:
+            return Response({'detail': 'Not found'}, status=404)
+
+        children = list(
+            User.objects.select_related('referral_team_stats')
+            .filter(referred_by_id=node_id, id__gt=cursor)
+            .order_by('id')[:limit + 1]
+        )
+        next_cursor = None
+        if len(children) > limit:
+            children = children[:limit]
+            next_cursor = children[-1].id
+        return Response({
+            'node': _tree_node(node),
+            'results': [_tree_node(u) for u in children],
+            'next_cursor': next_cursor,
+        })
+
+
 class AdminReferralSummaryView(views.APIView):
     permission_classes = [permissions.IsAdminUser]
 
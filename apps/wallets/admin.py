@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.utils import timezone
 from django.utils.html import format_html
-from .models import Wallet, Transaction, DepositRequest
+from core.images import derivative_url
+from .models import Wallet, Transaction, DepositRequest, PaymentReference, FxRate
+from apps.referrals.services import record_team_deposit
 
 @admin.register(Wallet)
 class WalletAdmin(admin.ModelAdmin):
@@ -27,7 +29,7 @@ class DepositRequestAdmin(admin.ModelAdmin):
 
     def proof_preview(self, obj):
         if obj.proof_image and hasattr(obj.proof_image, 'url'):
-            return format_html('<a href="{}" target="_blank"><img src="{}" style="max-height:60px;"/></a>', obj.proof_image.url, obj.proof_image.url)
+            return format_html('<a href="{}" target="_blank"><img src="{}" style="max-height:60px;"/></a>', obj.proof_image.url, derivative_url(obj.proof_image, 'thumb'))
         return ""
     proof_preview.short_description = "Proof"
 
@@ -53,6 +55,7 @@ class DepositRequestAdmin(admin.ModelAdmin):
                 dr.status = 'CREDITED'
                 dr.processed_at = timezone.now()
                 dr.save()
+                record_team_deposit(dr.user, dr.amount_usd)
                 count += 1
         self.message_user(request, f"Approved and credited {count} deposit(s).")
     approve_deposits.short_description = "Approve & Credit selected deposits"
@@ -83,6 +86,30 @@ class DepositRequestAdmin(admin.ModelAdmin):
                 dr.status = 'CREDITED'
                 dr.processed_at = timezone.now()
                 dr.save()
+                record_team_deposit(dr.user, dr.amount_usd)
                 count += 1
         self.message_user(request, f"Credited {count} deposit(s).")
-    credit_deposits.short_description = "Credit selected deposits"
\ No newline at end of file
+    credit_deposits.short_description = "Credit selected deposits"
+
+@admin.register(PaymentReference)
+class PaymentReferenceAdmin(admin.ModelAdmin):
+    list_display = ("source", "object_id", "user", "ref_hash", "created_at")
+    list_filter = ("source",)
+    search_fields = ("ref_hash",)
+    raw_id_fields = ("user",)
+
+@admin.register(FxRate)
+class FxRateAdmin(admin.ModelAdmin):
+    list_display = ("rate", "effective_from", "note", "created_by", "created_at")
+    readonly_fields = ("created_by", "created_at")
+
+    def get_readonly_fields(self, request, obj=None):
+        # Rates are versioned: add a new row instead of editing one that may already be in use
+        if obj is not None:
+            return ("rate", "effective_from", "created_by", "created_at")
+        return self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class WalletsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.wallets'
\ No newline at end of file
+    name = 'apps.wallets'
+
+    def ready(self) -> None:
+        from . import signals  # noqa
+        return super().ready()
@@ -0,0 +1,101 @@
+"""
+USD -> PKR rates from the versioned FxRate table, cached in-process.
+
+The whole rate history (a handful of rows) is held in memory and looked up with a bisect
+on effective_from, so conversions never hit the database. At most every
+FX_RATE_CHECK_SECONDS the cache compares a cheap version (row count + max id) with the
+table and reloads when an admin added or removed a rate; saves in this process
+invalidate it immediately. Rates scheduled for the future switch over by themselves.
+
+Usage:
+    from apps.wallets.fx import get_fx_rate, fx_rate_at, convert_many
+    rate = get_fx_rate()
+    pkr = convert_many([usd1, usd2], at=[created1, created2])
+"""
+import threading
+import time
+from bisect import bisect_right
+from decimal import Decimal
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+from .models import FxRate
+
+
+class _RateCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.checked_at = 0.0
+        self.starts = []  # effective_from, ascending
+        self.rates = []   # (rate, id) aligned with starts
+
+
+_cache = _RateCache()
+
+
+def _check_interval() -> float:
+    return float(getattr(settings, 'FX_RATE_CHECK_SECONDS', 5))
+
+
+def _refresh(force: bool = False) -> None:
+    now = time.monotonic()
+    if not force and _cache.version is not None and now - _cache.checked_at < _check_interval():
+        return
+    with _cache.lock:
+        if not force and _cache.version is not None and now - _cache.checked_at < _check_interval():
+            return
+        agg = FxRate.objects.aggregate(n=Count('id'), v=Max('id'))
+        version = (agg['n'], agg['v'])
+        if version != _cache.version:
+            rows = list(FxRate.objects.order_by('effective_from', 'id').values_list('effective_from', 'rate', 'id'))
+            _cache.starts = [r[0] for r in rows]
+            _cache.rates = [(Decimal(r[1]), r[2]) for r in rows]
+            _cache.version = version
+        _cache.checked_at = time.monotonic()
+
+
+def invalidate() -> None:
+    """Force a version check on the next lookup (called when FxRate rows change)."""
+    _cache.checked_at = 0.0
+
+
+def _lookup(at):
+    i = bisect_right(_cache.starts, at) - 1
+    if i >= 0:
+        return _cache.rates[i]
+    if _cache.rates:
+        return _cache.rates[0]  # before the first recorded rate: use the oldest one
+    return Decimal(str(settings.ADMIN_USD_TO_PKR)), None
+
+
+def fx_rate_at(at=None):
+    """(rate, FxRate id) in effect at `at` (default now); id is None when falling back to settings."""
+    _refresh()
+    return _lookup(at or timezone.now())
+
+
+def get_fx_rate(at=None) -> Decimal:
+    return fx_rate_at(at)[0]
+
+
+def convert_many(amounts, at=None, to_pkr: bool = True):
+    """
+    Convert many amounts with one cache check. `at` is None (now), one datetime, or one
+    datetime per amount. USD -> PKR by default, PKR -> USD with to_pkr=False; results are
+    quantized to 0.01.
+    """
+    _refresh()
+    amounts = list(amounts)
+    if at is None or not isinstance(at, (list, tuple)):
+        moments = [at or timezone.now()] * len(amounts)
+    else:
+        moments = list(at)
+        if len(moments) != len(amounts):
+            raise ValueError('convert_many needs one timestamp per amount')
+    out = []
+    for amount, moment in zip(amounts, moments):
+        rate = _lookup(moment)[0]
+        value = Decimal(str(amount)) * rate if to_pkr else Decimal(str(amount)) / rate
+        out.append(value.quantize(Decimal('0.01')))
+    return out
@@ -0,0 +1,18 @@
+"""
+Index historical tx_ids (signup proofs, deposits, orders, withdrawals) into PaymentReference.
+New submissions are indexed automatically on save; rows already indexed are skipped.
+
+Usage:
+    python manage.py backfill_payment_references
+"""
+from django.core.management.base import BaseCommand
+from apps.wallets.references import REFERENCE_SOURCES, backfill_payment_references
+
+
+class Command(BaseCommand):
+    help = 'Backfill the cross-table payment reference index from existing rows'
+
+    def handle(self, *args, **options):
+        for source in REFERENCE_SOURCES:
+            created = backfill_payment_references(source)
+            self.stdout.write(self.style.SUCCESS(f'✅ {source}: indexed {created} references'))
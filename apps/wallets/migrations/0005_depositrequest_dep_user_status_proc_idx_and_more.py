@@ -0,0 +1,27 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallets', '0004_wallet_income_usd'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='depositrequest',
+            index=models.Index(fields=['user', 'status', 'processed_at'], name='dep_user_status_proc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='depositrequest',
+            index=models.Index(fields=['tx_id', 'status', 'created_at'], name='dep_tx_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['wallet', 'created_at'], name='tx_wallet_created_idx'),
+        ),
+    ]
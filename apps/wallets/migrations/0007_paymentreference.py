@@ -0,0 +1,32 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallets', '0006_depositrequest_proof_blob_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentReference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ref_hash', models.CharField(max_length=64)),
+                ('source', models.CharField(choices=[('signup_proof', 'Signup proof'), ('deposit', 'Deposit'), ('order', 'Order'), ('withdrawal', 'Withdrawal')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payment_references', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['ref_hash', 'created_at'], name='payref_hash_created_idx')],
+                'unique_together': {('source', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_current_rate(apps, schema_editor):
+    # Start the history with the rate the app was running on (settings.ADMIN_USD_TO_PKR)
+    from datetime import datetime, timezone as dt_timezone
+    from decimal import Decimal
+    FxRate = apps.get_model('wallets', 'FxRate')
+    if not FxRate.objects.exists():
+        FxRate.objects.create(
+            rate=Decimal(str(settings.ADMIN_USD_TO_PKR)),
+            effective_from=datetime(2000, 1, 1, tzinfo=dt_timezone.utc),
+            note='Initial rate from ADMIN_USD_TO_PKR',
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallets', '0007_paymentreference'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FxRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rate', models.DecimalField(decimal_places=4, max_digits=10)),
+                ('effective_from', models.DateTimeField(db_index=True)),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-effective_from', '-id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='depositrequest',
+            name='fx_rate_record',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='wallets.fxrate'),
+        ),
+        migrations.RunPython(seed_current_rate, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:40
+
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallets', '0008_fxrate'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fxrate',
+            name='rate',
+            field=models.DecimalField(decimal_places=4, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.0001'))]),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallets', '0009_fxrate_rate_positive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='depositrequest',
+            name='dep_user_status_proc_idx',
+        ),
+        migrations.AddIndex(
+            model_name='depositrequest',
+            index=models.Index(fields=['user', 'status', 'processed_at', 'created_at'], name='dep_user_status_proc_idx'),
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.core.validators import MinValueValidator
 from django.db import models
+from core.storage import proof_storage
 from django.conf import settings
 from decimal import Decimal
 
@@ -51,20 +53,74 @@ class Transaction(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # wallet ledger listings (newest first)
+            models.Index(fields=['wallet', 'created_at'], name='tx_wallet_created_idx'),
+        ]
+
+class FxRate(models.Model):
+    """USD -> PKR rate, versioned: a new row takes effect at effective_from (rows are never edited)."""
+    rate = models.DecimalField(max_digits=10, decimal_places=4, validators=[MinValueValidator(Decimal('0.0001'))])
+    effective_from = models.DateTimeField(db_index=True)
+    note = models.CharField(max_length=200, blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-effective_from', '-id']
+
+    def __str__(self):
+        return f"1 USD = {self.rate} PKR from {self.effective_from:%Y-%m-%d %H:%M}"
 
 class DepositRequest(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='deposit_requests')
     amount_pkr = models.DecimalField(max_digits=14, decimal_places=2)
     amount_usd = models.DecimalField(max_digits=14, decimal_places=2)
     fx_rate = models.DecimalField(max_digits=10, decimal_places=4)
+    fx_rate_record = models.ForeignKey(FxRate, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     tx_id = models.CharField(max_length=100)
     # New fields for bank/account info
     bank_name = models.CharField(max_length=120, blank=True)
     account_name = models.CharField(max_length=120, blank=True)
-    proof_image = models.ImageField(upload_to='deposit_proofs/', null=True, blank=True)
+    proof_image = models.ImageField(upload_to='deposit_proofs/', null=True, blank=True, storage=proof_storage, db_index=True)
     status = models.CharField(max_length=20, default='PENDING')  # PENDING/APPROVED/REJECTED/CREDITED
     created_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            # first credited deposit per user (passive income start)
+            models.Index(fields=['user', 'status', 'processed_at', 'created_at'], name='dep_user_status_proc_idx'),
+            # SIGNUP-INIT deposits of a given day (global pool collection)
+            models.Index(fields=['tx_id', 'status', 'created_at'], name='dep_tx_status_created_idx'),
+        ]
+
+class PaymentReference(models.Model):
+    """
+    One row per submitted bank/wallet transaction id (signup proofs, deposits, orders,
+    withdrawals), keyed by a hash of the normalized reference, so "has this tx_id been used
+    before, and where" is a single indexed lookup instead of a scan of four tables.
+    """
+    SOURCE_CHOICES = [
+        ('signup_proof', 'Signup proof'),
+        ('deposit', 'Deposit'),
+        ('order', 'Order'),
+        ('withdrawal', 'Withdrawal'),
+    ]
+
+    ref_hash = models.CharField(max_length=64)  # sha256 of the normalized tx_id
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='payment_references')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['created_at']
+        unique_together = ('source', 'object_id')
+        indexes = [
+            models.Index(fields=['ref_hash', 'created_at'], name='payref_hash_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} #{self.object_id} ({self.ref_hash[:12]})"
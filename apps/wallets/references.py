@@ -0,0 +1,128 @@
+"""
+Cross-table payment reference index (PaymentReference).
+
+Transaction ids typed into signup proofs, deposits, orders and withdrawals are normalized
+(upper-case, letters and digits only) and hashed; every submit upserts one row, so reuse
+of a reference anywhere is found with one lookup on payref_hash_created_idx.
+"""
+import hashlib
+import re
+from django.apps import apps
+from rest_framework import serializers
+from core.db import iter_keyset
+from core.storage import ProofListSerializer
+from .models import PaymentReference
+
+# source -> (model label, owner field)
+REFERENCE_SOURCES = {
+    'signup_proof': ('accounts.SignupProof', 'user_id'),
+    'deposit': ('wallets.DepositRequest', 'user_id'),
+    'order': ('marketplace.Order', 'buyer_id'),
+    'withdrawal': ('withdrawals.WithdrawalRequest', 'user_id'),
+}
+IGNORED_REFERENCES = {'SIGNUPINIT'}  # internal marker on the signup-fee deposit, not a bank reference
+_NON_ALNUM = re.compile(r'[^0-9A-Z]')
+
+
+def normalize_reference(tx_id) -> str:
+    value = _NON_ALNUM.sub('', str(tx_id or '').upper())
+    return '' if value in IGNORED_REFERENCES else value
+
+
+def reference_hash(tx_id) -> str | None:
+    value = normalize_reference(tx_id)
+    return hashlib.sha256(value.encode()).hexdigest() if value else None
+
+
+def record_payment_reference(source: str, obj) -> None:
+    """Upsert (or drop) the index row for one submitted object."""
+    ref_hash = reference_hash(obj.tx_id)
+    if ref_hash is None:
+        PaymentReference.objects.filter(source=source, object_id=obj.pk).delete()
+        return
+    _, owner_field = REFERENCE_SOURCES[source]
+    PaymentReference.objects.update_or_create(
+        source=source, object_id=obj.pk,
+        defaults={'ref_hash': ref_hash, 'user_id': getattr(obj, owner_field), 'created_at': obj.created_at},
+    )
+
+
+def forget_payment_reference(source: str, object_id) -> None:
+    """Drop the index row of a deleted object."""
+    PaymentReference.objects.filter(source=source, object_id=object_id).delete()
+
+
+def _as_match(ref):
+    return {'source': ref.source, 'id': ref.object_id, 'user_id': ref.user_id, 'created_at': ref.created_at}
+
+
+def find_payment_references(tx_id, exclude=None):
+    """Everywhere `tx_id` was submitted (oldest first), optionally without one (source, id)."""
+    ref_hash = reference_hash(tx_id)
+    if ref_hash is None:
+        return []
+    refs = PaymentReference.objects.filter(ref_hash=ref_hash)
+    return [_as_match(r) for r in refs if exclude is None or (r.source, r.object_id) != tuple(exclude)]
+
+
+def reference_matches(source: str, items) -> dict:
+    """{object id: other submissions using the same reference} for a page of objects (1 query)."""
+    hashes = {obj.pk: reference_hash(obj.tx_id) for obj in items}
+    by_hash = {}
+    for ref in PaymentReference.objects.filter(ref_hash__in={h for h in hashes.values() if h}):
+        by_hash.setdefault(ref.ref_hash, []).append(ref)
+    return {
+        pk: [_as_match(r) for r in by_hash.get(h, []) if (r.source, r.object_id) != (source, pk)]
+        for pk, h in hashes.items() if h
+    }
+
+
+def backfill_payment_references(source: str, batch_size: int = 2000) -> int:
+    """Index every historical row of one source; returns the number of rows indexed."""
+    label, owner_field = REFERENCE_SOURCES[source]
+    model = apps.get_model(label)
+    done = set(PaymentReference.objects.filter(source=source).values_list('object_id', flat=True))
+    batch, created = [], 0
+    # Keyset chunks, not .iterator(): no server-side cursor to lose behind the transaction pooler
+    for pk, tx_id, owner_id, created_at in iter_keyset(
+        model.objects.all(), 'tx_id', owner_field, 'created_at', chunk_size=batch_size,
+    ):
+        ref_hash = reference_hash(tx_id)
+        if ref_hash is None or pk in done:
+            continue
+        batch.append(PaymentReference(ref_hash=ref_hash, source=source, object_id=pk, user_id=owner_id, created_at=created_at))
+        if len(batch) >= batch_size:
+            PaymentReference.objects.bulk_create(batch, ignore_conflicts=True)
+            created += len(batch)
+            batch = []
+    PaymentReference.objects.bulk_create(batch, ignore_conflicts=True)
+    return created + len(batch)
+
+
+class ReferenceListSerializer(serializers.ListSerializer):
+    """Resolves `tx_id_matches` for a whole page with one query (staff requests only)."""
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        if _is_staff(self.child):
+            self.child._tx_matches = reference_matches(self.child.reference_source, items)
+        return super().to_representation(items)
+
+
+class ProofReferenceListSerializer(ReferenceListSerializer, ProofListSerializer):
+    """Page-level `tx_id_matches` plus `proof_reused` for serializers of proof-carrying models."""
+
+
+def _is_staff(serializer) -> bool:
+    request = serializer.context.get('request')
+    return bool(request and request.user and request.user.is_staff)
+
+
+def tx_id_matches(serializer, obj):
+    """Other submissions with the same tx_id for staff, None for everyone else."""
+    if not _is_staff(serializer):
+        return None
+    matches = getattr(serializer, '_tx_matches', None)
+    if matches is not None:
+        return matches.get(obj.pk, [])
+    return find_payment_references(obj.tx_id, exclude=(serializer.reference_source, obj.pk))
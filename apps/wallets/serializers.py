@@ -1,5 +1,9 @@
 from rest_framework import serializers
-from .models import Wallet, Transaction, DepositRequest
+from core.images import derivative_url
+from core.storage import proof_reused
+from core.uploads import BoundedImageField
+from .models import Wallet, Transaction, DepositRequest, FxRate
+from .references import ProofReferenceListSerializer, tx_id_matches
 
 class WalletSerializer(serializers.ModelSerializer):
     current_income_usd = serializers.SerializerMethodField()
@@ -30,9 +34,21 @@ class TransactionSerializer(serializers.ModelSerializer):
         model = Transaction
         fields = ["id", "type", "amount_usd", "meta", "created_at"]
 
+class FxRateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FxRate
+        fields = ["id", "rate", "effective_from", "note", "created_by", "created_at"]
+        read_only_fields = ["created_by", "created_at"]
+        extra_kwargs = {"effective_from": {"required": False}}
+
 class DepositRequestSerializer(serializers.ModelSerializer):
+    proof_image = BoundedImageField(required=False, allow_null=True)
     proof_image_url = serializers.SerializerMethodField(read_only=True)
+    proof_thumb_url = serializers.SerializerMethodField(read_only=True)
+    proof_reused = serializers.SerializerMethodField(read_only=True)
+    tx_id_matches = serializers.SerializerMethodField(read_only=True)
     user = serializers.SerializerMethodField(read_only=True)  # expose username/email to admin UI
+    reference_source = 'deposit'
 
     class Meta:
         model = DepositRequest
@@ -47,11 +63,15 @@ class DepositRequestSerializer(serializers.ModelSerializer):
             "account_name",
             "proof_image",
             "proof_image_url",
+            "proof_thumb_url",
+            "proof_reused",
+            "tx_id_matches",
             "status",
             "created_at",
             "processed_at",
         ]
         read_only_fields = ["user", "amount_usd", "fx_rate", "status", "processed_at"]
+        list_serializer_class = ProofReferenceListSerializer
 
     def get_user(self, obj):
         u = obj.user
@@ -64,4 +84,17 @@ class DepositRequestSerializer(serializers.ModelSerializer):
             if request is not None:
                 return request.build_absolute_uri(url)
             return url
-        return None
\ No newline at end of file
+        return None
+
+    def get_proof_thumb_url(self, obj):
+        url = derivative_url(obj.proof_image, 'thumb')
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def get_proof_reused(self, obj):
+        return proof_reused(self, obj)
+
+    def get_tx_id_matches(self, obj):
+        return tx_id_matches(self, obj)
\ No newline at end of file
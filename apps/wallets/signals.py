@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_save
+from .fx import invalidate as invalidate_fx_cache
+from core.images import watch_image_fields
+from .models import DepositRequest, FxRate
+from .references import REFERENCE_SOURCES, forget_payment_reference, record_payment_reference
+
+
+def _index_reference(source):
+    def handler(sender, instance, update_fields=None, **kwargs):
+        if update_fields is not None and 'tx_id' not in update_fields:
+            return
+        record_payment_reference(source, instance)
+    return handler
+
+
+def _forget_reference(source):
+    def handler(sender, instance, **kwargs):
+        forget_payment_reference(source, instance.pk)
+    return handler
+
+
+# Keep the PaymentReference index in sync with every submitted tx_id
+for _source, (_model, _owner) in REFERENCE_SOURCES.items():
+    post_save.connect(_index_reference(_source), sender=_model, weak=False, dispatch_uid=f'payment_reference_{_source}')
+    post_delete.connect(_forget_reference(_source), sender=_model, weak=False, dispatch_uid=f'payment_reference_{_source}_deleted')
+
+
+def _fx_rates_changed(sender, **kwargs):
+    invalidate_fx_cache()
+
+
+post_save.connect(_fx_rates_changed, sender=FxRate, dispatch_uid='fx_rate_saved')
+post_delete.connect(_fx_rates_changed, sender=FxRate, dispatch_uid='fx_rate_deleted')
+
+# Thumbnails / mid-size variants for uploaded deposit proofs (see core.images)
+watch_image_fields(DepositRequest)
@@ -5,6 +5,9 @@ from .views import (
     MyDepositsView,
     admin_deposit_action,
     AdminPendingDepositsView,
+    admin_payment_reference_lookup,
+    current_fx_rate,
+    AdminFxRatesView,
 )
 
 urlpatterns = [
@@ -13,4 +16,7 @@ urlpatterns = [
     path('me/deposits/', MyDepositsView.as_view()),
     path('admin/deposits/action/<int:pk>/', admin_deposit_action),
     path('admin/deposits/pending/', AdminPendingDepositsView.as_view()),
+    path('admin/payment-references/', admin_payment_reference_lookup),
+    path('fx-rate/', current_fx_rate),
+    path('admin/fx-rates/', AdminFxRatesView.as_view()),
 ]
\ No newline at end of file
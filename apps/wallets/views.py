@@ -1,18 +1,16 @@
 from decimal import Decimal
-from django.conf import settings
 from django.utils import timezone
 from rest_framework import generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from .models import Wallet, Transaction, DepositRequest
-from .serializers import WalletSerializer, TransactionSerializer, DepositRequestSerializer
+from .models import Wallet, Transaction, DepositRequest, FxRate
+from .serializers import WalletSerializer, TransactionSerializer, DepositRequestSerializer, FxRateSerializer
+from .references import find_payment_references
+from .fx import fx_rate_at
 from apps.referrals.models import ReferralPayout
-from apps.referrals.services import pay_on_package_purchase
+from apps.referrals.services import pay_on_package_purchase, record_team_deposit
 
 
-def get_fx_rate():
-    return Decimal(str(settings.ADMIN_USD_TO_PKR))
-
 class MyWalletView(generics.RetrieveAPIView):
     serializer_class = WalletSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -54,7 +52,7 @@ class MyDepositsView(generics.ListCreateAPIView):
         bank_name = self.request.data.get('bank_name', '')
         account_name = self.request.data.get('account_name', '')
         proof_image = self.request.FILES.get('proof_image')
-        rate = get_fx_rate()
+        rate, rate_id = fx_rate_at()
         try:
             amount_usd = (amount_pkr / rate).quantize(Decimal('0.01'))
         except (InvalidOperation, ZeroDivisionError):
@@ -63,12 +61,39 @@ class MyDepositsView(generics.ListCreateAPIView):
             user=self.request.user,
             amount_usd=amount_usd,
             fx_rate=rate,
+            fx_rate_record_id=rate_id,
             tx_id=tx_id,
             bank_name=bank_name,
             account_name=account_name,
             proof_image=proof_image,
         )
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def current_fx_rate(request):
+    rate, rate_id = fx_rate_at()
+    return Response({'usd_to_pkr': str(rate), 'fx_rate_id': rate_id})
+
+class AdminFxRatesView(generics.ListCreateAPIView):
+    """Rate history; POST adds a new rate (effective_from defaults to now), it applies without a restart."""
+    serializer_class = FxRateSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_queryset(self):
+        return FxRate.objects.all()[:200]
+
+    def perform_create(self, serializer):
+        effective_from = serializer.validated_data.get('effective_from') or timezone.now()
+        serializer.save(created_by=self.request.user, effective_from=effective_from)
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def admin_payment_reference_lookup(request):
+    """Where has this tx_id been submitted before? ?tx_id=<reference>"""
+    tx_id = request.query_params.get('tx_id', '')
+    matches = find_payment_references(tx_id)
+    return Response({'tx_id': tx_id, 'seen': bool(matches), 'matches': matches})
+
 class AdminPendingDepositsView(generics.ListAPIView):
     serializer_class = DepositRequestSerializer
     permission_classes = [permissions.IsAdminUser]
@@ -91,7 +116,7 @@ def admin_deposit_action(request, pk):
         dr.save()
     elif action == 'CREDIT':
         # Apply economics: split deposit into user available share, platform hold, and global pool
-        from apps.earnings.models_global_pool import GlobalPool
+        from apps.earnings.global_pool import add_pool_contribution
         from django.conf import settings as dj_settings
         from apps.referrals.services import pay_on_first_investment
         wallet, _ = Wallet.objects.get_or_create(user=dr.user)
@@ -105,10 +130,8 @@ def admin_deposit_action(request, pk):
         wallet.hold_usd = (Decimal(wallet.hold_usd) + platform_hold).quantize(Decimal('0.01'))
         wallet.save()
 
-        # Track pool balance
-        gp = GlobalPool.objects.first() or GlobalPool.objects.create()
-        gp.balance_usd = (Decimal(gp.balance_usd) + global_pool).quantize(Decimal('0.01'))
-        gp.save()
+        # Track pool balance (append-only ledger row, no shared row to lock)
+        add_pool_contribution(global_pool, 'deposit', user=dr.user, meta={'deposit_id': dr.id})
 
         # Record full deposit in transactions with breakdown
         Transaction.objects.create(
@@ -127,6 +150,7 @@ def admin_deposit_action(request, pk):
         dr.status = 'CREDITED'
         dr.processed_at = timezone.now()
         dr.save()
+        record_team_deposit(dr.user, dr.amount_usd)
 
         # Referral payouts on investment disabled; payouts handled on join approval (pay_on_package_purchase).
     else:
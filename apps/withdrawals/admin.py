@@ -1,13 +1,14 @@
 from decimal import Decimal
 from django.contrib import admin
 from django.utils import timezone
-from .models import WithdrawalRequest
+from .models import WithdrawalRequest, PayoutBatch
 from apps.wallets.models import Transaction
 
 @admin.register(WithdrawalRequest)
 class WithdrawalRequestAdmin(admin.ModelAdmin):
     list_display = ("user", "amount_usd", "amount_pkr", "method", "bank_name", "account_name", "account_number", "tx_id", "status", "created_at")
     list_filter = ("status", "method")
+    raw_id_fields = ("batch",)
     search_fields = ("user__email", "user__username", "tx_id", "account_details__account_name", "account_details__account_number")
     actions = ["approve_withdrawals", "reject_withdrawals", "mark_paid_withdrawals"]
 
@@ -53,4 +54,11 @@ class WithdrawalRequestAdmin(admin.ModelAdmin):
                 wr.save()
                 count += 1
         self.message_user(request, f"Marked {count} withdrawal(s) as paid.")
-    mark_paid_withdrawals.short_description = "Mark selected withdrawals as PAID"
\ No newline at end of file
+    mark_paid_withdrawals.short_description = "Mark selected withdrawals as PAID"
+
+
+@admin.register(PayoutBatch)
+class PayoutBatchAdmin(admin.ModelAdmin):
+    list_display = ("id", "method", "status", "item_count", "total_net_usd", "total_net_pkr", "created_by", "created_at", "settled_at")
+    list_filter = ("status", "method")
+    readonly_fields = ("method", "status", "item_count", "total_net_usd", "total_net_pkr", "created_by", "created_at", "settled_at", "settlement")
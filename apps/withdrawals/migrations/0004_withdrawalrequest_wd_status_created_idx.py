@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('withdrawals', '0003_withdrawalrequest_bank_and_account'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='withdrawalrequest',
+            index=models.Index(fields=['status', 'created_at'], name='wd_status_created_idx'),
+        ),
+    ]
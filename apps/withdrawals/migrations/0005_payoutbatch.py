@@ -0,0 +1,39 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('withdrawals', '0004_withdrawalrequest_wd_status_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayoutBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=20)),
+                ('status', models.CharField(choices=[('EXPORTED', 'Exported'), ('PAID', 'Paid')], default='EXPORTED', max_length=20)),
+                ('item_count', models.PositiveIntegerField(default=0)),
+                ('total_net_usd', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('total_net_pkr', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('settled_at', models.DateTimeField(blank=True, null=True)),
+                ('settlement', models.JSONField(blank=True, default=dict)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payout_batches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='withdrawalrequest',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='withdrawals', to='withdrawals.payoutbatch'),
+        ),
+    ]
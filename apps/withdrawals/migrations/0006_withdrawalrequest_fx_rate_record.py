@@ -0,0 +1,20 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallets', '0008_fxrate'),
+        ('withdrawals', '0005_payoutbatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='withdrawalrequest',
+            name='fx_rate_record',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='wallets.fxrate'),
+        ),
+    ]
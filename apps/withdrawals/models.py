@@ -1,6 +1,30 @@
 from django.db import models
 from django.conf import settings
 
+class PayoutBatch(models.Model):
+    """A group of APPROVED withdrawals of one method exported as a single bulk-transfer file."""
+    STATUS_CHOICES = [
+        ('EXPORTED', 'Exported'),  # file handed to the bank / wallet provider, awaiting settlement
+        ('PAID', 'Paid'),
+    ]
+
+    method = models.CharField(max_length=20)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='EXPORTED')
+    item_count = models.PositiveIntegerField(default=0)
+    total_net_usd = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    total_net_pkr = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='payout_batches')
+    created_at = models.DateTimeField(auto_now_add=True)
+    settled_at = models.DateTimeField(null=True, blank=True)
+    settlement = models.JSONField(default=dict, blank=True)  # summary of the uploaded settlement file
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Batch #{self.id} {self.method} ({self.item_count} payouts, {self.status})"
+
+
 class WithdrawalRequest(models.Model):
     METHOD_CHOICES = [
         ('BANK', 'Bank'),
@@ -12,6 +36,7 @@ class WithdrawalRequest(models.Model):
     amount_pkr = models.DecimalField(max_digits=14, decimal_places=2)
     amount_usd = models.DecimalField(max_digits=14, decimal_places=2)
     fx_rate = models.DecimalField(max_digits=10, decimal_places=4)
+    fx_rate_record = models.ForeignKey('wallets.FxRate', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     method = models.CharField(max_length=20, choices=METHOD_CHOICES)
     # New top-level bank/account fields
     bank_name = models.CharField(max_length=120, blank=True)
@@ -23,6 +48,11 @@ class WithdrawalRequest(models.Model):
     status = models.CharField(max_length=20, default='PENDING')  # PENDING/APPROVED/REJECTED/PAID
     created_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(null=True, blank=True)
+    batch = models.ForeignKey(PayoutBatch, on_delete=models.SET_NULL, null=True, blank=True, related_name='withdrawals')
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            # admin queues by status (newest first)
+            models.Index(fields=['status', 'created_at'], name='wd_status_created_idx'),
+        ]
\ No newline at end of file
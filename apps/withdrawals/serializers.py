@@ -1,15 +1,32 @@
 from rest_framework import serializers
-from .models import WithdrawalRequest
+from apps.wallets.references import ReferenceListSerializer, tx_id_matches
+from .models import WithdrawalRequest, PayoutBatch
 
 class WithdrawalRequestSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     email = serializers.EmailField(source='user.email', read_only=True)
-    
+    tx_id_matches = serializers.SerializerMethodField(read_only=True)
+    reference_source = 'withdrawal'
+
     class Meta:
         model = WithdrawalRequest
         fields = [
             'id', 'user', 'username', 'email', 'amount_pkr', 'amount_usd', 'fx_rate', 'method',
             'bank_name', 'account_name', 'account_details', 'tx_id',
-            'tax_usd', 'net_usd', 'status', 'created_at', 'processed_at'
+            'tax_usd', 'net_usd', 'status', 'created_at', 'processed_at', 'tx_id_matches'
+        ]
+        read_only_fields = ['user', 'username', 'email', 'amount_usd', 'fx_rate', 'tax_usd', 'net_usd', 'status', 'processed_at']
+        list_serializer_class = ReferenceListSerializer
+
+    def get_tx_id_matches(self, obj):
+        return tx_id_matches(self, obj)
+
+
+class PayoutBatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PayoutBatch
+        fields = [
+            'id', 'method', 'status', 'item_count', 'total_net_usd', 'total_net_pkr',
+            'created_by', 'created_at', 'settled_at', 'settlement'
         ]
-        read_only_fields = ['user', 'username', 'email', 'amount_usd', 'fx_rate', 'tax_usd', 'net_usd', 'status', 'processed_at']
\ No newline at end of file
+        read_only_fields = fields
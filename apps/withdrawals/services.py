@@ -0,0 +1,202 @@
+"""
+Payout batches: export APPROVED withdrawals as bulk-transfer CSV files (one batch per
+method) and settle a whole batch from the file the bank / wallet provider sends back.
+"""
+import codecs
+import csv
+from decimal import Decimal
+from django.db import transaction
+from django.utils import timezone
+from apps.wallets.models import Wallet, Transaction
+from core.db import iter_keyset
+from .models import PayoutBatch, WithdrawalRequest
+
+WALLET_METHODS = ('EASYPaisa', 'JAZZCASH')
+
+# Bulk-transfer file layouts: banks want IBAN/account + bank name, mobile wallets a number
+BANK_COLUMNS = ['reference', 'beneficiary_name', 'bank_name', 'account_number', 'amount_pkr', 'email']
+WALLET_COLUMNS = ['reference', 'account_title', 'mobile_number', 'amount_pkr', 'email']
+
+SETTLED_OK = {'', 'PAID', 'SUCCESS', 'SUCCESSFUL', 'OK', 'COMPLETED', 'DONE'}
+SETTLEMENT_TX_COLUMNS = ('tx_id', 'transaction_id', 'bank_ref', 'bank_reference')
+
+
+def payout_reference(withdrawal_id) -> str:
+    return f'WR-{withdrawal_id}'
+
+
+def _net_pkr(net_usd, fx_rate) -> Decimal:
+    return (Decimal(net_usd) * Decimal(fx_rate)).quantize(Decimal('0.01'))
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+def create_payout_batches(created_by=None, method=None, limit=None):
+    """
+    Claim APPROVED withdrawals that are not in a batch yet and group them into one
+    PayoutBatch per method. Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so two
+    admins exporting at the same time never put the same withdrawal into two files.
+    """
+    with transaction.atomic():
+        qs = WithdrawalRequest.objects.select_for_update(skip_locked=True).filter(status='APPROVED', batch__isnull=True)
+        if method:
+            qs = qs.filter(method=method)
+        rows = qs.order_by('id').values_list('id', 'method', 'net_usd', 'fx_rate')
+        if limit:
+            rows = rows[:limit]
+
+        by_method = {}
+        for wid, wmethod, net_usd, fx_rate in rows:
+            group = by_method.setdefault(wmethod, {'ids': [], 'usd': Decimal('0.00'), 'pkr': Decimal('0.00')})
+            group['ids'].append(wid)
+            group['usd'] += Decimal(net_usd)
+            group['pkr'] += _net_pkr(net_usd, fx_rate)
+
+        batches = []
+        for wmethod, group in sorted(by_method.items()):
+            batch = PayoutBatch.objects.create(
+                method=wmethod,
+                item_count=len(group['ids']),
+                total_net_usd=group['usd'].quantize(Decimal('0.01')),
+                total_net_pkr=group['pkr'].quantize(Decimal('0.01')),
+                created_by=created_by,
+            )
+            WithdrawalRequest.objects.filter(id__in=group['ids']).update(batch=batch)
+            batches.append(batch)
+    return batches
+
+
+def iter_batch_csv(batch, chunk_size=2000):
+    """Yield the bulk-transfer file for a batch line by line (for StreamingHttpResponse)."""
+
+    class _Echo:
+        def write(self, value):
+            return value
+
+    writer = csv.writer(_Echo())
+    is_wallet = batch.method in WALLET_METHODS
+    yield writer.writerow(WALLET_COLUMNS if is_wallet else BANK_COLUMNS)
+
+    # Keyset chunks rather than .iterator(): the response is streamed after the request's
+    # transaction ended, where a server-side cursor does not survive the pooler
+    items = iter_keyset(
+        batch.withdrawals.filter(status='APPROVED'),
+        'bank_name', 'account_name', 'account_details', 'net_usd', 'fx_rate', 'user__email',
+        chunk_size=chunk_size,
+    )
+    for wid, bank_name, account_name, details, net_usd, fx_rate, email in items:
+        details = details or {}
+        name = account_name or details.get('account_name') or ''
+        number = details.get('account_number') or details.get('mobile') or ''
+        amount = _net_pkr(net_usd, fx_rate)
+        if is_wallet:
+            yield writer.writerow([payout_reference(wid), name, number, amount, email])
+        else:
+            yield writer.writerow([payout_reference(wid), name, bank_name or details.get('bank') or '', number, amount, email])
+
+
+def parse_settlement_csv(lines):
+    """
+    Parse a settlement file (an iterable of text or bytes lines) into
+    {withdrawal_id: (paid, tx_id)}. Needs a `reference` column (WR-<id> or the bare id);
+    `status` and a transaction reference column (tx_id / transaction_id / bank_ref) are
+    optional. Rows without a status count as paid.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        raise ValueError('Settlement file is empty')
+    if isinstance(first, bytes):
+        decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        lines = (decoder.decode(line) for line in _chain(first, lines))
+    else:
+        lines = _chain(first.lstrip('\ufeff'), lines)
+
+    reader = csv.DictReader(lines)
+    fields = {(f or '').strip().lower(): f for f in (reader.fieldnames or [])}
+    if 'reference' not in fields:
+        raise ValueError("Settlement file needs a 'reference' column")
+    tx_col = next((fields[c] for c in SETTLEMENT_TX_COLUMNS if c in fields), None)
+    status_col = fields.get('status')
+
+    results = {}
+    for row in reader:
+        ref = (row.get(fields['reference']) or '').strip().upper()
+        if not ref:
+            continue
+        ref = ref[3:] if ref.startswith('WR-') else ref
+        try:
+            wid = int(ref)
+        except ValueError:
+            raise ValueError(f'Invalid reference {ref!r} in settlement file')
+        status = (row.get(status_col) or '').strip().upper() if status_col else ''
+        tx_id = (row.get(tx_col) or '').strip() if tx_col else ''
+        results[wid] = (status in SETTLED_OK, tx_id)
+    return results
+
+
+def settle_payout_batch(batch_id, settlement):
+    """
+    Settle a batch from parsed settlement rows ({withdrawal_id: (paid, tx_id)}).
+
+    Confirmed withdrawals become PAID with one DEBIT ledger row each (same meta as the
+    single PAID action), written with bulk_create / set-based updates. Rows reported as
+    failed, and batch rows missing from the file, are released back to the APPROVED queue
+    so the next batch picks them up. The batch itself is then marked PAID.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = PayoutBatch.objects.select_for_update().get(pk=batch_id)
+        if batch.status == 'PAID':
+            raise ValueError(f'Batch #{batch.id} is already settled')
+
+        items = list(
+            batch.withdrawals.select_for_update().filter(status='APPROVED')
+            .values_list('id', 'user_id', 'net_usd', 'fx_rate', 'tx_id')
+        )
+        in_batch = {item[0] for item in items}
+        unknown = sorted(wid for wid in settlement if wid not in in_batch)
+        wallet_ids = dict(
+            Wallet.objects.filter(user_id__in={item[1] for item in items}).values_list('user_id', 'id')
+        )
+
+        paid, failed, unconfirmed = [], [], []
+        ledger, new_tx_ids = [], []
+        total_usd, total_pkr = Decimal('0.00'), Decimal('0.00')
+        for wid, uid, net_usd, fx_rate, current_tx_id in items:
+            if wid not in settlement:
+                unconfirmed.append(wid)
+                continue
+            ok, tx_id = settlement[wid]
+            if not ok or uid not in wallet_ids:
+                failed.append(wid)
+                continue
+            paid.append(wid)
+            total_usd += net_usd
+            total_pkr += _net_pkr(net_usd, fx_rate)
+            ledger.append(Transaction(
+                wallet_id=wallet_ids[uid],
+                type=Transaction.DEBIT,
+                amount_usd=net_usd,
+                meta={'type': 'withdrawal', 'id': wid, 'tx_id': tx_id or current_tx_id, 'batch': batch.id},
+            ))
+            if tx_id and not current_tx_id:
+                new_tx_ids.append(WithdrawalRequest(id=wid, tx_id=tx_id))
+
+        Transaction.objects.bulk_create(ledger, batch_size=1000)
+        WithdrawalRequest.objects.filter(id__in=paid).update(status='PAID', processed_at=now)
+        WithdrawalRequest.objects.bulk_update(new_tx_ids, ['tx_id'], batch_size=500)
+        if failed or unconfirmed:
+            WithdrawalRequest.objects.filter(id__in=failed + unconfirmed).update(batch=None)
+
+        batch.status = 'PAID'
+        batch.settled_at = now
+        batch.item_count = len(paid)
+        batch.total_net_usd = total_usd.quantize(Decimal('0.01'))
+        batch.total_net_pkr = total_pkr.quantize(Decimal('0.01'))
+        batch.settlement = {'paid': len(paid), 'failed': failed, 'unconfirmed': unconfirmed, 'unknown': unknown}
+        batch.save()
+    return batch
@@ -1,8 +1,14 @@
 from django.urls import path
-from .views import MyWithdrawalsView, admin_withdraw_action, admin_pending_withdrawals
+from .views import (
+    MyWithdrawalsView, admin_withdraw_action, admin_pending_withdrawals,
+    admin_payout_batches, admin_payout_batch_file, admin_payout_batch_settle,
+)
 
 urlpatterns = [
     path('me/', MyWithdrawalsView.as_view()),
     path('admin/action/<int:pk>/', admin_withdraw_action),
     path('admin/pending/', admin_pending_withdrawals),
+    path('admin/payout-batches/', admin_payout_batches),
+    path('admin/payout-batches/<int:pk>/file/', admin_payout_batch_file),
+    path('admin/payout-batches/<int:pk>/settle/', admin_payout_batch_settle),
 ]
\ No newline at end of file
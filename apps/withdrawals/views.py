@@ -1,19 +1,17 @@
 from decimal import Decimal, InvalidOperation
-from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.exceptions import ValidationError
 from apps.wallets.models import Wallet, Transaction
-from .models import WithdrawalRequest
-from .serializers import WithdrawalRequestSerializer
+from .models import WithdrawalRequest, PayoutBatch
+from .serializers import WithdrawalRequestSerializer, PayoutBatchSerializer
+from .services import create_payout_batches, iter_batch_csv, parse_settlement_csv, settle_payout_batch
 from apps.earnings.services import apply_withdraw_tax
-
-
-def get_fx_rate():
-    # admin-set rate for now
-    return Decimal(str(settings.ADMIN_USD_TO_PKR))
+from apps.wallets.fx import fx_rate_at
 
 class MyWithdrawalsView(generics.ListCreateAPIView):
     serializer_class = WithdrawalRequestSerializer
@@ -49,14 +47,14 @@ class MyWithdrawalsView(generics.ListCreateAPIView):
         # Check if user has minimum income requirement (5000 PKR total)
         wallet, _ = Wallet.objects.get_or_create(user=self.request.user)
         total_income_usd = wallet.income_usd  # Only withdrawable income
-        total_income_pkr = total_income_usd * get_fx_rate()
+        rate, rate_id = fx_rate_at()
+        total_income_pkr = total_income_usd * rate
         
         if total_income_pkr < Decimal('5000'):
             print(f"DEBUG: User total income {total_income_pkr} PKR is less than 5000, raising validation error")
             raise ValidationError({"amount_pkr": ["You need a minimum income of 5000 PKR to make withdrawals."]})
 
         # FX and USD conversion
-        rate = get_fx_rate()
         try:
             amount_usd = (amount_pkr / rate).quantize(Decimal('0.01'))
         except (InvalidOperation, ZeroDivisionError):
@@ -93,6 +91,7 @@ class MyWithdrawalsView(generics.ListCreateAPIView):
             user=self.request.user,
             amount_usd=amount_usd,
             fx_rate=rate,
+            fx_rate_record_id=rate_id,
             tax_usd=tax['tax_usd'],
             net_usd=net_usd,
             method=method,
@@ -113,7 +112,11 @@ def admin_pending_withdrawals(request):
 @permission_classes([permissions.IsAdminUser])
 def admin_withdraw_action(request, pk):
     action = request.data.get('action')  # APPROVE/REJECT/PAID
-    wr = WithdrawalRequest.objects.get(pk=pk)
+    wr = WithdrawalRequest.objects.select_related('batch').get(pk=pk)
+
+    if action in ('REJECT', 'PAID') and wr.batch_id and wr.batch.status != 'PAID':
+        # Already in an exported bank file: the settlement upload decides its outcome
+        return Response({'detail': f'Withdrawal is in payout batch #{wr.batch_id} awaiting settlement'}, status=409)
 
     if action == 'REJECT':
         # refund to income wallet
@@ -141,4 +144,46 @@ def admin_withdraw_action(request, pk):
     else:
         return Response({'detail': 'Invalid action'}, status=400)
 
-    return Response({'status': wr.status})
\ No newline at end of file
+    return Response({'status': wr.status})
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAdminUser])
+def admin_payout_batches(request):
+    """GET: recent payout batches. POST: batch every unbatched APPROVED withdrawal (optional method/limit)."""
+    if request.method == 'GET':
+        qs = PayoutBatch.objects.all()
+        status = request.query_params.get('status')
+        if status:
+            qs = qs.filter(status=status)
+        return Response(PayoutBatchSerializer(qs[:100], many=True).data)
+
+    method = request.data.get('method') or None
+    if method and method not in dict(WithdrawalRequest.METHOD_CHOICES):
+        return Response({'detail': 'Invalid method'}, status=400)
+    try:
+        limit = int(request.data.get('limit') or 0) or None
+    except (TypeError, ValueError):
+        return Response({'detail': 'Invalid limit'}, status=400)
+    batches = create_payout_batches(created_by=request.user, method=method, limit=limit)
+    return Response(PayoutBatchSerializer(batches, many=True).data, status=201 if batches else 200)
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def admin_payout_batch_file(request, pk):
+    batch = get_object_or_404(PayoutBatch, pk=pk)
+    response = StreamingHttpResponse(iter_batch_csv(batch), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="payout-batch-{batch.id}-{batch.method.lower()}.csv"'
+    return response
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAdminUser])
+def admin_payout_batch_settle(request, pk):
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'detail': 'Upload the settlement CSV as "file"'}, status=400)
+    get_object_or_404(PayoutBatch, pk=pk)
+    try:
+        batch = settle_payout_batch(pk, parse_settlement_csv(upload))
+    except (ValueError, UnicodeDecodeError) as e:
+        return Response({'detail': str(e)}, status=400)
+    return Response(PayoutBatchSerializer(batch).data)
@@ -18,7 +18,8 @@ from django.contrib.auth import get_user_model
 from django.db import models
 from apps.wallets.models import Wallet, Transaction
 from apps.referrals.models import ReferralPayout
-from apps.earnings.models_global_pool import GlobalPool
+from apps.earnings.global_pool import pool_balance
+from apps.earnings.models import GlobalPoolContribution
 from decimal import Decimal
 
 User = get_user_model()
@@ -117,10 +118,8 @@ print("\n" + "="*80)
 print("🌍 GLOBAL POOL STATUS")
 print("="*80 + "\n")
 
-pools = GlobalPool.objects.all()
-if pools.exists():
-    for pool in pools:
-        print(f"Global Pool ID {pool.id}: ${pool.balance_usd} (Updated: {pool.updated_at})")
+if GlobalPoolContribution.objects.exists():
+    print(f"Global Pool balance: ${pool_balance()} ({GlobalPoolContribution.objects.count()} ledger rows)")
 else:
     print("✅ No global pool records found (expected after database removal)")
 
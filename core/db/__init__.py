@@ -0,0 +1,91 @@
+"""
+Database connection pooling for gunicorn workers (Neon Postgres).
+
+With DATABASE_URL set, settings point ENGINE at core.db.backends.postgresql_pool: each
+worker process keeps between DB_POOL_MIN_SIZE and DB_POOL_MAX_SIZE connections and
+requests check them out instead of opening their own. gunicorn.conf.py sizes the pool so
+workers x DB_POOL_MAX_SIZE stays within DB_CONNECTION_BUDGET, and calls the hooks below:
+
+    release_all()       pre_fork: the master closes its connections so workers start clean
+    warm_up()           post_fork: open DB_POOL_MIN_SIZE connections before the first request
+    start_keep_warm()   post_fork: optional pinger (DB_KEEPWARM_SECONDS > 0) that keeps the
+                        pool, and therefore the Neon compute, from going cold
+
+Connection acquisition is wrapped in retries and a circuit breaker (core.db.resilience).
+
+Server-side cursors are disabled (PgBouncer in transaction mode cannot hold them), so
+large scans use iter_keyset() instead of QuerySet.iterator().
+"""
+import logging
+import threading
+import time
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def _pooled_aliases():
+    from core.db.backends.postgresql_pool.base import DatabaseWrapper
+    return [alias for alias in connections if isinstance(connections[alias], DatabaseWrapper)]
+
+
+def _pool(alias):
+    from core.db.backends.postgresql_pool.base import connection_pool
+    wrapper = connections[alias]
+    return connection_pool(alias, wrapper.settings_dict, wrapper.get_connection_params())
+
+
+def pool_stats() -> dict:
+    """{alias: pool counters} for this worker process."""
+    from core.db.backends.postgresql_pool.base import all_pools
+    return {alias: pool.stats() for alias, pool in all_pools().items()}
+
+
+def release_all() -> None:
+    from core.db.backends.postgresql_pool.base import all_pools
+    connections.close_all()
+    for pool in all_pools().values():
+        pool.close()
+
+
+def warm_up() -> None:
+    for alias in _pooled_aliases():
+        started = time.monotonic()
+        try:
+            opened = _pool(alias).warm()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not pre-open DB connections for {alias}: {e}")
+            continue
+        logger.info(f"✅ DB pool {alias} warmed: {opened} connection(s) in {time.monotonic() - started:.2f}s")
+
+
+def start_keep_warm(interval: float) -> threading.Thread | None:
+    """Run pool maintenance (shrink, refill, ping) every `interval` seconds in a daemon thread."""
+    if interval <= 0 or not _pooled_aliases():
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            for alias in _pooled_aliases():
+                try:
+                    _pool(alias).maintain()
+                except Exception as e:
+                    logger.warning(f"⚠️ DB keep-warm ping failed for {alias}: {e}")
+
+    thread = threading.Thread(target=loop, name='db-keep-warm', daemon=True)
+    thread.start()
+    return thread
+
+
+def iter_keyset(queryset, *fields, chunk_size: int = 2000):
+    """Yield values_list('pk', *fields) rows in pk order, one short query per chunk."""
+    queryset = queryset.order_by('pk')
+    last = None
+    while True:
+        chunk = queryset if last is None else queryset.filter(pk__gt=last)
+        rows = list(chunk.values_list('pk', *fields)[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1][0]
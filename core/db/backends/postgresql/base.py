@@ -0,0 +1,24 @@
+"""
+PostgreSQL backend that opens connections through core.db.resilience: connect failures are
+retried with jittered backoff within a retry budget, and a circuit breaker fails fast with
+DatabaseUnavailable while the database is down.
+"""
+from django.db.backends.postgresql import base as postgresql
+from core.db.pool import PoolTimeout
+from core.db.resilience import guarded_connect
+
+Database = postgresql.Database
+
+
+class DatabaseWrapper(postgresql.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        try:
+            return guarded_connect(
+                self.alias, lambda: self.open_connection(conn_params), retry_on=Database.OperationalError,
+            )
+        except PoolTimeout as e:
+            # Pool saturation is not a database failure: no retry, and the breaker is not told
+            raise Database.OperationalError(str(e)) from e
+
+    def open_connection(self, conn_params):
+        return super().get_new_connection(conn_params)
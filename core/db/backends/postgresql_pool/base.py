@@ -0,0 +1,48 @@
+"""
+PostgreSQL backend whose connections come from a per-process ConnectionPool.
+
+Django opens a connection when a request first needs one and "closes" it when the request
+ends (CONN_MAX_AGE=0); this backend turns those into pool checkouts and returns, so a
+request reuses a warm, health-checked connection instead of paying TLS setup and a Neon
+cold start. Pool sizing comes from DATABASES[alias]['POOL'].
+"""
+import threading
+from psycopg import IsolationLevel
+from core.db.backends.postgresql import base as postgresql
+from core.db.pool import ConnectionPool
+
+Database = postgresql.Database
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def connection_pool(alias: str, settings_dict: dict, conn_params: dict) -> ConnectionPool:
+    pool = _pools.get(alias)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                pool = ConnectionPool(lambda: Database.connect(**conn_params), name=alias, **settings_dict.get('POOL', {}))
+                _pools[alias] = pool
+    return pool
+
+
+def all_pools() -> dict:
+    return dict(_pools)
+
+
+class DatabaseWrapper(postgresql.DatabaseWrapper):
+    def open_connection(self, conn_params):
+        # Retries and circuit breaking wrap this (see core.db.backends.postgresql)
+        connection = connection_pool(self.alias, self.settings_dict, conn_params).getconn()
+        # Same isolation level handling as the stock backend
+        level = self.settings_dict['OPTIONS'].get('isolation_level')
+        self.isolation_level = IsolationLevel.READ_COMMITTED if level is None else IsolationLevel(level)
+        if level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            _pools[self.alias].putconn(self.connection)
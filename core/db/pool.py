@@ -0,0 +1,211 @@
+"""
+A small thread-safe connection pool, one per database alias and worker process.
+
+Connections are handed out LIFO so the warmest one is reused first. On checkout a
+connection that sat idle longer than `check_after` seconds is health-checked with
+`SELECT 1` (Neon drops connections when it auto-suspends), and one older than
+`max_lifetime` is replaced. On return an open transaction is rolled back; a broken
+connection is discarded. `maintain()` shrinks the pool back to `min_size` after bursts and
+tops it up again, so the first request after an idle period finds a live connection.
+
+The pool is fork-aware: connections inherited from the gunicorn master are forgotten (not
+closed, they belong to the parent) the first time a worker touches the pool.
+"""
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from psycopg.pq import TransactionStatus
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the checkout timeout."""
+
+
+class ConnectionPool:
+    def __init__(self, connect, min_size=1, max_size=4, timeout=10.0, check_after=30.0,
+                 max_idle=300.0, max_lifetime=1800.0, name='default'):
+        self._connect = connect
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.counters = Counter()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._idle = []    # [(connection, returned_at)], most recently returned last
+        self._born = {}    # id(connection) -> opened_at
+        self._size = 0     # open connections, idle + checked out
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._reset()
+
+    # -- checkout / return -------------------------------------------------------------
+
+    def getconn(self):
+        self._check_fork()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters['timeouts'] += 1
+                        raise PoolTimeout(f'No database connection available in {self.timeout}s (pool {self.name} at {self.max_size})')
+                    self._cond.wait(remaining)
+                    continue
+            if conn is None:
+                return self._open_reserved()
+            if self._usable(conn, returned_at):
+                self.counters['reused'] += 1
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn):
+        if self._pid != os.getpid():
+            return  # checked out before a fork: not ours to keep
+        if not self._reusable(conn):
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    # -- maintenance -------------------------------------------------------------------
+
+    def warm(self):
+        """Open connections until min_size are available (call after fork)."""
+        self._check_fork()
+        opened = []
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    break
+                self._size += 1
+            opened.append(self._open_reserved())
+        for conn in opened:
+            self.putconn(conn)
+        return len(opened)
+
+    def maintain(self):
+        """Close connections idle past max_idle (down to min_size), refill, and ping one."""
+        self._check_fork()
+        now = time.monotonic()
+        stale = []
+        with self._cond:
+            keep = []
+            # oldest first: those are the ones a burst left behind
+            for conn, returned_at in self._idle:
+                if now - returned_at > self.max_idle and self._size - len(stale) > self.min_size:
+                    stale.append(conn)
+                else:
+                    keep.append((conn, returned_at))
+            self._idle = keep
+        for conn in stale:
+            self._discard(conn)
+        self.warm()
+        conn = self.getconn()
+        try:
+            self._ping(conn)
+        except Exception:
+            self._discard(conn)
+            raise
+        self.putconn(conn)
+
+    def close(self):
+        """Close every idle connection (checked-out ones are closed when returned)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                **self.counters,
+            }
+
+    # -- internals ---------------------------------------------------------------------
+
+    def _open_reserved(self):
+        """Open a connection for a slot already counted in _size."""
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            self.counters['connect_errors'] += 1
+            raise
+        with self._cond:
+            self._born[id(conn)] = time.monotonic()
+        self.counters['opened'] += 1
+        return conn
+
+    def _expired(self, conn) -> bool:
+        born = self._born.get(id(conn))
+        return born is not None and time.monotonic() - born > self.max_lifetime
+
+    def _ping(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not conn.autocommit:
+            conn.rollback()
+
+    def _usable(self, conn, returned_at) -> bool:
+        if conn.closed or getattr(conn, 'broken', False) or self._expired(conn):
+            return False
+        if time.monotonic() - returned_at <= self.check_after:
+            return True
+        self.counters['health_checks'] += 1
+        try:
+            self._ping(conn)
+            return True
+        except Exception as e:
+            self.counters['health_check_failures'] += 1
+            logger.warning(f"⚠️ Dropping dead pooled connection ({self.name}): {e}")
+            return False
+
+    def _reusable(self, conn) -> bool:
+        if conn.closed or getattr(conn, 'broken', False) or self._expired(conn):
+            return False
+        status = conn.info.transaction_status
+        if status == TransactionStatus.IDLE:
+            return True
+        if status in (TransactionStatus.INTRANS, TransactionStatus.INERROR):  # leftover transaction
+            try:
+                conn.rollback()
+                return True
+            except Exception:
+                return False
+        return False  # ACTIVE (query running) or UNKNOWN (connection lost)
+
+    def _discard(self, conn):
+        with self._cond:
+            self._size -= 1
+            self._born.pop(id(conn), None)
+            self._cond.notify()
+        self.counters['discarded'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
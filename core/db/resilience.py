@@ -0,0 +1,195 @@
+"""
+Retry and circuit breaking at the point where a request acquires its database connection.
+
+Connecting (or checking out of the pool) is the only step that can be retried blindly:
+nothing has been sent to the database yet, so a retry can never apply a side effect twice.
+guarded_connect() retries it with full-jitter exponential backoff, bounded by:
+
+- a retry budget: a token bucket refilled by DB_RETRY_BUDGET_RATIO tokens per connection
+  attempt (capped at DB_RETRY_BUDGET_MAX), so during an outage retries cannot multiply
+  the load on the database;
+- a circuit breaker per database alias: after DB_BREAKER_FAILURES consecutive failed
+  connects it opens and every request fails fast with DatabaseUnavailable (503 with
+  Retry-After via DatabaseUnavailableMiddleware) instead of tying up a worker thread.
+  After DB_BREAKER_RESET_SECONDS one probe is let through (half-open); success closes it.
+
+Counters per breaker state are available from metrics() (served at /api/health/db/).
+"""
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.db import OperationalError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class DatabaseUnavailable(OperationalError):
+    """The circuit breaker is open: the database is considered down."""
+
+    def __init__(self, message, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class RetryBudget:
+    def __init__(self, ratio: float, max_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self.lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self.lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.state_since = time.monotonic()
+        self.failures = 0
+        self.probing = False
+        self.counters = Counter()
+
+    def _transition(self, state: str) -> None:
+        self.counters[f'{self.state}_to_{state}'] += 1
+        logger.warning(f"⚠️ Database circuit {self.name}: {self.state} -> {state}")
+        self.state = state
+        self.state_since = time.monotonic()
+
+    def retry_after(self) -> float:
+        if self.state != OPEN:
+            return 1.0
+        return max(1.0, self.reset_timeout - (time.monotonic() - self.state_since))
+
+    def before_call(self) -> None:
+        """Raise DatabaseUnavailable unless a connection attempt may go ahead."""
+        with self.lock:
+            if self.state == OPEN and time.monotonic() - self.state_since >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == OPEN or (self.state == HALF_OPEN and self.probing):
+                self.counters[f'rejected_{self.state}'] += 1
+                raise DatabaseUnavailable(f'Database {self.name} unavailable (circuit {self.state})', self.retry_after())
+            if self.state == HALF_OPEN:
+                self.probing = True
+            self.counters[f'calls_{self.state}'] += 1
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.probing = False
+            self.counters[f'successes_{self.state}'] += 1
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def release_probe(self) -> None:
+        """The probe ended without a verdict on the database (e.g. pool timeout): let the next one through."""
+        with self.lock:
+            self.probing = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            self.counters[f'failures_{self.state}'] += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self._transition(OPEN)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                'state': self.state,
+                'state_age_seconds': round(time.monotonic() - self.state_since, 3),
+                'consecutive_failures': self.failures,
+                'counters': dict(self.counters),
+            }
+
+
+_breakers = {}
+_budgets = {}
+_registry_lock = threading.Lock()
+
+
+def breaker_for(alias: str) -> CircuitBreaker:
+    breaker = _breakers.get(alias)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.setdefault(alias, CircuitBreaker(
+                alias, _setting('DB_BREAKER_FAILURES', 5), _setting('DB_BREAKER_RESET_SECONDS', 15.0),
+            ))
+    return breaker
+
+
+def budget_for(alias: str) -> RetryBudget:
+    budget = _budgets.get(alias)
+    if budget is None:
+        with _registry_lock:
+            budget = _budgets.setdefault(alias, RetryBudget(
+                _setting('DB_RETRY_BUDGET_RATIO', 0.2), _setting('DB_RETRY_BUDGET_MAX', 10.0),
+            ))
+    return budget
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full jitter: uniform in [0, min(max_delay, base * 2**attempt)]."""
+    base = _setting('DB_RETRY_BASE_DELAY', 0.25)
+    cap = _setting('DB_RETRY_MAX_DELAY', 2.0)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def guarded_connect(alias: str, connect, retry_on):
+    """Run `connect()` behind the alias' circuit breaker, retrying `retry_on` errors."""
+    breaker = breaker_for(alias)
+    budget = budget_for(alias)
+    attempts = max(1, _setting('DB_RETRY_ATTEMPTS', 3))
+    for attempt in range(attempts):
+        breaker.before_call()
+        budget.deposit()
+        try:
+            connection = connect()
+        except retry_on as e:
+            breaker.record_failure()
+            last_try = attempt + 1 >= attempts or breaker.state != CLOSED
+            if last_try or not budget.withdraw():
+                if not last_try:
+                    breaker.counters['retry_budget_exhausted'] += 1
+                raise
+            delay = backoff_delay(attempt)
+            breaker.counters['retries'] += 1
+            logger.warning(f"⚠️ Database connect failed (attempt {attempt + 1}/{attempts}), retrying in {delay:.2f}s: {e}")
+            time.sleep(delay)
+            continue
+        except BaseException:
+            breaker.release_probe()
+            raise
+        breaker.record_success()
+        return connection
+
+
+def metrics() -> dict:
+    return {
+        alias: {**breaker.snapshot(), 'retry_budget_tokens': round(budget_for(alias).tokens, 2)}
+        for alias, breaker in _breakers.items()
+    }
@@ -0,0 +1,13 @@
+import os
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from core.db import pool_stats
+from core.db.resilience import metrics
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def db_health(request):
+    """Circuit breaker state, retry counters and pool usage of the worker answering the request."""
+    return Response({'pid': os.getpid(), 'breakers': metrics(), 'pools': pool_stats()})
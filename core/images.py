@@ -0,0 +1,215 @@
+"""
+Image derivatives for uploaded proofs and product photos.
+
+After an upload is committed, a small background pool writes downscaled variants next to
+the original (`orders/abc.jpg` -> `orders/abc.thumb.webp`, `orders/abc.mid.webp`).
+Serializers and admin previews link to the variant when it exists and fall back to the
+original until the worker has produced it, so list pages transfer a few KB per image.
+
+Before that, the same job normalizes the original: EXIF/metadata is stripped and images
+larger than MAX_IMAGE_DIMENSION are downsampled. The rewritten file replaces the upload on
+every row that points at it; a replaced content-addressed blob is left for
+`purge_orphan_blobs`.
+
+Usage:
+    from core.images import derivative_url
+    derivative_url(obj.proof_image, 'thumb')
+"""
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models.signals import post_init, post_save
+from django.dispatch import Signal
+from PIL import Image, ImageOps, features
+from core.storage import BLOB_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# Sent after an image was normalized and its variants written (name = the final file name)
+image_processed = Signal()
+
+# variant -> max (width, height); aspect ratio is kept
+VARIANTS = {
+    'thumb': (160, 160),
+    'mid': (800, 800),
+}
+USE_WEBP = features.check('webp')
+EXTENSION = 'webp' if USE_WEBP else 'jpg'
+QUALITY = 78
+ORIGINAL_QUALITY = 90
+
+Image.MAX_IMAGE_PIXELS = getattr(settings, 'MAX_IMAGE_PIXELS', 40_000_000)
+
+# (app_label.Model, field) pairs that get derivatives; each app's signals call watch_image_fields
+IMAGE_FIELDS = [
+    ('accounts.SignupProof', 'proof_image'),
+    ('wallets.DepositRequest', 'proof_image'),
+    ('marketplace.Order', 'proof_image'),
+    ('marketplace.Product', 'image'),
+]
+
+_executor = ThreadPoolExecutor(max_workers=getattr(settings, 'IMAGE_DERIVATIVE_WORKERS', 2), thread_name_prefix='img-derive')
+_known = set()  # derivative names seen on storage (positive results only)
+
+
+def derivative_name(name: str, variant: str) -> str:
+    root, _ = os.path.splitext(name)
+    return f'{root}.{variant}.{EXTENSION}'
+
+
+def _exists(storage, name: str) -> bool:
+    if name in _known:
+        return True
+    if storage.exists(name):
+        if len(_known) > 50000:
+            _known.clear()
+        _known.add(name)
+        return True
+    return False
+
+
+def derivative_path(name: str, variant: str, storage=None) -> str:
+    """Storage name of a variant of `name`, or `name` itself while the variant is not ready."""
+    storage = storage or default_storage
+    derived = derivative_name(name, variant)
+    return derived if _exists(storage, derived) else name
+
+
+def derivative_url(field_file, variant: str):
+    """URL of a variant of an ImageField value, or of the original while it is not ready."""
+    if not field_file or not field_file.name:
+        return None
+    try:
+        return field_file.storage.url(derivative_path(field_file.name, variant, field_file.storage))
+    except Exception:
+        return None
+
+
+def generate_derivatives(storage, name: str, force: bool = False) -> int:
+    """Write every missing variant of `name`; returns how many were written."""
+    todo = [v for v in VARIANTS if force or not _exists(storage, derivative_name(name, v))]
+    if not todo:
+        return 0
+    with storage.open(name, 'rb') as fh:
+        with Image.open(fh) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ('RGB', 'RGBA') or (img.mode == 'RGBA' and not USE_WEBP):
+                img = img.convert('RGB')
+            written = 0
+            for variant in todo:
+                copy = img.copy()
+                copy.thumbnail(VARIANTS[variant], Image.LANCZOS)
+                buf = io.BytesIO()
+                if USE_WEBP:
+                    copy.save(buf, 'WEBP', quality=QUALITY, method=4)
+                else:
+                    copy.save(buf, 'JPEG', quality=QUALITY, optimize=True, progressive=True)
+                target = derivative_name(name, variant)
+                if storage.exists(target):
+                    storage.delete(target)
+                storage.save(target, ContentFile(buf.getvalue()))
+                _known.add(target)
+                written += 1
+    return written
+
+
+def normalize_original(storage, name: str) -> str:
+    """
+    Strip EXIF/metadata and downsample an original above MAX_IMAGE_DIMENSION. Returns the
+    name now holding the image (unchanged when nothing had to be done).
+    """
+    max_dim = getattr(settings, 'MAX_IMAGE_DIMENSION', 2560)
+    with storage.open(name, 'rb') as fh:
+        with Image.open(fh) as img:
+            fmt = img.format
+            has_meta = bool(img.getexif()) or any(k in img.info for k in ('exif', 'xmp', 'XML:com.adobe.xmp'))
+            if fmt not in ('JPEG', 'PNG', 'WEBP') or not (has_meta or max(img.size) > max_dim):
+                return name
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((max_dim, max_dim), Image.LANCZOS)
+            buf = io.BytesIO()
+            # Pillow only writes EXIF/ICC when passed explicitly, so the re-encode drops them
+            if fmt == 'JPEG':
+                img.convert('RGB').save(buf, 'JPEG', quality=ORIGINAL_QUALITY, optimize=True)
+            elif fmt == 'PNG':
+                img.save(buf, 'PNG', optimize=True)
+            else:
+                img.save(buf, 'WEBP', quality=ORIGINAL_QUALITY)
+
+    # Content-addressed blobs get a new hash-derived name; other storages a fresh name
+    target = os.path.basename(name) if name.startswith(BLOB_PREFIX) else name
+    new_name = storage.save(target, ContentFile(buf.getvalue()))
+    if new_name == name:
+        return name
+    for label, field in IMAGE_FIELDS:
+        apps.get_model(label).objects.filter(**{field: name}).update(**{field: new_name})
+    if name.startswith(BLOB_PREFIX):
+        # A concurrent upload of the same bytes may be handed this blob before its row
+        # commits: never delete it here, `purge_orphan_blobs` collects it later
+        return new_name
+    if not any(apps.get_model(label).objects.filter(**{field: name}).exists() for label, field in IMAGE_FIELDS):
+        storage.delete(name)
+    return new_name
+
+
+def _run(storage, name: str) -> None:
+    try:
+        name = normalize_original(storage, name)
+        generate_derivatives(storage, name)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not process uploaded image {name}: {e}")
+        return
+    image_processed.send(sender=None, storage=storage, name=name)
+
+
+def _run_in_worker(storage, name: str) -> None:
+    try:
+        _run(storage, name)
+    finally:
+        connections.close_all()  # worker threads must not hold DB connections between jobs
+
+
+def queue_derivatives(field_file) -> None:
+    """Schedule derivative generation for an ImageField value once the transaction commits."""
+    if not field_file or not field_file.name:
+        return
+    storage, name = field_file.storage, field_file.name
+    if getattr(settings, 'IMAGE_DERIVATIVES_SYNC', False):
+        transaction.on_commit(lambda: _run(storage, name))
+    else:
+        transaction.on_commit(lambda: _executor.submit(_run_in_worker, storage, name))
+
+
+def _file_name(instance, field: str):
+    value = instance.__dict__.get(field)  # a deferred field is not loaded here (no query)
+    return getattr(value, 'name', value)
+
+
+def watch_image_fields(model) -> None:
+    """Queue derivatives whenever a new file is saved into one of model's IMAGE_FIELDS."""
+    fields = [field for label, field in IMAGE_FIELDS if label == model._meta.label]
+
+    def remember(sender, instance, **kwargs):
+        instance._image_names = {field: _file_name(instance, field) for field in fields}
+
+    def queue(sender, instance, created, update_fields=None, **kwargs):
+        names = getattr(instance, '_image_names', {})
+        for field in fields:
+            if update_fields is not None and field not in update_fields:
+                continue
+            name = _file_name(instance, field)
+            # Status-only saves keep the same file: nothing to process again
+            if created or name != names.get(field):
+                queue_derivatives(getattr(instance, field))
+            names[field] = name
+        instance._image_names = names
+
+    uid = f'image_derivatives_{model._meta.label}'
+    post_init.connect(remember, sender=model, weak=False, dispatch_uid=f'{uid}_init')
+    post_save.connect(queue, sender=model, weak=False, dispatch_uid=uid)
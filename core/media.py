@@ -0,0 +1,157 @@
+"""
+Production serving for uploaded media and the /adminui/ assets.
+
+Replaces django.views.static.serve with a view that answers conditional requests
+(strong ETag / Last-Modified -> 304), single byte ranges (206 / 416) and sets long-lived
+Cache-Control for immutable image derivatives. With MEDIA_SERVE_MODE set to 'x-accel'
+(nginx) or 'x-sendfile' (Apache/lighttpd) the file body is handed to the front server and
+the gunicorn thread is released right after the headers are computed.
+
+Settings:
+    MEDIA_SERVE_MODE      'django' (default) | 'x-accel' | 'x-sendfile'
+    MEDIA_ACCEL_PREFIX    internal nginx location for x-accel, e.g. '/protected-media/'
+"""
+import mimetypes
+import os
+import re
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+
+CHUNK_SIZE = 64 * 1024
+# core.images derivatives and core.storage content-addressed blobs never change in place
+IMMUTABLE_RE = re.compile(r'(\.(thumb|mid)\.(webp|jpg)$|^blobs/)')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+MEDIA_CACHE = 'public, max-age=86400'
+REVALIDATE_CACHE = 'no-cache'
+
+
+def _etag(st) -> str:
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def _not_modified(request, etag: str, mtime: int) -> bool:
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        return if_none_match.strip() == '*' or etag in [t.strip() for t in if_none_match.split(',')]
+    since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE') or '')
+    return since is not None and mtime <= since
+
+
+def _parse_range(header: str, size: int):
+    """(start, end) inclusive for a single satisfiable range, 'invalid' if unsatisfiable, None to ignore."""
+    m = RANGE_RE.match(header.replace(' ', ''))
+    if not m or m.group(1) == m.group(2) == '':
+        return None  # malformed or multi-range: serve the whole file
+    if m.group(1) == '':
+        length = int(m.group(2))
+        if length == 0:
+            return 'invalid'
+        return max(size - length, 0), size - 1
+    start = int(m.group(1))
+    end = int(m.group(2)) if m.group(2) else size - 1
+    if start >= size or end < start:
+        return 'invalid'
+    return start, min(end, size - 1)
+
+
+def _iter_range(path: str, start: int, length: int):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, path, document_root, cache_control=None):
+    """Serve `path` below `document_root` honouring conditional and range requests."""
+    try:
+        fullpath = safe_join(str(document_root), path)
+    except ValueError:
+        raise Http404('Invalid path')
+    try:
+        st = os.stat(fullpath)
+    except OSError:
+        raise Http404('File not found')
+    if not os.path.isfile(fullpath):
+        raise Http404('File not found')
+
+    etag = _etag(st)
+    mtime = int(st.st_mtime)
+    if cache_control is None:
+        cache_control = IMMUTABLE_CACHE if IMMUTABLE_RE.search(path) else MEDIA_CACHE
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(mtime),
+        'Cache-Control': cache_control,
+        'Accept-Ranges': 'bytes',
+    }
+
+    if _not_modified(request, etag, mtime):
+        response = HttpResponseNotModified()
+        for k, v in headers.items():
+            response[k] = v
+        return response
+
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+
+    mode = getattr(settings, 'MEDIA_SERVE_MODE', 'django')
+    if mode in ('x-accel', 'x-sendfile'):
+        # The front server reads the file and handles Range itself
+        response = HttpResponse(content_type=content_type)
+        if mode == 'x-accel':
+            prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/').rstrip('/')
+            rel = os.path.relpath(fullpath, str(document_root)).replace(os.sep, '/')
+            response['X-Accel-Redirect'] = f'{prefix}/{rel}'
+        else:
+            response['X-Sendfile'] = fullpath
+        for k, v in headers.items():
+            response[k] = v
+        return response
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and request.method in ('GET', 'HEAD'):
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if not if_range or if_range.strip() in (etag, http_date(mtime)):
+            byte_range = _parse_range(range_header, st.st_size)
+
+    if byte_range == 'invalid':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{st.st_size}'
+        return response
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        body = [] if request.method == 'HEAD' else _iter_range(fullpath, start, length)
+        response = StreamingHttpResponse(body, status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{st.st_size}'
+        response['Content-Length'] = str(length)
+    elif request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = str(st.st_size)
+    else:
+        # FileResponse lets gunicorn use wsgi.file_wrapper (sendfile) for the body
+        response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    for k, v in headers.items():
+        response[k] = v
+    return response
+
+
+def serve_media(request, path):
+    return serve_file(request, path, settings.MEDIA_ROOT)
+
+
+def serve_adminui(request, path='index_django.html'):
+    # The admin UI is not fingerprinted: let browsers cache it but always revalidate (cheap 304s)
+    return serve_file(request, path, settings.BASE_DIR / 'adminui', cache_control=REVALIDATE_CACHE)
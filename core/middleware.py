@@ -1,39 +1,47 @@
 """
 Middleware to handle Neon database connection issues and auto-trigger daily earnings
 """
+import math
 from django.db import OperationalError, transaction
 from django.db.models import Sum
+from django.http import JsonResponse
 from django.utils import timezone
-from time import sleep
+from core.db.resilience import DatabaseUnavailable
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class DBRetryMiddleware:
+def database_unavailable_response(exc) -> JsonResponse:
+    """503 telling the client when to retry (the breaker's remaining open time, else 1s)."""
+    retry_after = getattr(exc, 'retry_after', 1.0)
+    response = JsonResponse({'detail': 'Database temporarily unavailable, please retry shortly.'}, status=503)
+    response['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
+
+class DatabaseUnavailableMiddleware:
     """
-    Middleware to retry database operations when Neon DB wakes up from sleep mode.
-    Neon free tier auto-sleeps after ~5 minutes of inactivity.
-    The first request after wake-up might throw OperationalError.
+    Turns database outages into 503 + Retry-After instead of a 500.
+
+    Connection retries happen where the connection is acquired (core.db.resilience), never
+    by re-running the view: a view that failed half-way may already have had side effects.
+    When the circuit breaker is open, requests fail fast here without touching the database.
     """
-    
+
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        for attempt in range(2):
-            try:
-                return self.get_response(request)
-            except OperationalError as e:
-                if attempt == 0:
-                    logger.warning(f"Database connection failed (attempt {attempt + 1}), retrying in 1 second: {e}")
-                    sleep(1)  # Wait 1 second and retry
-                else:
-                    logger.error(f"Database connection failed after retry: {e}")
-                    raise
-            except Exception as e:
-                # Don't retry for non-database errors
-                raise
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, DatabaseUnavailable):
+            return database_unavailable_response(exception)
+        if isinstance(exception, OperationalError):
+            logger.error(f"Database error in {request.method} {request.path}: {exception}")
+            return database_unavailable_response(exception)
+        return None
 
 
 class AutoDailyEarningsMiddleware:
@@ -51,10 +59,15 @@ class AutoDailyEarningsMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
         self._processing = False  # Prevent concurrent processing in same instance
+        self._done_for = None  # date already known to be processed: no DB check until it changes
 
     def __call__(self, request):
-        # Check and process earnings before handling the request
-        if not self._processing:
+        # Check and process earnings before handling the request (file downloads skip the DB check)
+        if (
+            not self._processing
+            and self._done_for != timezone.now().date()
+            and not request.path.startswith(self._skip_prefixes())
+        ):
             try:
                 self._check_and_process_daily_earnings()
             except Exception as e:
@@ -64,6 +77,11 @@ class AutoDailyEarningsMiddleware:
         response = self.get_response(request)
         return response
     
+    @staticmethod
+    def _skip_prefixes():
+        from django.conf import settings
+        return (settings.MEDIA_URL, settings.STATIC_URL, '/adminui')
+
     def _check_and_process_daily_earnings(self):
         """Check if daily earnings need to be processed and trigger if needed"""
         from apps.earnings.models import DailyEarningsState
@@ -89,6 +107,7 @@ class AutoDailyEarningsMiddleware:
             
             # Check if we need to process today
             if state.last_processed_date >= today:
+                self._done_for = today
                 return  # Already processed today
             
             # Mark as processing to prevent concurrent runs in this instance
@@ -203,158 +222,27 @@ class AutoDailyEarningsMiddleware:
                 
                 logger.info(f"✅ Daily earnings auto-processed: {total_users_processed} users, ${total_amount_usd}")
                 
-                # ===== GLOBAL POOL PROCESSING (Mondays Only) =====
-                # Check if today is Monday (weekday() returns 0 for Monday)
-                if today.weekday() == 0:
-                    self._process_global_pool_monday(today)
+                # Fold settled pool contributions into the checkpoint once a day
+                from apps.earnings.global_pool import fold_pool_contributions
+                fold_pool_contributions()
+                
+                # ===== GLOBAL POOL PROCESSING =====
+                # Process this week's Monday and any Monday missed while the instance slept
+                self._process_global_pool_mondays(today)
                 
             finally:
                 self._processing = False
     
-    def _process_global_pool_monday(self, monday_date):
-        """Process global pool on Mondays: collect from signups and distribute to all users"""
-        from apps.earnings.models import GlobalPoolState, GlobalPoolCollection, GlobalPoolDistribution
-        from apps.wallets.models import Wallet, Transaction, DepositRequest
-        from django.contrib.auth import get_user_model
-        from decimal import Decimal
-        
-        logger.info(f"🌍 Processing Global Pool for Monday: {monday_date}")
-        
-        User = get_user_model()
-        
-        # Get or create global pool state
-        pool_state, created = GlobalPoolState.objects.get_or_create(pk=1)
-        
-        # ===== COLLECTION PHASE =====
-        # Only collect if we haven't collected for this Monday yet
-        if pool_state.last_collection_date != monday_date:
-            logger.info(f"📥 Collecting 0.5% from Monday signups...")
-            
-            # Find all SIGNUP-INIT deposits from this Monday
-            from datetime import datetime
-            monday_start = datetime.combine(monday_date, datetime.min.time())
-            monday_end = datetime.combine(monday_date, datetime.max.time())
-            
-            signup_deposits = DepositRequest.objects.filter(
-                tx_id='SIGNUP-INIT',
-                status='CREDITED',
-                created_at__gte=monday_start,
-                created_at__lte=monday_end
-            )
-            
-            total_collected = Decimal('0')
-            collection_count = 0
-            
-            for deposit in signup_deposits:
-                # Check if already collected
-                existing = GlobalPoolCollection.objects.filter(
-                    user=deposit.user,
-                    collection_date=monday_date
-                ).exists()
-                
-                if existing:
-                    continue
-                
-                # Calculate 0.5% of signup amount
-                signup_amount = deposit.amount_usd
-                collection_amount = (signup_amount * Decimal('0.005')).quantize(Decimal('0.01'))
-                
-                # Record the collection
-                GlobalPoolCollection.objects.create(
-                    user=deposit.user,
-                    signup_amount_usd=signup_amount,
-                    collection_amount_usd=collection_amount,
-                    collection_date=monday_date
-                )
-                
-                total_collected += collection_amount
-                collection_count += 1
-                
-                logger.info(f"  ✅ Collected ${collection_amount} from {deposit.user.username}")
-            
-            # Update pool state
-            pool_state.current_pool_usd += total_collected
-            pool_state.total_collected_all_time += total_collected
-            pool_state.last_collection_date = monday_date
-            pool_state.save()
-            
-            logger.info(f"✅ Collection complete: ${total_collected} from {collection_count} signups. Pool now: ${pool_state.current_pool_usd}")
-        
-        # ===== DISTRIBUTION PHASE =====
-        # Only distribute if we haven't distributed for this Monday yet AND pool has balance
-        if pool_state.last_distribution_date != monday_date and pool_state.current_pool_usd > 0:
-            logger.info(f"📤 Distributing pool to all users...")
-            
-            # Get all active users (users with wallets)
-            active_users = User.objects.filter(wallet__isnull=False).distinct()
-            
-            if not active_users.exists():
-                logger.warning("⚠️ No active users to distribute to")
-                return
-            
-            total_users = active_users.count()
-            pool_amount = pool_state.current_pool_usd
-            per_user_amount = (pool_amount / Decimal(total_users)).quantize(Decimal('0.01'))
-            
-            if per_user_amount <= 0:
-                logger.warning("⚠️ Per-user amount is zero or negative")
-                return
-            
-            logger.info(f"💰 Distributing ${pool_amount} to {total_users} users (${per_user_amount} each)")
-            
-            distribution_count = 0
-            
-            for user in active_users:
-                # Check if already distributed
-                existing = GlobalPoolDistribution.objects.filter(
-                    user=user,
-                    distribution_date=monday_date
-                ).exists()
-                
-                if existing:
-                    continue
-                
-                # Get user's wallet
-                wallet = user.wallet
-                
-                # Credit to income_usd (80% user share) and hold_usd (20% platform hold)
-                user_share = (per_user_amount * Decimal('0.80')).quantize(Decimal('0.01'))
-                platform_hold = (per_user_amount * Decimal('0.20')).quantize(Decimal('0.01'))
-                
-                wallet.income_usd += user_share
-                wallet.hold_usd += platform_hold
-                wallet.save()
-                
-                # Create transaction record
-                Transaction.objects.create(
-                    wallet=wallet,
-                    type=Transaction.CREDIT,
-                    amount_usd=per_user_amount,
-                    meta={
-                        'type': 'global_pool',
-                        'distribution_date': str(monday_date),
-                        'total_pool': str(pool_amount),
-                        'total_users': total_users,
-                        'user_share': str(user_share),
-                        'platform_hold': str(platform_hold),
-                    }
-                )
-                
-                # Record distribution
-                GlobalPoolDistribution.objects.create(
-                    user=user,
-                    amount_usd=per_user_amount,
-                    distribution_date=monday_date,
-                    total_pool_amount=pool_amount,
-                    total_users=total_users
+    def _process_global_pool_mondays(self, today):
+        """Collect from signups and distribute to all users for every Monday not yet processed"""
+        from apps.earnings.global_pool import catch_up_global_pool
+
+        for result in catch_up_global_pool(today):
+            monday, collected, distributed = result['monday'], result['collected'], result['distributed']
+            logger.info(f"🌍 Processed Global Pool for Monday: {monday}")
+            if collected is not None:
+                logger.info(f"✅ Collection complete: ${collected['total_usd']} from {collected['count']} signups")
+            if distributed is not None:
+                logger.info(
+                    f"✅ Distribution complete: ${distributed['distributed_usd']} to {distributed['count']} users"
                 )
-                
-                distribution_count += 1
-            
-            # Update pool state - reset pool to 0 after distribution
-            pool_state.current_pool_usd = Decimal('0')
-            pool_state.total_distributed_all_time += pool_amount
-            pool_state.last_distribution_date = monday_date
-            pool_state.save()
-            
-            logger.info(f"✅ Distribution complete: ${pool_amount} to {distribution_count} users. Pool reset to $0")
\ No newline at end of file
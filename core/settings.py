@@ -33,11 +33,13 @@ INSTALLED_APPS = [
     'apps.referrals',
     'apps.withdrawals',
     'apps.marketplace',
+    'apps.idempotency',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
-    'core.middleware.DBRetryMiddleware',  # Handle Neon DB sleep mode
+    'apps.idempotency.middleware.IdempotencyMiddleware',  # Replay retried POSTs (Idempotency-Key)
+    'core.middleware.DatabaseUnavailableMiddleware',  # DB outage -> 503 Retry-After (retries live in core.db)
     'core.middleware.AutoDailyEarningsMiddleware',  # Auto-trigger daily earnings (Render-friendly)
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files in production
@@ -72,10 +74,12 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database: use Postgres via DATABASE_URL if provided, else fallback to local SQLite for dev
 _DB_URL = os.environ.get('DATABASE_URL')
 if _DB_URL:
+    _DB_POOL = os.environ.get('DB_POOL_ENABLED', '1') == '1'
     DATABASES = {
         'default': dj_database_url.parse(
             _DB_URL,
-            conn_max_age=600,
+            # Pooled: each request returns its connection to the worker's pool (core.db)
+            conn_max_age=0 if _DB_POOL else 600,
             ssl_require=True,  # Neon requires SSL
         )
     }
@@ -85,6 +89,23 @@ if _DB_URL:
     DATABASES['default']['OPTIONS'] = {
         'sslmode': 'require',
     }
+    # The Neon -pooler host is PgBouncer in transaction mode: a server-side cursor (.iterator())
+    # held across transactions is gone when the next FETCH lands on another server connection
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+        # Connect retries with backoff + circuit breaker (core.db.resilience)
+        DATABASES['default']['ENGINE'] = 'core.db.backends.postgresql'
+    if _DB_POOL and DATABASES['default']['ENGINE'] == 'core.db.backends.postgresql':
+        DATABASES['default']['ENGINE'] = 'core.db.backends.postgresql_pool'
+        # Per worker process; gunicorn.conf.py derives max_size from DB_CONNECTION_BUDGET
+        DATABASES['default']['POOL'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '1')),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '4')),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),  # wait for a free connection
+            'check_after': float(os.environ.get('DB_POOL_CHECK_AFTER', '30')),  # idle seconds before SELECT 1 on checkout
+            'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+            'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', '1800')),
+        }
 else:
     DATABASES = {
         'default': {
@@ -93,6 +114,36 @@ else:
         }
     }
 
+# Cache: shared Redis when REDIS_URL is set (needs the `redis` package), else per-process memory
+_REDIS_URL = os.environ.get('REDIS_URL')
+if _REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': _REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+# Database connect retries and circuit breaker (core.db.resilience)
+DB_RETRY_ATTEMPTS = int(os.environ.get('DB_RETRY_ATTEMPTS', '3'))
+DB_RETRY_BASE_DELAY = float(os.environ.get('DB_RETRY_BASE_DELAY', '0.25'))
+DB_RETRY_MAX_DELAY = float(os.environ.get('DB_RETRY_MAX_DELAY', '2'))
+DB_RETRY_BUDGET_RATIO = float(os.environ.get('DB_RETRY_BUDGET_RATIO', '0.2'))  # retry tokens earned per connect
+DB_RETRY_BUDGET_MAX = float(os.environ.get('DB_RETRY_BUDGET_MAX', '10'))
+DB_BREAKER_FAILURES = int(os.environ.get('DB_BREAKER_FAILURES', '5'))  # consecutive failed connects to open
+DB_BREAKER_RESET_SECONDS = float(os.environ.get('DB_BREAKER_RESET_SECONDS', '15'))
+# Idempotency-Key replay window and abandoned-request takeover (apps.idempotency)
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', str(24 * 3600)))
+IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', '120'))
+# Lifetime of a cached public catalog page; product changes invalidate earlier
+CATALOG_CACHE_SECONDS = int(os.environ.get('CATALOG_CACHE_SECONDS', '300'))
+
 AUTH_PASSWORD_VALIDATORS = []
 
 LANGUAGE_CODE = 'en-us'
@@ -110,6 +161,18 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 # Allow overriding media root via environment for platforms like Render where a persistent disk is mounted
 MEDIA_ROOT = Path(os.environ.get('DJANGO_MEDIA_ROOT', str(BASE_DIR / 'media')))
+# Background workers creating thumbnail / mid-size image variants after upload (core.images)
+IMAGE_DERIVATIVE_WORKERS = int(os.environ.get('IMAGE_DERIVATIVE_WORKERS', '2'))
+# Upload limits (core.uploads): files stream to temp disk and are cut off past the byte limit;
+# originals larger than MAX_IMAGE_DIMENSION are downsampled (and EXIF stripped) in the background
+FILE_UPLOAD_HANDLERS = ['core.uploads.BoundedUploadHandler']
+MAX_IMAGE_UPLOAD_BYTES = int(os.environ.get('MAX_IMAGE_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = int(os.environ.get('MAX_IMAGE_PIXELS', '40000000'))
+MAX_IMAGE_DIMENSION = int(os.environ.get('MAX_IMAGE_DIMENSION', '2560'))
+# How /media/ file bodies are sent (core.media): 'django', or offloaded to the front server
+# with 'x-accel' (nginx internal location MEDIA_ACCEL_PREFIX aliased to MEDIA_ROOT) / 'x-sendfile'
+MEDIA_SERVE_MODE = os.environ.get('MEDIA_SERVE_MODE', 'django')
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
 
 # Enable compressed, cache-busted static files via WhiteNoise
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -156,7 +219,9 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'idempotency-key',
 ]
+CORS_EXPOSE_HEADERS = ['idempotent-replayed', 'retry-after']
 
 CORS_ALLOW_METHODS = [
     'DELETE',
@@ -204,13 +269,17 @@ ECONOMICS = {
 }
 
 # Admin settable rate fallback
-ADMIN_USD_TO_PKR = float(os.environ.get('ADMIN_USD_TO_PKR', '280.0'))
+ADMIN_USD_TO_PKR = float(os.environ.get('ADMIN_USD_TO_PKR', '280.0'))  # seeds the FxRate table; used only while it is empty
+# How often each process re-checks the FxRate table for new rates (seconds)
+FX_RATE_CHECK_SECONDS = int(os.environ.get('FX_RATE_CHECK_SECONDS', '5'))
 # Signup payment base in PKR
 SIGNUP_FEE_PKR = float(os.environ.get('SIGNUP_FEE_PKR', '1410'))
 
-# Weekly cron for global pool distribution (every Monday at 00:00 UTC)
+# Cron: weekly global pool distribution (every Monday at 00:00 UTC) and daily housekeeping
 CRONJOBS = [
     ('0 0 * * 1', 'django.core.management.call_command', ['distribute_global_pool']),
+    ('30 3 * * *', 'django.core.management.call_command', ['purge_idempotency_keys']),  # daily 03:30 UTC
+    ('0 4 * * 0', 'django.core.management.call_command', ['purge_orphan_blobs']),  # Sundays 04:00 UTC
 ]
 
 # Admin bank details for manual payments (shown at checkout)
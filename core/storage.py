@@ -0,0 +1,117 @@
+"""
+Content-addressed storage for payment proofs.
+
+Uploads are hashed (SHA-256) while they are streamed to a temp file on the media disk and
+then moved to `blobs/<aa>/<bb>/<sha256><ext>`. The same screenshot uploaded as a signup
+proof, a deposit proof and an order proof is therefore stored once, and the stored name
+*is* the content hash: the indexed proof_image columns double as the hash index, so a
+reused proof is found with an index lookup instead of comparing files.
+
+Names that are already under `blobs/` (image derivatives from core.images) are saved as-is.
+"""
+import hashlib
+import os
+import tempfile
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db.models import Count
+from rest_framework import serializers
+
+BLOB_PREFIX = 'blobs/'
+
+# Models/fields whose uploads are payment proofs (same field name everywhere)
+PROOF_MODELS = ['accounts.SignupProof', 'wallets.DepositRequest', 'marketplace.Order']
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # _save picks the final name from the content; identical content maps to one file
+        return name
+
+    def _save(self, name, content):
+        if name.replace('\\', '/').startswith(BLOB_PREFIX):
+            if self.exists(name):
+                self.delete(name)
+            return super()._save(name, content)
+
+        ext = os.path.splitext(name)[1].lower()[:10]
+        tmp_dir = self.path(BLOB_PREFIX + 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=ext)
+        digest = hashlib.sha256()
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    out.write(chunk)
+            h = digest.hexdigest()
+            final = f'{BLOB_PREFIX}{h[:2]}/{h[2:4]}/{h}{ext}'
+            full = self.path(final)
+            if os.path.exists(full):
+                os.unlink(tmp_path)
+                os.utime(full)  # reused now: keeps purge_orphan_blobs away until the row commits
+            else:
+                os.makedirs(os.path.dirname(full), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(tmp_path, self.file_permissions_mode)
+                os.replace(tmp_path, full)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return final
+
+
+_proof_storage = None
+
+
+def proof_storage():
+    """Storage for proof_image fields (a callable so migrations don't serialize the instance)."""
+    global _proof_storage
+    if _proof_storage is None:
+        _proof_storage = ContentAddressedStorage()
+    return _proof_storage
+
+
+def _proof_querysets():
+    for label in PROOF_MODELS:
+        qs = apps.get_model(label).objects.all()
+        if label == 'wallets.DepositRequest':
+            # The SIGNUP-INIT deposit reuses its signup proof by design
+            qs = qs.exclude(tx_id='SIGNUP-INIT')
+        yield qs
+
+
+def reused_proof_names(names) -> set:
+    """Which of `names` are attached to more than one signup/deposit/order submission."""
+    names = {n for n in names if n}
+    if not names:
+        return set()
+    counts = {}
+    for qs in _proof_querysets():
+        rows = qs.filter(proof_image__in=names).values('proof_image').annotate(n=Count('id')).values_list('proof_image', 'n')
+        for name, n in rows:
+            counts[name] = counts.get(name, 0) + n
+    return {name for name, n in counts.items() if n > 1}
+
+
+class ProofListSerializer(serializers.ListSerializer):
+    """Looks up reused proofs for a whole page at once (3 indexed queries) for `proof_reused`."""
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        self.child._reused_proofs = reused_proof_names(getattr(obj.proof_image, 'name', None) for obj in items)
+        return super().to_representation(items)
+
+
+def proof_reused(serializer, obj) -> bool:
+    """`proof_reused` value for a serializer using ProofListSerializer (or a single object)."""
+    name = getattr(obj.proof_image, 'name', None)
+    if not name:
+        return False
+    reused = getattr(serializer, '_reused_proofs', None)
+    if reused is None:
+        reused = reused_proof_names([name])
+    return name in reused
@@ -0,0 +1,150 @@
+"""
+Query-plan regression tests for hot filters, plus consistency tests for the referral closure
+table and the database circuit breaker.
+
+Each test runs EXPLAIN for a query the app issues on a hot path and fails if the planner
+stops using the index that serves it (or falls back to a sort). Works on SQLite and
+Postgres; on Postgres sequential scans are disabled for the test transaction, because
+with a handful of rows the planner would otherwise never pick an index.
+
+Usage:
+    python manage.py test core
+"""
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.db.models import OuterRef, Subquery
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from apps.accounts.models import SignupProof
+from apps.earnings.models import PassiveEarning
+from apps.marketplace.models import Product
+from apps.referrals.models import ReferralClosure, ReferralTeamStats
+from apps.referrals.services import downline_counts, link_referral, rebuild_team_stats
+from apps.wallets.models import Wallet, Transaction, DepositRequest
+from apps.withdrawals.models import WithdrawalRequest
+from core.db import resilience
+from core.db.pool import PoolTimeout
+
+User = get_user_model()
+
+
+class HotQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('plan-user', 'plan@example.com', 'x')
+        cls.wallet = Wallet.objects.create(user=cls.user)
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"expected {index_name} in plan:\n{plan}")
+        self.assertNoSort(plan)
+
+    def assertNoSort(self, plan):
+        if connection.vendor == 'postgresql':
+            self.assertNotRegex(plan, r'(?m)^\s*(->\s*)?(Incremental )?Sort\b', f"unexpected sort:\n{plan}")
+        else:
+            self.assertNotRegex(plan, r'USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY', f"unexpected sort:\n{plan}")
+
+    def test_first_credited_deposit_per_user(self):
+        # AutoDailyEarningsMiddleware (signup fee included) and run_daily_earnings (excluded)
+        qs = DepositRequest.objects.filter(user=self.user, status='CREDITED').order_by('processed_at', 'created_at')
+        self.assertUsesIndex(qs[:1], 'dep_user_status_proc_idx')
+        self.assertUsesIndex(qs.exclude(tx_id='SIGNUP-INIT')[:1], 'dep_user_status_proc_idx')
+
+    def test_signup_init_deposits_of_a_day(self):
+        now = timezone.now()
+        qs = DepositRequest.objects.filter(
+            tx_id='SIGNUP-INIT', status='CREDITED',
+            created_at__gte=now - timedelta(days=1), created_at__lte=now,
+        )
+        self.assertUsesIndex(qs, 'dep_tx_status_created_idx')
+
+    def test_latest_passive_earning_per_user(self):
+        # Served by the (user, day_index) unique_together index scanned backwards
+        plan = PassiveEarning.objects.filter(user=self.user).order_by('-day_index').explain()
+        self.assertRegex(plan, r'(?i)index', f"expected an index in plan:\n{plan}")
+        self.assertNoSort(plan)
+
+    def test_wallet_ledger_newest_first(self):
+        qs = Transaction.objects.filter(wallet=self.wallet).order_by('-created_at')
+        self.assertUsesIndex(qs, 'tx_wallet_created_idx')
+
+    def test_withdrawal_queue_by_status(self):
+        qs = WithdrawalRequest.objects.filter(status='PENDING').order_by('-created_at')
+        self.assertUsesIndex(qs, 'wd_status_created_idx')
+
+    def test_latest_pending_signup_proof_per_user(self):
+        latest = SignupProof.objects.filter(user=OuterRef('pk'), status='PENDING').order_by('-created_at')
+        qs = User.objects.filter(pk=self.user.pk).annotate(pending_proof_id=Subquery(latest.values('id')[:1]))
+        self.assertUsesIndex(qs, 'signup_user_status_created_idx')
+
+    def test_catalog_page(self):
+        qs = Product.objects.filter(is_active=True).order_by('-created_at', '-id')
+        self.assertUsesIndex(qs, 'prod_active_created_idx')
+
+    def test_catalog_page_in_category(self):
+        qs = Product.objects.filter(is_active=True, category='shoes').order_by('-created_at', '-id')
+        self.assertUsesIndex(qs, 'prod_active_cat_created_idx')
+
+
+class ReferralClosureDeleteTests(TestCase):
+    def make_user(self, name, parent=None):
+        user = User.objects.create_user(name, f'{name}@example.com', 'x', referred_by=parent)
+        link_referral(user)
+        return user
+
+    def test_deleting_a_mid_tree_user_detaches_its_subtree(self):
+        root = self.make_user('root')
+        mid = self.make_user('mid', root)
+        child = self.make_user('child', mid)
+        grandchild = self.make_user('grandchild', child)
+        rebuild_team_stats()
+
+        mid.delete()
+
+        child.refresh_from_db()
+        self.assertIsNone(child.referred_by_id)
+        self.assertEqual(
+            set(ReferralClosure.objects.values_list('ancestor_id', 'descendant_id', 'depth')),
+            {(child.id, grandchild.id, 1)},
+        )
+        self.assertEqual(downline_counts(root), {1: 0, 2: 0, 3: 0})
+        self.assertFalse(ReferralTeamStats.objects.filter(user=root, team_size__gt=0).exists())
+        self.assertEqual(ReferralTeamStats.objects.get(user=child).team_size, 1)
+
+
+@override_settings(DB_RETRY_ATTEMPTS=1, DB_BREAKER_FAILURES=1, DB_BREAKER_RESET_SECONDS=0)
+class CircuitBreakerTests(SimpleTestCase):
+    alias = 'breaker-test'
+
+    def tearDown(self):
+        resilience._breakers.pop(self.alias, None)
+        resilience._budgets.pop(self.alias, None)
+
+    def connect(self, error=None):
+        def connect():
+            if error is not None:
+                raise error
+            return 'connection'
+        return resilience.guarded_connect(self.alias, connect, retry_on=OperationalError)
+
+    def test_failures_open_the_circuit_and_a_successful_probe_closes_it(self):
+        with self.assertRaises(OperationalError):
+            self.connect(OperationalError('down'))
+        self.assertEqual(resilience.breaker_for(self.alias).state, resilience.OPEN)
+        self.assertEqual(self.connect(), 'connection')
+        self.assertEqual(resilience.breaker_for(self.alias).state, resilience.CLOSED)
+
+    def test_probe_ending_in_an_unrelated_error_does_not_block_later_connects(self):
+        with self.assertRaises(OperationalError):
+            self.connect(OperationalError('down'))
+        with self.assertRaises(PoolTimeout):
+            self.connect(PoolTimeout('pool exhausted'))
+        self.assertEqual(self.connect(), 'connection')
+        self.assertEqual(resilience.breaker_for(self.alias).state, resilience.CLOSED)
@@ -0,0 +1,87 @@
+"""
+Bounded upload handling for proof and product images.
+
+- BoundedUploadHandler streams every uploaded file straight to a temp file on disk and
+  aborts the request as soon as a file (or the declared request body) exceeds
+  MAX_IMAGE_UPLOAD_BYTES, so large uploads never sit in worker memory.
+- BoundedImageField replaces DRF's ImageField (which decodes the image via Pillow's
+  verify()): it only parses the image header to check format and dimensions, and
+  rejects decompression bombs before any pixel data is read.
+
+EXIF stripping and downsampling of oversized originals happen after the request, in the
+core.images background job.
+"""
+import warnings
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image
+from rest_framework import serializers
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF'}
+FORM_FIELDS_SLACK = 256 * 1024  # room for the non-file form fields of a multipart body
+
+
+def max_upload_bytes() -> int:
+    return getattr(settings, 'MAX_IMAGE_UPLOAD_BYTES', 10 * 1024 * 1024)
+
+
+class UploadTooLarge(RequestDataTooBig):
+    pass
+
+
+class BoundedUploadHandler(TemporaryFileUploadHandler):
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Reject before reading the body when the client declares an oversized request
+        if content_length and content_length > max_upload_bytes() + FORM_FIELDS_SLACK:
+            raise UploadTooLarge(f'Upload exceeds {max_upload_bytes()} bytes')
+        return super().handle_raw_input(input_data, META, content_length, boundary, encoding)
+
+    def new_file(self, *args, **kwargs):
+        self.received = 0
+        return super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > max_upload_bytes():
+            self.file.close()  # removes the temp file
+            raise UploadTooLarge(f'Upload exceeds {max_upload_bytes()} bytes')
+        return super().receive_data_chunk(raw_data, start)
+
+
+def check_image_header(f):
+    """(format, width, height) from the image header only; raises ValueError if unacceptable."""
+    max_pixels = getattr(settings, 'MAX_IMAGE_PIXELS', 40_000_000)
+    if hasattr(f, 'seek'):
+        f.seek(0)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', Image.DecompressionBombWarning)
+            with Image.open(f) as img:  # lazy: reads the header, not the pixels
+                fmt, (width, height) = img.format, img.size
+    except (Image.DecompressionBombError, Image.DecompressionBombWarning):
+        raise ValueError('Image dimensions are too large.')
+    except Exception:
+        raise ValueError('Upload a valid image. The file you uploaded was either not an image or a corrupted image.')
+    finally:
+        if hasattr(f, 'seek'):
+            f.seek(0)
+    if fmt not in ALLOWED_FORMATS:
+        raise ValueError(f'Unsupported image format {fmt}. Use JPEG, PNG, WebP or GIF.')
+    if width * height > max_pixels:
+        raise ValueError('Image dimensions are too large.')
+    return fmt, width, height
+
+
+class BoundedImageField(serializers.FileField):
+    """Image upload field that validates size and header without decoding the image."""
+
+    def to_internal_value(self, data):
+        f = super().to_internal_value(data)
+        if f.size > max_upload_bytes():
+            raise serializers.ValidationError(f'Image must be smaller than {max_upload_bytes() // (1024 * 1024)} MB.')
+        try:
+            check_image_header(f)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return f
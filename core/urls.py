@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include, re_path
-from django.conf import settings
-from django.views.static import serve
+from core.media import serve_media, serve_adminui
+from core.db.views import db_health
 from rest_framework_simplejwt.views import TokenRefreshView
 from apps.accounts.views import TokenObtainPairPatchedView
 from django.http import JsonResponse
@@ -33,6 +33,7 @@ def debug_admin(request):
 urlpatterns = [
     path('', health_check, name='health_check'),  # ✅ Root health check for Render
     path('debug/admin/', debug_admin, name='debug_admin'),  # Debug endpoint
+    path('api/health/db/', db_health, name='db_health'),  # Breaker/pool metrics (staff)
     path('admin/', admin.site.urls),
     path('api/auth/token/', TokenObtainPairPatchedView.as_view(), name='token_obtain_pair'),
     path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
@@ -44,9 +45,9 @@ urlpatterns = [
     path('api/marketplace/', include('apps.marketplace.urls')),
 ]
 
-# Serve media files (including in production)
+# Serve media files (including in production): ETag/304, byte ranges, optional X-Accel-Redirect offload
 urlpatterns += [
-    re_path(r'^media/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
+    re_path(r'^media/(?P<path>.*)$', serve_media),
 ]
 
 # Serve adminui only from /adminui and restrict to staff
@@ -57,6 +58,6 @@ def staff_only(view_func):
 
 urlpatterns += [
     # Protect /adminui behind staff auth; do not serve admin UI at root
-    re_path(r'^adminui/?$', staff_only(lambda request: serve(request, 'index_django.html', document_root=settings.BASE_DIR / 'adminui'))),
-    re_path(r'^adminui/(?P<path>.*)$', staff_only(lambda request, path: serve(request, path, document_root=settings.BASE_DIR / 'adminui'))),
+    re_path(r'^adminui/?$', staff_only(serve_adminui)),
+    re_path(r'^adminui/(?P<path>.*)$', staff_only(serve_adminui)),
 ]
\ No newline at end of file
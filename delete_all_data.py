@@ -18,7 +18,8 @@ django.setup()
 from django.contrib.auth import get_user_model
 from apps.wallets.models import Wallet, Transaction, DepositRequest
 from apps.earnings.models import PassiveEarning, DailyEarningsState
-from apps.earnings.models_global_pool import GlobalPool, GlobalPoolPayout
+from apps.earnings.models_global_pool import GlobalPoolPayout
+from apps.earnings.models import GlobalPoolContribution
 from apps.referrals.models import ReferralPayout, ReferralMilestoneProgress, ReferralMilestoneAward
 from apps.withdrawals.models import WithdrawalRequest
 from apps.marketplace.models import Product, Order
@@ -113,9 +114,9 @@ def delete_all_data():
         GlobalPoolPayout.objects.all().delete()
         print(f"  ✓ Deleted {pool_payout_count} global pool payouts")
         
-        pool_count = GlobalPool.objects.all().count()
-        GlobalPool.objects.all().delete()
-        print(f"  ✓ Deleted {pool_count} global pool records")
+        pool_count = GlobalPoolContribution.objects.all().count()
+        GlobalPoolContribution.objects.all().delete()
+        print(f"  ✓ Deleted {pool_count} global pool contributions")
         
         # 8. Earnings
         print("\nDeleting earnings data...")
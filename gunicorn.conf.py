@@ -18,6 +18,15 @@ max_requests_jitter = 50  # Add randomness to prevent all workers restarting at
 # Threading
 threads = int(os.environ.get('GUNICORN_THREADS', '4'))
 
+# Database pool (core.db): one pool per worker. A worker needs at most one connection per
+# request thread, one per image derivative thread (core.images) and one for the keep-warm
+# pinger; cap it so all workers together stay within DB_CONNECTION_BUDGET (keep this under
+# Neon's limit, minus headroom for cron/shell).
+# Set here, before the app is preloaded, so settings pick it up.
+_db_budget = int(os.environ.get('DB_CONNECTION_BUDGET', '20'))
+_image_threads = int(os.environ.get('IMAGE_DERIVATIVE_WORKERS', '2'))
+os.environ.setdefault('DB_POOL_MAX_SIZE', str(max(1, min(threads + _image_threads + 1, _db_budget // workers))))
+
 # Timeout - increased for Render stability
 timeout = 120  # Increased timeout for slow queries and Render health checks
 keepalive = 2
@@ -38,4 +47,25 @@ enable_stdio_inheritance = True
 # Security
 limit_request_line = 4094
 limit_request_fields = 100
-limit_request_field_size = 8190
\ No newline at end of file
+limit_request_field_size = 8190
+
+
+# Server hooks
+def pre_fork(server, worker):
+    # Connections opened while preloading belong to the master: close them before forking
+    try:
+        from core.db import release_all
+        release_all()
+    except Exception as e:
+        server.log.warning(f"Could not release master DB connections: {e}")
+
+
+def post_fork(server, worker):
+    # Open the pool's minimum connections now, so the first request does not pay TLS
+    # setup or a Neon cold start
+    try:
+        from core.db import start_keep_warm, warm_up
+        warm_up()
+        start_keep_warm(float(os.environ.get('DB_KEEPWARM_SECONDS', '0')))
+    except Exception as e:
+        server.log.warning(f"DB warm-up failed in worker {worker.pid}: {e}")
@@ -10,15 +10,14 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 django.setup()
 
 from apps.earnings.models import GlobalPoolState
-from decimal import Decimal
 
 def main():
     print("Initializing Global Pool State...")
     
-    # Check if GlobalPoolState already exists
-    state = GlobalPoolState.objects.first()
+    # The pool is a singleton row (pk=1), as in apps.earnings.global_pool
+    state, created = GlobalPoolState.objects.get_or_create(pk=1)
     
-    if state:
+    if not created:
         print(f"\n✓ GlobalPoolState already exists:")
         print(f"  - Current Pool: ${state.current_pool_usd}")
         print(f"  - Last Collection: {state.last_collection_date or 'Never'}")
@@ -26,14 +25,7 @@ def main():
         print(f"  - Total Collected (All Time): ${state.total_collected_all_time}")
         print(f"  - Total Distributed (All Time): ${state.total_distributed_all_time}")
     else:
-        # Create initial state
-        state = GlobalPoolState.objects.create(
-            current_pool_usd=Decimal('0.00'),
-            last_collection_date=None,
-            last_distribution_date=None,
-            total_collected_all_time=Decimal('0.00'),
-            total_distributed_all_time=Decimal('0.00')
-        )
+        # The balance is derived from the contribution ledger; every counter starts at zero
         print(f"\n✓ GlobalPoolState created successfully!")
         print(f"  - Current Pool: ${state.current_pool_usd}")
         print(f"  - Ready for Monday collection and distribution")
@@ -16,7 +16,8 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 django.setup()
 
-from apps.earnings.models_global_pool import GlobalPool, GlobalPoolPayout
+from apps.earnings.models_global_pool import GlobalPoolPayout
+from apps.earnings.global_pool import pool_balance
 from apps.earnings.services import compute_daily_earning_usd, GLOBAL_POOL_CUT
 from decimal import Decimal
 from django.conf import settings
@@ -31,10 +32,7 @@ print(f"  - GLOBAL_POOL_CUT: {GLOBAL_POOL_CUT} ({float(GLOBAL_POOL_CUT) * 100}%)
 print(f"  - From settings: {settings.ECONOMICS['GLOBAL_POOL_CUT']}")
 
 # Check current pool balance
-pool, created = GlobalPool.objects.get_or_create(pk=1)
-print(f"\n💰 Current Global Pool Balance: ${pool.balance_usd}")
-if created:
-    print("  ⚠️  Pool was just created (first time)")
+print(f"\n💰 Current Global Pool Balance: ${pool_balance()}")
 
 # Test calculation for day 1
 print("\n🧮 Test Calculation (Day 1):")